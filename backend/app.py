@@ -1,68 +1,69 @@
-import os
 from typing import List, Optional
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import Response
 from pydantic import BaseModel
-from pymongo import MongoClient
-from sentence_transformers import SentenceTransformer
-from bson import ObjectId
 from dotenv import load_dotenv
+from .src.api.responses import json_response
+from .src.api.schemas import BatchSearchRequest
+from .src.config.settings import PROFILE_DIR, PROFILE_THRESHOLD_MS
+from .src.utils.metrics import CONTENT_TYPE, MetricsMiddleware, RequestProfiler, install_toggle_signal, render_metrics, timed
+from .src.vector_store.base import search_many
+from .src.api.container import (
+    ServiceContainer,
+    create_lifespan,
+    get_container,
+    readiness,
+    service_stats,
+)
 
 load_dotenv()
 
-# Initialize app and model
-app = FastAPI(title="Movie Search API")
+# Initialize app; the model and Mongo client are built once by the lifespan.
+# In testing mode the container uses a lightweight dummy model to avoid
+# network downloads.
+app = FastAPI(title="Movie Search API", lifespan=create_lifespan(include_rag=False))
+profiler = RequestProfiler(PROFILE_THRESHOLD_MS, PROFILE_DIR)
+install_toggle_signal(profiler)
+app.add_middleware(MetricsMiddleware, profiler=profiler)
 
-# Use a lightweight dummy model when running tests to avoid network downloads
-if os.getenv("TESTING") == "1":
-    class DummyModel:
-        def encode(self, text):
-            return [0.0] * 384
 
-    model = DummyModel()
-else:
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-
-# Mongo connection
-MONGODB_URI = os.getenv("MONGODB_URI")
-client = MongoClient(MONGODB_URI) if MONGODB_URI else None
+async def get_movies_async(encoder, backend, query: str, limit: int = 5,
+                           year_start: Optional[int] = None,
+                           year_end: Optional[int] = None,
+                           genres: Optional[List[str]] = None,
+                           executor=None) -> List[dict]:
+    """Encode the query and run the filtered vector search without blocking the event loop"""
+    if not backend:
+        raise RuntimeError("MongoDB not configured")
+    with timed("embed"):
+        embedding = await encoder.encode_async(query)
+    # Year and genre filters run inside the vector search, so narrow
+    # filters still return up to `limit` movies
+    with timed("vector_search"):
+        return await backend.asearch(
+            embedding,
+            top_k=limit,
+            year_start=year_start,
+            year_end=year_end,
+            genres=genres,
+            executor=executor
+        )
 
 
-def get_movies(query: str, limit: int = 5,
-               year_start: Optional[int] = None,
-               year_end: Optional[int] = None,
-               genres: Optional[List[str]] = None) -> List[dict]:
-    if not client:
+async def get_movies_batch(encoder, backend, searches: List[dict], limit: int = 5,
+                           executor=None) -> list:
+    """
+    Movies for many searches: one encode call for all queries, then
+    searches sharing filters are retrieved as one backend batch
+    Returns:
+        list: Per search, its movies or the exception that failed it
+    """
+    if not backend:
         raise RuntimeError("MongoDB not configured")
-    embedding = model.encode(query).tolist()
-    collection = client.sample_mflix.embedded_movies
-    pipeline = [
-        {
-            "$vectorSearch": {
-                "index": "vector_index",
-                "path": "embedding",
-                "queryVector": embedding,
-                "numCandidates": 100,
-                "limit": limit
-            }
-        }
-    ]
-    match = {}
-    if year_start and year_end:
-        match["year"] = {"$gte": year_start, "$lte": year_end}
-    if genres:
-        match["genres"] = {"$in": genres}
-    if match:
-        pipeline.append({"$match": match})
-    pipeline.append({
-        "$project": {
-            "title": 1,
-            "plot": 1,
-            "year": 1,
-            "genres": 1,
-            "score": {"$meta": "vectorSearchScore"}
-        }
-    })
-    return list(collection.aggregate(pipeline))
+    with timed("embed"):
+        embeddings = await encoder.encode_many_async([s["query"] for s in searches])
+    with timed("vector_search"):
+        return await search_many(backend, embeddings, searches, limit, executor)
 
 
 class MovieResponse(BaseModel):
@@ -77,18 +78,54 @@ def read_root():
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def ready(request: Request):
+    return readiness(request)
+
+
+@app.get("/stats")
+def stats(request: Request):
+    return service_stats(request)
+
+
+@app.get("/metrics")
+def metrics(request: Request):
+    stats = {**service_stats(request), "profiler": profiler.stats()}
+    return Response(render_metrics(stats), media_type=CONTENT_TYPE)
+
+
 @app.get("/search")
-def search(query: str,
+async def search(query: str,
            year_start: Optional[int] = None,
            year_end: Optional[int] = None,
            genres: Optional[str] = None,
-           limit: int = 5):
+           limit: int = 5,
+           container: ServiceContainer = Depends(get_container)):
     try:
         genre_list = genres.split(',') if genres else None
-        movies = get_movies(query, limit, year_start, year_end, genre_list)
-        # Convert ObjectId to string for JSON
-        for m in movies:
-            m["_id"] = str(m["_id"])
-        return {"movies": movies}
+        movies = await get_movies_async(container.query_encoder, container.vector_backend, query, limit,
+                                        year_start, year_end, genre_list, container.executor)
+        # Hits are JSON-native (_id is converted in the pipeline), so they
+        # are encoded once, straight into the response
+        return json_response({"movies": movies})
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+@app.post("/search/batch")
+async def search_batch(batch: BatchSearchRequest,
+                       limit: int = 5,
+                       container: ServiceContainer = Depends(get_container)):
+    searches = [s.model_dump() for s in batch.searches]
+    try:
+        outcomes = await get_movies_batch(container.query_encoder, container.vector_backend, searches,
+                                          limit, container.executor)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
+    results = []
+    for search, movies in zip(searches, outcomes):
+        if isinstance(movies, BaseException):
+            results.append({"query": search["query"], "error": str(movies)})
+        else:
+            results.append({"query": search["query"], "movies": movies})
+    return json_response({"results": results})
@@ -0,0 +1,68 @@
+"""
+Recall@k, QPS and memory of the IVF index against exact search.
+
+    python -m backend.benchmarks.ann_benchmark --vectors data/vectors
+    python -m backend.benchmarks.ann_benchmark --synthetic 200000
+
+Without exported embeddings a clustered synthetic catalogue is used.
+"""
+import argparse
+import os
+import tempfile
+import numpy as np
+from ..src.vector_store.ivf_index import IVFIndex, build_ivf_index
+from ..src.vector_store.local_exact import ExactVectorSearch
+from .common import load_or_generate_vectors, peak_rss_mb, print_report, recall_at_k, sample_queries, timed
+
+
+def run(vectors, n_queries=200, k=10, n_lists=None, nprobes=(1, 2, 4, 8, 16, 32, 64)):
+    queries = sample_queries(vectors, n_queries)
+    documents = [{}] * len(vectors)
+    exact = ExactVectorSearch(vectors, documents)
+    (truth, _), exact_seconds = timed(exact.top_candidates, queries, k)
+
+    rows = [{
+        "method": "exact",
+        "n_vectors": len(vectors),
+        "k": k,
+        "recall": 1.0,
+        "qps": n_queries / exact_seconds,
+        "index_mb": vectors.nbytes / 2**20,
+    }]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ivf.index")
+        _, build_seconds = timed(build_ivf_index, vectors, path, n_lists=n_lists)
+        index = IVFIndex(path)
+        for nprobe in nprobes:
+            if nprobe > index.n_lists:
+                break
+            (found, _), seconds = timed(index.search, queries, k, nprobe=nprobe)
+            rows.append({
+                "method": "ivf",
+                "n_lists": index.n_lists,
+                "nprobe": nprobe,
+                "k": k,
+                "recall": recall_at_k(found, truth),
+                "qps": n_queries / seconds,
+                "index_mb": index.nbytes / 2**20,
+                "build_seconds": build_seconds,
+            })
+        del index
+
+    rows.append({"peak_rss_mb": peak_rss_mb()})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", default=None, help="Directory with exported embeddings.npy")
+    parser.add_argument("--synthetic", type=int, default=100000, help="Synthetic catalogue size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    vectors = np.asarray(load_or_generate_vectors(args.vectors, n=args.synthetic))
+    print_report(run(vectors, args.queries, args.k, args.lists), args.output)
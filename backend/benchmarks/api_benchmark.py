@@ -0,0 +1,213 @@
+"""
+Replay a search workload against the real API routes, fully offline.
+
+    python -m backend.benchmarks.api_benchmark --app rag --workload queries.jsonl --concurrency 1 8 32 --output baseline.json
+    python -m backend.benchmarks.api_benchmark --app rag --workload queries.jsonl --baseline baseline.json
+
+Requests go through httpx's ASGI transport into movie_api (--app rag) or
+app.py (--app search) with their lifespan, middleware and dependencies.
+Atlas and Fireworks are replaced by FakeMongo and FakeLLM (fakes.py); the
+query encoder is DummyModel unless --model names a sentence-transformer.
+
+Workload files are JSONL with a "query" (or "title") per line and optional
+year_start, year_end, genres (list or comma-separated) and sort_by. Without
+one, a synthetic workload with repeated queries is generated. Each
+concurrency level starts from empty caches.
+
+With --baseline, p95 latency and QPS are compared with a previous --output
+file and the run fails if either regressed by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+import numpy as np
+from .common import latency_summary, peak_rss_mb, print_report
+
+SYNTHETIC_QUERIES = [
+    "space adventure with aliens", "romantic comedy in paris", "heist movie with a twist",
+    "haunted house horror", "animated film for kids", "courtroom drama", "time travel paradox",
+    "war movie about friendship", "detective solving a murder", "superhero origin story",
+    "road trip comedy", "dystopian future rebellion", "sports underdog story", "musical romance",
+    "zombie apocalypse survival", "spy thriller in berlin",
+]
+
+
+def configure_environment(model: str) -> None:
+    """Settings are read at import time, so this runs before the apps are imported"""
+    if model == "dummy":
+        os.environ["TESTING"] = "1"
+    else:
+        os.environ["EMBEDDING_MODEL_NAME"] = model
+    os.environ["VECTOR_BACKEND"] = "mongo"
+    # The benchmark client is a single IP; don't let the limiter throttle it
+    os.environ["RATE_LIMIT_PER_MINUTE"] = str(10 ** 9)
+
+
+def load_workload(path: str) -> List[dict]:
+    """Search parameters for GET /search, one dict per workload line"""
+    from ..src.data_processing.jsonl import read_records
+
+    searches = []
+    for record in read_records(path):
+        query = record.get("query") or record.get("title")
+        if not query:
+            continue
+        search = {"query": query}
+        for field in ("year_start", "year_end", "sort_by"):
+            if record.get(field) is not None:
+                search[field] = record[field]
+        genres = record.get("genres")
+        if genres:
+            search["genres"] = genres if isinstance(genres, str) else ",".join(genres)
+        searches.append(search)
+    return searches
+
+
+def synthetic_workload(n: int = 200, seed: int = 0) -> List[dict]:
+    """Zipf-distributed queries, a quarter of them with a year or genre filter"""
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.3, n), len(SYNTHETIC_QUERIES)) - 1
+    searches = []
+    for rank in ranks:
+        search = {"query": SYNTHETIC_QUERIES[rank]}
+        roll = rng.random()
+        if roll < 0.125:
+            search.update(year_start=1980, year_end=1999)
+        elif roll < 0.25:
+            search["genres"] = "Drama,Comedy"
+        searches.append(search)
+    return searches
+
+
+def current_rss_mb() -> float:
+    """Resident set size now, falling back to the peak where /proc is missing"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+async def replay(client, route: str, workload: List[dict], n_requests: int, concurrency: int, distinct: bool, extra: dict):
+    """Send n_requests from the workload with at most ``concurrency`` in flight"""
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        params = {**workload[i % len(workload)], **extra}
+        if distinct:
+            params["query"] = f"{params['query']} #{i}"
+        async with gate:
+            started = time.perf_counter()
+            response = await client.get(route, params=params)
+            elapsed = time.perf_counter() - started
+        if response.status_code == 200:
+            latencies.append(elapsed)
+        else:
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run(app_name="rag", workload=None, concurrency_levels=(1, 8, 32), n_requests=200, n_movies=5000,
+              mongo_ms=5.0, llm_ms=300.0, distinct=False):
+    import httpx
+    from ..src.api.container import create_lifespan
+    from ..src.config.settings import EMBEDDING_DIMENSIONS
+    from .fakes import FakeLLM, FakeMongo, make_movies
+
+    if app_name == "rag":
+        from ..src.api.movie_api import app
+        include_rag, extra = True, {}
+    else:
+        from ..app import app
+        include_rag, extra = False, {"limit": 5}
+
+    movies = make_movies(n_movies, EMBEDDING_DIMENSIONS)
+    rows = []
+    for concurrency in concurrency_levels:
+        mongo = FakeMongo([dict(m) for m in movies], latency=mongo_ms / 1000.0)
+        llm = FakeLLM(llm_ms / 1000.0)
+        lifespan = create_lifespan(include_rag, mongo_client=mongo.client, async_mongo_client=mongo.async_client, llm=llm)
+        async with lifespan(app):
+            while not app.state.container.ready:
+                if app.state.container.startup_error:
+                    raise RuntimeError(app.state.container.startup_error)
+                await asyncio.sleep(0.01)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                latencies, errors, seconds = await replay(client, "/search", workload, n_requests, concurrency, distinct, extra)
+        rows.append({
+            "app": app_name,
+            "concurrency": concurrency,
+            "requests": n_requests,
+            "errors": errors,
+            "qps": n_requests / seconds,
+            **latency_summary(latencies),
+            "llm_calls": llm.calls,
+            "rss_mb": current_rss_mb(),
+        })
+    rows.append({"peak_rss_mb": peak_rss_mb()})
+    return rows
+
+
+def compare_with_baseline(rows: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Descriptions of every p95 or QPS regression beyond ``tolerance``"""
+    previous = {(row["app"], row["concurrency"]): row for row in baseline if "concurrency" in row}
+    regressions = []
+    for row in rows:
+        before = previous.get((row.get("app"), row.get("concurrency")))
+        if before is None:
+            continue
+        label = f"{row['app']} @ {row['concurrency']} in flight"
+        if row["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {before['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms")
+        if row["qps"] < before["qps"] * (1 - tolerance):
+            regressions.append(f"{label}: qps {before['qps']:.1f} -> {row['qps']:.1f}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", choices=["rag", "search"], default="rag", help="movie_api (rag) or app.py (search)")
+    parser.add_argument("--workload", default=None, help="JSONL file of searches to replay")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--movies", type=int, default=5000, help="Size of the fake embedded_movies collection")
+    parser.add_argument("--mongo-ms", type=float, default=5.0, help="Simulated Mongo round trip")
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="Simulated LLM latency")
+    parser.add_argument("--model", default="dummy", help="'dummy' or a sentence-transformer model name")
+    parser.add_argument("--distinct", action="store_true", help="Make every query unique so caches never hit")
+    parser.add_argument("--output", default=None, help="Write the report as a JSON baseline")
+    parser.add_argument("--baseline", default=None, help="Fail on regressions against this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative p95/QPS regression")
+    args = parser.parse_args(argv)
+
+    configure_environment(args.model)
+    workload = load_workload(args.workload) if args.workload else synthetic_workload()
+    if not workload:
+        parser.error("The workload has no searches")
+
+    rows = asyncio.run(run(args.app, workload, args.concurrency, args.requests, args.movies,
+                           args.mongo_ms, args.llm_ms, args.distinct))
+    print_report(rows, args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_with_baseline(rows, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Batch search against a sequential loop of single searches.
+
+    python -m backend.benchmarks.batch_benchmark --batch-sizes 8 32 64 --llm-ms 300
+
+Uses the sleeping Mongo and LLM fakes of concurrency_benchmark, so the
+numbers show how much of the per-query round trips the batch overlaps.
+Every query is distinct so none is served from a cache.
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .common import peak_rss_mb, print_report
+from .concurrency_benchmark import build_pipeline
+
+
+async def run(batch_sizes=(8, 32, 64), mongo_ms=20.0, llm_ms=300.0, include_answers=True, offload_workers=4):
+    executor = ThreadPoolExecutor(max_workers=offload_workers, thread_name_prefix="offload")
+    pipeline = build_pipeline(mongo_ms / 1000.0, llm_ms / 1000.0, executor)
+    rows = []
+    offset = 0
+    for size in batch_sizes:
+        queries = [f"batch query {offset + i}" for i in range(2 * size)]
+        offset += 2 * size
+
+        started = time.perf_counter()
+        if include_answers:
+            for query in queries[:size]:
+                await pipeline.aget_movie_recommendations(query)
+        else:
+            for query in queries[:size]:
+                await pipeline.query_engine.asearch_similar_movies(query)
+        sequential = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await pipeline.abatch_recommendations([{"query": q} for q in queries[size:]], include_answers=include_answers)
+        batched = time.perf_counter() - started
+
+        rows.append({
+            "batch_size": size,
+            "sequential_qps": size / sequential,
+            "batch_qps": size / batched,
+            "speedup": sequential / batched,
+        })
+    pipeline.query_engine.encoder.encoder.stop()
+    executor.shutdown()
+    rows.append({"peak_rss_mb": peak_rss_mb()})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--mongo-ms", type=float, default=20.0, help="Simulated Mongo round trip")
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="Simulated LLM latency")
+    parser.add_argument("--no-answers", action="store_true", help="Retrieve movies only")
+    parser.add_argument("--offload-workers", type=int, default=4)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.batch_sizes, args.mongo_ms, args.llm_ms, not args.no_answers, args.offload_workers))
+    print_report(rows, args.output)
@@ -0,0 +1,66 @@
+import json
+import os
+import resource
+import sys
+import time
+import numpy as np
+from ..src.vector_store.local_exact import EMBEDDINGS_FILE, normalize_rows
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_or_generate_vectors(directory: str = None, n: int = 100000, dim: int = 384, n_clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """
+    Load exported embeddings, or generate clustered synthetic unit vectors
+    that behave roughly like sentence embeddings
+    """
+    if directory and os.path.exists(os.path.join(directory, EMBEDDINGS_FILE)):
+        return np.load(os.path.join(directory, EMBEDDINGS_FILE), mmap_mode="r")
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, n_clusters, n)]
+    vectors += 0.5 * rng.normal(size=(n, dim)).astype(np.float32)
+    return normalize_rows(vectors)
+
+
+def sample_queries(vectors: np.ndarray, n_queries: int = 200, noise: float = 0.3, seed: int = 1) -> np.ndarray:
+    """Queries near catalogue items, like real searches for existing movies"""
+    rng = np.random.default_rng(seed)
+    picks = np.asarray(vectors[np.sort(rng.choice(len(vectors), n_queries, replace=False))])
+    return normalize_rows(picks + noise * rng.normal(size=picks.shape).astype(np.float32) / np.sqrt(picks.shape[1]))
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """Mean fraction of the exact top-k present in the approximate top-k"""
+    k = truth.shape[1]
+    return float(np.mean([len(set(f[:k]) & set(t)) / k for f, t in zip(found, truth)]))
+
+
+def timed(fn, *args, **kwargs):
+    """Run fn once and return (result, seconds)"""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def print_report(rows, output: str = None):
+    """Print rows as JSON lines and optionally write them to a file"""
+    for row in rows:
+        print(json.dumps(row))
+    if output:
+        with open(output, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+def latency_summary(latencies) -> dict:
+    """p50/p95/p99 and mean of a list of latencies in seconds, reported in ms"""
+    ms = np.asarray(latencies, dtype=np.float64) * 1000.0
+    if len(ms) == 0:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99), "mean_ms": float(ms.mean())}
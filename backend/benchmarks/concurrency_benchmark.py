@@ -0,0 +1,166 @@
+"""
+Throughput of the search pipeline as in-flight requests grow.
+
+    python -m backend.benchmarks.concurrency_benchmark --mongo-ms 20 --llm-ms 300
+
+Mongo and the LLM are replaced by fakes that only wait, so the numbers
+isolate how each request path overlaps I/O:
+
+    blocking    get_movie_recommendations called on the event loop
+    threadpool  get_movie_recommendations in Starlette's threadpool
+    async       aget_movie_recommendations (async Mongo, ainvoke)
+
+Every request uses a distinct query so none is served from a cache.
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from starlette.concurrency import run_in_threadpool
+from ..src.embedding_service.batcher import EmbeddingBatcher
+from ..src.embedding_service.embedding_cache import QueryEmbeddingCache
+from ..src.embedding_service.models import DummyModel
+from ..src.rag_engine.query_engine import MovieQueryEngine
+from ..src.rag_engine.rag_pipeline import MovieRAGPipeline
+from ..src.vector_store.base import VectorSearchBackend
+from .common import latency_summary, peak_rss_mb, print_report
+
+MOVIES = [
+    {"_id": i, "title": f"Movie {i}", "plot": "A plot.", "year": 2000, "genres": ["Drama"], "score": 0.9}
+    for i in range(5)
+]
+
+
+class _Message:
+    def __init__(self, content):
+        self.content = content
+
+
+class SleepingLLM:
+    """Chat model stand-in that takes ``latency`` seconds to answer"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke(self, prompt):
+        time.sleep(self.latency)
+        return _Message("An answer.")
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.latency)
+        return _Message("An answer.")
+
+
+class SleepingBackend(VectorSearchBackend):
+    """Vector search stand-in with a fixed round-trip time"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def search(self, query_vector, top_k=5, **filters):
+        time.sleep(self.latency)
+        return [dict(m) for m in MOVIES[:top_k]]
+
+    async def asearch(self, query_vector, top_k=5, executor=None, **filters):
+        await asyncio.sleep(self.latency)
+        return [dict(m) for m in MOVIES[:top_k]]
+
+
+class _EmptyCollection:
+    """query_cache stand-in: every lookup misses after one round trip"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def create_index(self, *args, **kwargs):
+        pass
+
+    def find_one(self, filter):
+        time.sleep(self.latency)
+        return None
+
+    def update_one(self, *args, **kwargs):
+        time.sleep(self.latency)
+
+
+class _AsyncEmptyCollection(_EmptyCollection):
+    async def find_one(self, filter):
+        await asyncio.sleep(self.latency)
+        return None
+
+    async def update_one(self, *args, **kwargs):
+        await asyncio.sleep(self.latency)
+
+
+class _Client:
+    def __init__(self, collection):
+        self.sample_mflix = type("Database", (), {"query_cache": collection})()
+
+
+def build_pipeline(mongo_latency: float, llm_latency: float, executor) -> MovieRAGPipeline:
+    model = DummyModel()
+    batcher = EmbeddingBatcher(model)
+    batcher.start()
+    encoder = QueryEmbeddingCache(batcher, executor=executor)
+    engine = MovieQueryEngine(model=model, encoder=encoder, backend=SleepingBackend(mongo_latency), executor=executor)
+    return MovieRAGPipeline(
+        query_engine=engine,
+        llm=SleepingLLM(llm_latency),
+        client=_Client(_EmptyCollection(mongo_latency)),
+        async_client=_Client(_AsyncEmptyCollection(mongo_latency))
+    )
+
+
+async def replay(call, n_requests: int, in_flight: int, offset: int):
+    """Issue n_requests distinct queries with at most in_flight outstanding"""
+    gate = asyncio.Semaphore(in_flight)
+    latencies = []
+
+    async def one(i):
+        async with gate:
+            started = time.perf_counter()
+            await call(f"benchmark query {offset + i}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return latencies, time.perf_counter() - started
+
+
+async def run(n_requests=64, in_flight_levels=(1, 2, 4, 8, 16, 32, 64), mongo_ms=20.0, llm_ms=300.0, offload_workers=4):
+    executor = ThreadPoolExecutor(max_workers=offload_workers, thread_name_prefix="offload")
+    pipeline = build_pipeline(mongo_ms / 1000.0, llm_ms / 1000.0, executor)
+    modes = {
+        "blocking": lambda q: _as_coroutine(pipeline.get_movie_recommendations(q)),
+        "threadpool": lambda q: run_in_threadpool(pipeline.get_movie_recommendations, q),
+        "async": pipeline.aget_movie_recommendations,
+    }
+    rows = []
+    offset = 0
+    for mode, call in modes.items():
+        for in_flight in in_flight_levels:
+            latencies, seconds = await replay(call, n_requests, in_flight, offset)
+            offset += n_requests
+            rows.append({"mode": mode, "in_flight": in_flight, "qps": n_requests / seconds, **latency_summary(latencies)})
+    pipeline.query_engine.encoder.encoder.stop()
+    executor.shutdown()
+    rows.append({"peak_rss_mb": peak_rss_mb()})
+    return rows
+
+
+async def _as_coroutine(value):
+    return value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--mongo-ms", type=float, default=20.0, help="Simulated Mongo round trip")
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="Simulated LLM latency")
+    parser.add_argument("--offload-workers", type=int, default=4)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.requests, args.in_flight, args.mongo_ms, args.llm_ms, args.offload_workers))
+    print_report(rows, args.output)
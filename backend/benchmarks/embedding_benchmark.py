@@ -0,0 +1,80 @@
+"""
+Bulk embedding throughput for 1..N worker processes.
+
+    python -m backend.benchmarks.embedding_benchmark --docs 20000 --workers 1 2 4 8
+
+The single-process row encodes in-process in batches, like
+MovieEmbeddingService.embed_batch; the other rows use ParallelEmbedder.
+Worker start-up (one model load per worker) is reported separately from
+the steady-state docs/s.
+"""
+import argparse
+import os
+import numpy as np
+from ..src.embedding_service.models import load_embedding_model
+from ..src.embedding_service.parallel_embeddings import ParallelEmbedder
+from ..src.data_processing.jsonl import batched
+from .common import peak_rss_mb, print_report, timed
+
+_WORDS = (
+    "detective heist space romance war family robot ocean city murder comedy "
+    "drama dragon school music revenge island train secret future past ghost"
+).split()
+
+
+def synthetic_texts(n: int, words_per_text: int = 60, seed: int = 0):
+    """Plot-length texts built from a small vocabulary"""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(_WORDS), size=(n, words_per_text))
+    return [" ".join(_WORDS[i] for i in row) for row in picks]
+
+
+def _encode_in_process(model, texts, batch_size):
+    rows = 0
+    for batch in batched(texts, batch_size):
+        rows += len(model.encode(batch, batch_size=batch_size))
+    return rows
+
+
+def _encode_with_pool(embedder, texts):
+    rows = 0
+    for shard, embeddings in embedder.encode_shards(texts):
+        rows += len(embeddings)
+    return rows
+
+
+def run(texts, model_name, worker_counts, batch_size=64, shard_size=1024):
+    rows = []
+    model, load_seconds = timed(load_embedding_model, model_name)
+    count, seconds = timed(_encode_in_process, model, texts, batch_size)
+    rows.append({"workers": 1, "docs": count, "startup_s": load_seconds, "docs_per_s": count / seconds})
+
+    for workers in worker_counts:
+        if workers <= 1:
+            continue
+        embedder = ParallelEmbedder(model_name, workers, batch_size, shard_size)
+        _, startup = timed(embedder.start)
+        try:
+            count, seconds = timed(_encode_with_pool, embedder, texts)
+        finally:
+            embedder.close()
+        rows.append({"workers": workers, "docs": count, "startup_s": startup, "docs_per_s": count / seconds})
+
+    baseline = rows[0]["docs_per_s"]
+    for row in rows:
+        row["speedup"] = row["docs_per_s"] / baseline
+    rows.append({"peak_rss_mb": peak_rss_mb()})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--shard-size", type=int, default=1024)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    print_report(run(synthetic_texts(args.docs), args.model, sorted(set(args.workers)), args.batch_size, args.shard_size), args.output)
@@ -0,0 +1,394 @@
+"""
+In-memory stand-ins for Atlas and Fireworks used by the offline benchmarks.
+
+FakeMongo serves the sample_mflix collections from Python lists through a
+sync and an async client that share the same data. Aggregations support
+the stages the app sends ($vectorSearch, $match, $sort, $project,
+$limit); $vectorSearch is an exact cosine scan scored like Atlas. find()
+takes a filter, projection, sort and limit.
+FakeLLM answers after a configurable delay and can stream its answer.
+"""
+import asyncio
+import copy
+import time
+from typing import List, Optional
+import numpy as np
+from ..src.vector_store.local_exact import normalize_rows, to_vectorsearch_score
+from .common import load_or_generate_vectors
+
+GENRES = ["Action", "Comedy", "Drama", "Horror", "Romance", "Sci-Fi", "Thriller", "Animation"]
+
+_SCORE = "__vectorSearchScore"
+
+
+def make_movies(n: int = 5000, dim: int = 384, seed: int = 0) -> List[dict]:
+    """Synthetic embedded_movies documents with clustered embeddings"""
+    vectors = load_or_generate_vectors(n=n, dim=dim, seed=seed)
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "_id": i,
+            "title": f"Movie {i}",
+            "plot": f"The plot of movie {i}.",
+            "year": int(1930 + rng.integers(0, 95)),
+            "genres": sorted({GENRES[j] for j in rng.integers(0, len(GENRES), 2)}),
+            "embedding": vectors[i].tolist(),
+        }
+        for i in range(n)
+    ]
+
+
+def _compare(value, op: str, operand) -> bool:
+    if op == "$eq":
+        return value == operand
+    if op == "$ne":
+        return value != operand
+    if op == "$in":
+        return value in operand
+    if op == "$nin":
+        return value not in operand
+    if value is None:
+        return False
+    if op == "$gt":
+        return value > operand
+    if op == "$gte":
+        return value >= operand
+    if op == "$lt":
+        return value < operand
+    if op == "$lte":
+        return value <= operand
+    raise NotImplementedError(f"Unsupported query operator: {op}")
+
+
+def matches(document: dict, query: dict) -> bool:
+    """MQL filter subset: field equality, comparison operators, $in, $and, $or"""
+    for field, condition in query.items():
+        if field == "$and":
+            if not all(matches(document, q) for q in condition):
+                return False
+            continue
+        if field == "$or":
+            if not any(matches(document, q) for q in condition):
+                return False
+            continue
+        value = document.get(field)
+        # Array fields match when any element does, as in MongoDB
+        candidates = value if isinstance(value, list) else [value]
+        operators = condition if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition) else {"$eq": condition}
+        for op, operand in operators.items():
+            if op in ("$ne", "$nin"):
+                if not all(_compare(v, op, operand) for v in candidates):
+                    return False
+            elif not any(_compare(v, op, operand) for v in candidates):
+                return False
+    return True
+
+
+def _apply_update(document: dict, update: dict, inserting: bool) -> None:
+    for op, fields in update.items():
+        if op == "$set" or (op == "$setOnInsert" and inserting):
+            document.update(copy.deepcopy(fields))
+        elif op == "$inc":
+            for field, amount in fields.items():
+                document[field] = document.get(field, 0) + amount
+        elif op != "$setOnInsert":
+            raise NotImplementedError(f"Unsupported update operator: {op}")
+
+
+def _project(document: dict, projection: dict) -> dict:
+    if all(not spec for key, spec in projection.items() if key != "_id"):
+        return {k: v for k, v in document.items() if k != _SCORE and projection.get(k, 1)}
+    projected = {}
+    if "_id" not in projection and "_id" in document:
+        projected["_id"] = document["_id"]
+    for field, spec in projection.items():
+        if isinstance(spec, dict):
+            projected[field] = _evaluate(document, spec)
+        elif spec and field in document:
+            projected[field] = document[field]
+    return projected
+
+
+def _evaluate(document: dict, expression: dict):
+    """The $project expressions the app uses: $meta score and $toString"""
+    if expression.get("$meta") == "vectorSearchScore":
+        return document.get(_SCORE)
+    if "$toString" in expression:
+        value = document.get(expression["$toString"].lstrip("$"))
+        return None if value is None else str(value)
+    raise NotImplementedError(f"Unsupported projection expression: {expression}")
+
+
+def _sort(documents: List[dict], spec: dict) -> List[dict]:
+    # Stable sorts applied from the last key to the first; missing values
+    # sort lowest, as null does in MongoDB
+    for field, direction in reversed(list(spec.items())):
+        documents = sorted(documents, key=lambda d: (d.get(field) is not None, d.get(field)), reverse=direction == -1)
+    return documents
+
+
+class FakeCollection:
+    """One collection held in memory; ``latency`` seconds per round trip"""
+
+    def __init__(self, documents: Optional[List[dict]] = None, latency: float = 0.0):
+        self.documents = documents if documents is not None else []
+        self.latency = latency
+        self._matrix = None
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _embeddings(self) -> np.ndarray:
+        if self._matrix is None or len(self._matrix) != len(self.documents):
+            self._matrix = normalize_rows(np.array([d["embedding"] for d in self.documents], dtype=np.float32))
+        return self._matrix
+
+    def _vector_search(self, spec: dict) -> List[dict]:
+        if not self.documents:
+            return []
+        query = np.asarray(spec["queryVector"], dtype=np.float32)
+        norm = np.linalg.norm(query)
+        similarities = self._embeddings() @ (query / norm if norm else query)
+        vector_filter = spec.get("filter")
+        if vector_filter:
+            rows = np.array([i for i, d in enumerate(self.documents) if matches(d, vector_filter)], dtype=np.int64)
+        else:
+            rows = np.arange(len(self.documents))
+        rows = rows[np.argsort(-similarities[rows], kind="stable")[:spec["limit"]]]
+        return [{**self.documents[i], _SCORE: float(to_vectorsearch_score(similarities[i]))} for i in rows]
+
+    def run_pipeline(self, pipeline: List[dict]) -> List[dict]:
+        results = self.documents
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$vectorSearch":
+                results = self._vector_search(spec)
+            elif op == "$match":
+                results = [d for d in results if matches(d, spec)]
+            elif op == "$sort":
+                results = _sort(results, spec)
+            elif op == "$project":
+                results = [_project(d, spec) for d in results]
+            elif op == "$limit":
+                results = results[:spec]
+            else:
+                raise NotImplementedError(f"Unsupported aggregation stage: {op}")
+        return [copy.deepcopy(d) for d in results]
+
+    def aggregate(self, pipeline: List[dict], **kwargs):
+        self._wait()
+        return iter(self.run_pipeline(pipeline))
+
+    def _find(self, query: dict):
+        return next((d for d in self.documents if matches(d, query)), None)
+
+    def find_one(self, query: Optional[dict] = None):
+        self._wait()
+        found = self._find(query or {})
+        return copy.deepcopy(found) if found is not None else None
+
+    def run_find(self, query: Optional[dict] = None, projection: Optional[dict] = None, sort=None, limit: int = 0) -> List[dict]:
+        results = [d for d in self.documents if matches(d, query or {})]
+        if sort:
+            results = _sort(results, dict(sort))
+        if limit:
+            results = results[:limit]
+        if projection:
+            results = [_project(d, projection) for d in results]
+        return [copy.deepcopy(d) for d in results]
+
+    def find(self, query: Optional[dict] = None, projection: Optional[dict] = None, sort=None, limit: int = 0):
+        self._wait()
+        return iter(self.run_find(query, projection, sort, limit))
+
+    def _upsert(self, query: dict, update: dict, upsert: bool):
+        document = self._find(query)
+        if document is None:
+            if not upsert:
+                return None
+            document = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            self.documents.append(document)
+            _apply_update(document, update, inserting=True)
+        else:
+            _apply_update(document, update, inserting=False)
+        return document
+
+    def update_one(self, query: dict, update: dict, upsert: bool = False):
+        self._wait()
+        self._upsert(query, update, upsert)
+
+    def find_one_and_update(self, query: dict, update: dict, upsert: bool = False, return_document=None):
+        self._wait()
+        return copy.deepcopy(self._upsert(query, update, upsert))
+
+    def run_bulk_write(self, requests) -> None:
+        # pymongo UpdateOne operations, as ResultCache sends them
+        for request in requests:
+            self._upsert(request._filter, request._doc, bool(request._upsert))
+
+    def bulk_write(self, requests, ordered: bool = True):
+        self._wait()
+        self.run_bulk_write(requests)
+
+    def insert_many(self, documents: List[dict]):
+        self.documents.extend(copy.deepcopy(documents))
+
+    def count_documents(self, query: dict) -> int:
+        self._wait()
+        return sum(1 for d in self.documents if matches(d, query))
+
+    def estimated_document_count(self) -> int:
+        return len(self.documents)
+
+    def create_index(self, *args, **kwargs):
+        return "fake_index"
+
+    def list_search_indexes(self):
+        return iter([{"name": "vector_index"}])
+
+
+class _AsyncCursor:
+    def __init__(self, documents: List[dict], wait=None):
+        self.documents = documents
+        self.wait = wait
+
+    async def to_list(self, length=None):
+        if self.wait is not None:
+            await self.wait()
+        return self.documents if length is None else self.documents[:length]
+
+
+class AsyncFakeCollection:
+    """AsyncCollection view of a FakeCollection: same data, awaited round trips"""
+
+    def __init__(self, collection: FakeCollection):
+        self.collection = collection
+
+    async def _wait(self):
+        if self.collection.latency:
+            await asyncio.sleep(self.collection.latency)
+
+    async def aggregate(self, pipeline: List[dict], **kwargs):
+        await self._wait()
+        return _AsyncCursor(self.collection.run_pipeline(pipeline))
+
+    def find(self, query: Optional[dict] = None, projection: Optional[dict] = None, sort=None, limit: int = 0):
+        return _AsyncCursor(self.collection.run_find(query, projection, sort, limit), self._wait)
+
+    async def find_one(self, query: Optional[dict] = None):
+        await self._wait()
+        found = self.collection._find(query or {})
+        return copy.deepcopy(found) if found is not None else None
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        await self._wait()
+        self.collection._upsert(query, update, upsert)
+
+    async def find_one_and_update(self, query: dict, update: dict, upsert: bool = False, return_document=None):
+        await self._wait()
+        return copy.deepcopy(self.collection._upsert(query, update, upsert))
+
+    async def bulk_write(self, requests, ordered: bool = True):
+        await self._wait()
+        self.collection.run_bulk_write(requests)
+
+    async def count_documents(self, query: dict) -> int:
+        await self._wait()
+        return sum(1 for d in self.collection.documents if matches(d, query))
+
+    async def estimated_document_count(self) -> int:
+        return len(self.collection.documents)
+
+    async def create_index(self, *args, **kwargs):
+        return "fake_index"
+
+
+class _Database:
+    def __init__(self, mongo, wrap):
+        self._mongo = mongo
+        self._wrap = wrap
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._wrap(self._mongo.collection(name))
+
+
+class FakeMongo:
+    """
+    sample_mflix in memory, reachable through ``client`` (MongoClient-like)
+    and ``async_client`` (AsyncMongoClient-like)
+    """
+
+    def __init__(self, movies: List[dict], latency: float = 0.0):
+        """
+        Args:
+            movies (list): embedded_movies documents, with embeddings
+            latency (float): Seconds added to every round trip
+        """
+        self.latency = latency
+        self._collections = {}
+        self.collection("embedded_movies").documents = movies
+        self.client = _FakeClient(self, lambda c: c)
+        self.async_client = _AsyncFakeClient(self, AsyncFakeCollection)
+
+    def collection(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(latency=self.latency)
+        return self._collections[name]
+
+
+class _FakeClient:
+    def __init__(self, mongo: FakeMongo, wrap):
+        self._mongo = mongo
+        self._wrap = wrap
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _Database(self._mongo, self._wrap)
+
+    def close(self):
+        pass
+
+
+class _AsyncFakeClient(_FakeClient):
+    async def close(self):
+        pass
+
+
+class _Message:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeLLM:
+    """
+    Chat model stand-in: answers after ``latency`` seconds, or streams the
+    answer in ``chunks`` pieces spread over the same time
+    """
+
+    def __init__(self, latency: float = 0.3, answer: str = "These movies match your search well.", chunks: int = 8):
+        self.latency = latency
+        self.answer = answer
+        self.chunks = chunks
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency)
+        return _Message(self.answer)
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return _Message(self.answer)
+
+    async def astream(self, prompt):
+        self.calls += 1
+        words = self.answer.split(" ")
+        size = max(1, -(-len(words) // self.chunks))
+        for start in range(0, len(words), size):
+            await asyncio.sleep(self.latency / self.chunks)
+            yield _Message(" ".join(words[start:start + size]) + " ")
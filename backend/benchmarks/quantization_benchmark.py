@@ -0,0 +1,67 @@
+"""
+Memory, scan speed and recall of int8/binary codes against float32.
+
+    python -m backend.benchmarks.quantization_benchmark --vectors data/vectors
+    python -m backend.benchmarks.quantization_benchmark --synthetic 200000
+
+Recall is reported for the code-only first pass and after float32
+rescoring of the shortlist.
+"""
+import argparse
+import numpy as np
+from ..src.vector_store.local_exact import ExactVectorSearch
+from ..src.vector_store.quantization import QuantizedVectorSearch, fit_int8_scale, quantize_binary, quantize_int8
+from .common import load_or_generate_vectors, peak_rss_mb, print_report, recall_at_k, sample_queries, timed
+
+
+def run(vectors, n_queries=200, k=10, rescore_factors=(1, 2, 4, 8, 16)):
+    queries = sample_queries(vectors, n_queries)
+    documents = [{}] * len(vectors)
+    exact = ExactVectorSearch(vectors, documents)
+    (truth, _), exact_seconds = timed(exact.top_candidates, queries, k)
+    rows = [{
+        "method": "float32",
+        "n_vectors": len(vectors),
+        "k": k,
+        "bytes_per_vector": vectors.shape[1] * 4,
+        "code_mb": vectors.nbytes / 2**20,
+        "recall": 1.0,
+        "qps": n_queries / exact_seconds,
+    }]
+
+    scale = fit_int8_scale(vectors)
+    codes = {
+        "int8": (quantize_int8(vectors, scale), scale),
+        "binary": (quantize_binary(vectors), None),
+    }
+    for mode, (mode_codes, mode_scale) in codes.items():
+        for factor in rescore_factors:
+            search = QuantizedVectorSearch(mode_codes, vectors, documents, mode=mode, scale=mode_scale, rescore_factor=factor)
+            (found, _), seconds = timed(search.top_candidates, queries, k)
+            first_pass = search.shortlist(queries, k)
+            rows.append({
+                "method": mode,
+                "rescore_factor": factor,
+                "k": k,
+                "bytes_per_vector": mode_codes.shape[1] * mode_codes.itemsize,
+                "code_mb": mode_codes.nbytes / 2**20,
+                "first_pass_recall": recall_at_k(first_pass, truth),
+                "recall": recall_at_k(found, truth),
+                "qps": n_queries / seconds,
+            })
+
+    rows.append({"peak_rss_mb": peak_rss_mb()})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", default=None, help="Directory with exported embeddings.npy")
+    parser.add_argument("--synthetic", type=int, default=100000, help="Synthetic catalogue size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    vectors = np.asarray(load_or_generate_vectors(args.vectors, n=args.synthetic))
+    print_report(run(vectors, args.queries, args.k), args.output)
@@ -0,0 +1,171 @@
+"""
+Production entry point: one master process, N forked uvicorn workers.
+
+    python -m backend.serve --app rag --workers 4
+
+The master imports the app, loads the embedding model (and the local
+vector data when VECTOR_BACKEND isn't "mongo") and freezes the garbage
+collector before forking, so every worker maps the same model pages
+copy-on-write instead of loading its own copy. Mongo clients, the LLM
+client, the embedding batcher and the caches are built by each worker's
+lifespan after the fork; only worker 0 runs the startup cache warm-up.
+The workers share one listening socket; the master restarts any that die
+and logs per-worker unique and shared memory. run.py remains the
+development server with auto-reload.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import List, Optional
+from .src.api.container import WORKER_SLOT_ENV, preload_services
+
+APPS = {
+    "rag": "backend.src.api.movie_api:app",
+    "search": "backend.app:app",
+}
+
+
+def import_app(target: str):
+    """Import ``module:attribute``"""
+    import importlib
+
+    module_name, attribute = target.split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Listening socket inherited by every worker"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, threads: int, log_level: str) -> int:
+    """Body of a forked worker; returns its exit code"""
+    import uvicorn
+
+    # The master's handlers don't apply here; uvicorn installs its own
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, signal.SIG_DFL)
+    signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+    gc.enable()
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        # One intra-op pool per worker, sized so workers don't oversubscribe
+        torch.set_num_threads(threads)
+    config = uvicorn.Config(app, lifespan="on", log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+    return 0
+
+
+class Master:
+    """Forks the workers, restarts crashed ones and reports their memory"""
+
+    def __init__(self, app, sock: socket.socket, workers: int, threads: int, log_level: str = "info",
+                 memory_report_seconds: float = 300):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.threads = threads
+        self.log_level = log_level
+        self.memory_report_seconds = memory_report_seconds
+        self.children = {}
+        self.stopping = False
+
+    def spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            # Tells the worker's container which slot it fills, e.g. so
+            # only one worker runs the startup cache warm-up
+            os.environ[WORKER_SLOT_ENV] = str(slot)
+            try:
+                code = run_worker(self.app, self.sock, self.threads, self.log_level)
+            finally:
+                # Skip the master's atexit handlers and buffered state
+                os._exit(code)
+        self.children[pid] = slot
+        print(f"Started worker {slot} (pid {pid})")
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def report_memory(self) -> None:
+        from .src.utils.memory import memory_report
+
+        print(memory_report([os.getpid(), *self.children]))
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.report_memory())
+        for slot in range(self.workers):
+            self.spawn(slot)
+
+        next_report = time.monotonic() + self.memory_report_seconds
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                slot = self.children.pop(pid)
+                if not self.stopping:
+                    print(f"Worker {slot} (pid {pid}) exited with status {status}, restarting")
+                    # Don't spin if workers die straight after starting
+                    time.sleep(1)
+                    self.spawn(slot)
+                continue
+            if self.memory_report_seconds and time.monotonic() >= next_report:
+                self.report_memory()
+                next_report = time.monotonic() + self.memory_report_seconds
+            time.sleep(0.2)
+        self.sock.close()
+        return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .src.config.settings import MEMORY_REPORT_SECONDS, SERVER_HOST, SERVER_PORT, WEB_WORKERS
+    from .src.utils.memory import available_cpus
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", choices=sorted(APPS), default="rag", help="movie_api (rag) or app.py (search)")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS, help="Worker processes; 0 uses one per CPU")
+    parser.add_argument("--memory-report-seconds", type=float, default=MEMORY_REPORT_SECONDS,
+                        help="Interval of the per-worker memory log; 0 disables it (SIGUSR1 always reports)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    cpus = available_cpus()
+    workers = args.workers or cpus
+    # Tokenizers' own thread pool doesn't survive fork
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    # Nothing allocated during loading is garbage; keep the collector from
+    # touching (and so copying) those pages, then freeze what survived
+    gc.disable()
+    app = import_app(APPS[args.app])
+    preloaded = preload_services()
+    gc.collect()
+    gc.freeze()
+    print(f"Preloaded {', '.join(preloaded)}; forking {workers} workers on {args.host}:{args.port}")
+
+    sock = bind_socket(args.host, args.port)
+    master = Master(app, sock, workers, max(1, cpus // workers), args.log_level, args.memory_report_seconds)
+    return master.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
+from ..config.settings import (
+    VECTOR_BACKEND,
+    EMBEDDING_MODEL_NAME,
+    WARMUP_QUERY,
+    EMBED_BATCH_WINDOW_MS,
+    EMBED_MAX_BATCH_SIZE,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_TTL_SECONDS,
+    OFFLOAD_WORKERS,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_MIN_PLOT_TOKENS,
+    CONTEXT_TOKENIZER,
+    WARMUP_MAX_QUERIES,
+    WARMUP_ORDER,
+    WARMUP_REFRESH_WINDOW_SECONDS,
+    WARMUP_CONCURRENCY,
+    WARMUP_RATE_PER_SECOND,
+)
+from ..database.mongodb_client import (
+    aclose_mongodb_client,
+    close_mongodb_client,
+    get_async_mongodb_client,
+    get_mongodb_client,
+    pool_stats,
+)
+from ..embedding_service.batcher import EmbeddingBatcher
+from ..embedding_service.embedding_cache import QueryEmbeddingCache
+from ..embedding_service.models import load_embedding_model
+from ..utils.memory import process_memory
+from ..vector_store.factory import create_vector_backend
+
+# Set by serve.py in each forked worker; only slot 0 warms the shared
+# query_cache, so N workers don't refresh the same entries N times
+WORKER_SLOT_ENV = "SERVER_WORKER_SLOT"
+
+# Read-only services loaded by a pre-fork master (serve.py) before it forks
+# its workers; every container in the process starts from them
+_preloaded = {}
+
+
+def preload_services(model_name: str = EMBEDDING_MODEL_NAME) -> dict:
+    """
+    Load the embedding model and, for the local backends, the vector data
+    once so forked workers share them copy-on-write. Nothing holding a
+    socket or a thread (Mongo clients, the LLM, the batcher) is created.
+    Args:
+        model_name (str): Name of the sentence-transformer model to load
+    Returns:
+        dict: The preloaded services, passed to every ServiceContainer
+    """
+    _preloaded["model"] = load_embedding_model(model_name)
+    if VECTOR_BACKEND != "mongo":
+        _preloaded["vector_backend"] = create_vector_backend(backend=VECTOR_BACKEND)
+    return _preloaded
+
+
+class ServiceContainer:
+    """
+    Process-wide holder for the expensive objects behind the API.
+
+    The embedding model, the LLM client, the Mongo client and the
+    query_cache index setup are built once at startup instead of once
+    per request, then handed to the routes through FastAPI dependencies.
+    """
+
+    def __init__(self, include_rag: bool = True, model_name: str = EMBEDDING_MODEL_NAME, mongo_client=None, async_mongo_client=None, llm=None,
+                 model=None, vector_backend=None):
+        """
+        Args:
+            include_rag (bool): Also build the LLM and the RAG pipeline.
+                The legacy app only needs the model and the Mongo client.
+            model_name (str): Name of the sentence-transformer model to load
+            mongo_client: MongoClient to use instead of connecting to MONGODB_URI
+            async_mongo_client: AsyncMongoClient to pair with mongo_client
+            llm: Chat model to use instead of the Fireworks one
+            model: Embedding model already loaded, e.g. by preload_services
+            vector_backend: Retrieval backend already loaded
+        """
+        self.include_rag = include_rag
+        self.model_name = model_name
+        self.model = model
+        self.embedder = None
+        self.query_encoder = None
+        self.mongo_client = mongo_client
+        self.async_mongo_client = async_mongo_client
+        self.executor = None
+        self.vector_backend = vector_backend
+        self.llm = llm
+        self.query_engine = None
+        self.pipeline = None
+        self.cache_warmer = None
+        self.ready = False
+        self.startup_error = None
+
+    def build(self):
+        """Load the model, create the clients and warm everything up"""
+        try:
+            if self.model is None:
+                self.model = load_embedding_model(self.model_name)
+            self.embedder = EmbeddingBatcher(
+                self.model,
+                max_batch_size=EMBED_MAX_BATCH_SIZE,
+                max_wait_ms=EMBED_BATCH_WINDOW_MS
+            )
+            self.embedder.start()
+            # Bounded pool for blocking calls made from the async routes
+            self.executor = ThreadPoolExecutor(max_workers=OFFLOAD_WORKERS, thread_name_prefix="offload")
+            self.query_encoder = QueryEmbeddingCache(
+                self.embedder,
+                max_entries=EMBEDDING_CACHE_SIZE,
+                ttl_seconds=EMBEDDING_CACHE_TTL_SECONDS,
+                executor=self.executor
+            )
+            if self.mongo_client is None and os.getenv('MONGODB_URI'):
+                self.mongo_client = get_mongodb_client()
+                # Connects lazily on the event loop of the first request
+                self.async_mongo_client = get_async_mongodb_client()
+            if self.vector_backend is None and (self.mongo_client is not None or VECTOR_BACKEND != "mongo"):
+                self.vector_backend = create_vector_backend(self.mongo_client, async_client=self.async_mongo_client)
+
+            if self.include_rag:
+                # Imported lazily: only the RAG app needs the pipeline and the LLM client
+                from ..rag_engine.cache_warmer import CacheWarmer
+                from ..rag_engine.context_builder import ContextBuilder, load_token_counter
+                from ..rag_engine.query_engine import MovieQueryEngine
+                from ..rag_engine.rag_pipeline import MovieRAGPipeline, create_llm
+
+                if self.mongo_client is None:
+                    raise RuntimeError("MongoDB not configured")
+                if self.llm is None:
+                    self.llm = create_llm()
+                self.query_engine = MovieQueryEngine(
+                    model=self.model,
+                    client=self.mongo_client,
+                    encoder=self.query_encoder,
+                    backend=self.vector_backend,
+                    executor=self.executor
+                )
+                self.pipeline = MovieRAGPipeline(
+                    query_engine=self.query_engine,
+                    llm=self.llm,
+                    client=self.mongo_client,
+                    async_client=self.async_mongo_client,
+                    context_builder=ContextBuilder(
+                        load_token_counter(CONTEXT_TOKENIZER),
+                        max_tokens=CONTEXT_TOKEN_BUDGET,
+                        min_plot_tokens=CONTEXT_MIN_PLOT_TOKENS
+                    )
+                )
+                if WARMUP_MAX_QUERIES > 0 and os.getenv(WORKER_SLOT_ENV, "0") == "0":
+                    self.cache_warmer = CacheWarmer(
+                        self.pipeline,
+                        max_queries=WARMUP_MAX_QUERIES,
+                        order=WARMUP_ORDER,
+                        refresh_window_seconds=WARMUP_REFRESH_WINDOW_SECONDS,
+                        concurrency=WARMUP_CONCURRENCY,
+                        rate_per_second=WARMUP_RATE_PER_SECOND
+                    )
+
+            self.warm_up()
+            self.ready = True
+        except Exception as e:
+            self.startup_error = str(e)
+            print(f"Error starting services: {e}")
+
+    def warm_up(self):
+        """Run a dummy encode so lazy model initialisation happens before traffic"""
+        self.model.encode(WARMUP_QUERY)
+
+    async def warm_caches(self, startup: asyncio.Future):
+        """Once ``startup`` has built the services, replay popular searches into the caches"""
+        await asyncio.shield(startup)
+        if self.ready and self.cache_warmer is not None:
+            await self.cache_warmer.run()
+
+    def close(self):
+        """Stop the batcher and release the Mongo connection pool"""
+        if self.embedder is not None:
+            self.embedder.stop()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        if self.mongo_client is not None:
+            close_mongodb_client(self.mongo_client)
+        self.ready = False
+
+    async def aclose(self):
+        """close() plus the async Mongo client, which must be closed on the loop"""
+        if self.pipeline is not None:
+            # Write the cache hits counted since the last flush
+            await self.pipeline.result_cache.aflush_hits()
+        self.close()
+        if self.async_mongo_client is not None:
+            await aclose_mongodb_client(self.async_mongo_client)
+
+    def status(self) -> dict:
+        """Readiness summary for the /ready endpoint"""
+        if self.ready:
+            return {"status": "ready"}
+        if self.startup_error:
+            return {"status": "error", "detail": self.startup_error}
+        return {"status": "warming_up"}
+
+    def stats(self) -> dict:
+        """Runtime counters for the /stats endpoint"""
+        stats = {}
+        if self.embedder is not None:
+            stats["embedding_batcher"] = self.embedder.stats()
+        if self.query_encoder is not None:
+            stats["embedding_cache"] = self.query_encoder.stats()
+        if self.pipeline is not None:
+            stats["result_cache"] = self.pipeline.result_cache.stats()
+            stats["semantic_cache"] = self.pipeline.semantic_cache.stats()
+            stats["single_flight"] = self.pipeline.single_flight.stats()
+            stats["latency_budget"] = self.pipeline.budget.stats()
+            stats["context_builder"] = self.pipeline.context_builder.stats()
+        if self.cache_warmer is not None:
+            stats["cache_warmup"] = self.cache_warmer.stats()
+        if self.mongo_client is not None:
+            stats["mongo_pool"] = pool_stats.stats()
+        memory = process_memory()
+        if memory:
+            stats["memory"] = {"pid": os.getpid(), **memory}
+        return stats
+
+
+def create_lifespan(include_rag: bool = True, **services):
+    """
+    Build a FastAPI lifespan that owns a ServiceContainer.
+
+    Loading happens in a worker thread so the server starts accepting
+    connections straight away and /ready reports progress until warm-up
+    finishes. The cache warmer then runs in the background; its progress
+    is in /stats.
+    Args:
+        include_rag (bool): Build the LLM and the RAG pipeline too
+        services: Prebuilt clients or LLM passed on to ServiceContainer,
+            e.g. the offline stand-ins of the benchmarks
+    """
+    @asynccontextmanager
+    async def lifespan(app):
+        container = ServiceContainer(include_rag=include_rag, **{**_preloaded, **services})
+        app.state.container = container
+        startup = asyncio.create_task(asyncio.to_thread(container.build))
+        warmup = asyncio.create_task(container.warm_caches(startup))
+        try:
+            yield
+        finally:
+            await startup
+            warmup.cancel()
+            await asyncio.gather(warmup, return_exceptions=True)
+            await container.aclose()
+
+    return lifespan
+
+
+def get_container(request: Request) -> ServiceContainer:
+    """Dependency returning the shared container once it is ready"""
+    container = request.app.state.container
+    if not container.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="Service is starting up. Please try again shortly."
+        )
+    return container
+
+
+def get_pipeline(container: ServiceContainer = Depends(get_container)):
+    """Dependency returning the shared MovieRAGPipeline"""
+    return container.pipeline
+
+
+def service_stats(request: Request) -> dict:
+    """Counters from the shared services, empty while starting up"""
+    return request.app.state.container.stats()
+
+
+def readiness(request: Request) -> JSONResponse:
+    """Readiness probe: 200 once warm-up has finished, 503 before"""
+    container = request.app.state.container
+    status_code = 200 if container.ready else 503
+    return JSONResponse(container.status(), status_code=status_code)
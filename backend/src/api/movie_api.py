@@ -1,15 +1,34 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
 from ..rag_engine.rag_pipeline import MovieRAGPipeline
 from typing import Optional
-from bson import ObjectId
-from fastapi.encoders import ENCODERS_BY_TYPE
 from fastapi.middleware.cors import CORSMiddleware
-from ..utils.rate_limiter import RateLimiter
+from fastapi.responses import Response
+from ..config.settings import (
+    PROFILE_DIR,
+    PROFILE_THRESHOLD_MS,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_PER_MINUTE,
+)
+from ..utils.metrics import CONTENT_TYPE, MetricsMiddleware, RequestProfiler, install_toggle_signal, render_metrics
+from ..utils.rate_limiter import RateLimitMiddleware, create_rate_limit_backend
+from .container import create_lifespan, get_pipeline, readiness, service_stats
+from .responses import json_response
+from .schemas import BatchSearchRequest
+from .sse import sse_response
+
+app = FastAPI(title="Movie RAG API", lifespan=create_lifespan(include_rag=True))
 
-# Add custom encoder for ObjectId
-ENCODERS_BY_TYPE[ObjectId] = str
+# Rate limit the search routes before they run. Added before CORS so CORS
+# stays the outermost middleware and 429s still carry its headers
+rate_limit_backend = create_rate_limit_backend(RATE_LIMIT_BACKEND, RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST)
+app.add_middleware(RateLimitMiddleware, backend=rate_limit_backend, paths=("/search",))
 
-app = FastAPI(title="Movie RAG API")
+# Request histograms and Server-Timing headers; outside the rate limiter so
+# rejected requests are measured too
+profiler = RequestProfiler(PROFILE_THRESHOLD_MS, PROFILE_DIR)
+install_toggle_signal(profiler)
+app.add_middleware(MetricsMiddleware, profiler=profiler)
 
 # Add CORS middleware
 app.add_middleware(
@@ -20,44 +39,98 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize rate limiter
-rate_limiter = RateLimiter(requests_per_minute=30)
-
 @app.get("/")
 async def root():
     """Health check endpoint"""
     return {"status": "ok", "message": "Movie RAG API is running"}
 
+@app.get("/ready")
+async def ready(request: Request):
+    """Readiness check, unready until the model and clients are warmed up"""
+    return readiness(request)
+
+@app.get("/stats")
+async def stats(request: Request):
+    """Embedding batcher, cache and rate limiter counters"""
+    return {**service_stats(request), "rate_limiter": rate_limit_backend.stats()}
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    """Prometheus metrics: stage and request histograms plus the /stats counters"""
+    stats = {**service_stats(request), "rate_limiter": rate_limit_backend.stats(), "profiler": profiler.stats()}
+    return Response(render_metrics(stats), media_type=CONTENT_TYPE)
+
 @app.get("/search")
 async def search_movies(
-    request: Request,
     query: str,
     year_start: Optional[int] = None,
     year_end: Optional[int] = None,
     genres: Optional[str] = None,
-    sort_by: str = 'relevance'
+    sort_by: str = 'relevance',
+    pipeline: MovieRAGPipeline = Depends(get_pipeline)
 ):
     """
-    Search for movies with rate limiting
+    Search for movies (rate limited by RateLimitMiddleware)
     """
     try:
-        # Get client IP
-        client_ip = request.client.host
-        
-        # Check rate limit
-        rate_limiter.check_rate_limit(client_ip)
-        
-        pipeline = MovieRAGPipeline()
         genres_list = genres.split(',') if genres else []
-        results = pipeline.get_movie_recommendations(
+        # Fully async path: nothing here blocks the event loop, and
+        # concurrent requests still share embedding batches. The result
+        # comes back as JSON bytes, so a cache hit is sent as stored.
+        payload = await pipeline.aget_movie_recommendations(
             query,
             year_start=year_start,
             year_end=year_end,
             genres=genres_list,
-            sort_by=sort_by
+            sort_by=sort_by,
+            encoded=True
         )
-        return results
+        return json_response(payload)
     except HTTPException as he:
         raise he
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/search/stream")
+async def stream_movies(
+    query: str,
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    genres: Optional[str] = None,
+    sort_by: str = 'relevance',
+    pipeline: MovieRAGPipeline = Depends(get_pipeline)
+):
+    """
+    Search for movies as Server-Sent Events: the movies arrive as soon as
+    retrieval finishes and the answer follows token by token
+    """
+    genres_list = genres.split(',') if genres else []
+    return sse_response(pipeline.astream_movie_recommendations(
+        query,
+        year_start=year_start,
+        year_end=year_end,
+        genres=genres_list,
+        sort_by=sort_by
+    ))
+
+@app.post("/search/batch")
+async def batch_search(
+    batch: BatchSearchRequest,
+    pipeline: MovieRAGPipeline = Depends(get_pipeline)
+):
+    """
+    Run many searches in one request: queries are embedded in one batch,
+    retrieved together and answered with bounded LLM parallelism. Each
+    search gets its own result or error. The batch counts as one request
+    for the rate limiter.
+    """
+    results = await pipeline.abatch_recommendations(
+        [search.model_dump() for search in batch.searches],
+        include_answers=batch.include_answers
+    )
+    return json_response({
+        "results": [
+            {"query": search.query, **result}
+            for search, result in zip(batch.searches, results)
+        ]
+    })
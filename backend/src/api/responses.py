@@ -0,0 +1,17 @@
+from fastapi.responses import Response
+from ..utils.json_codec import dumps
+from ..utils.metrics import timed
+
+
+def json_response(content, status_code: int = 200) -> Response:
+    """
+    JSON response encoded exactly once, skipping FastAPI's jsonable_encoder
+    Args:
+        content: Pre-encoded JSON bytes, sent as they are, or JSON-native
+            data encoded with the fast codec
+        status_code (int): HTTP status
+    """
+    if not isinstance(content, bytes):
+        with timed("serialize"):
+            content = dumps(content)
+    return Response(content, status_code=status_code, media_type="application/json")
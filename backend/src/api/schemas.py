@@ -0,0 +1,18 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from ..config.settings import BATCH_MAX_QUERIES
+
+
+class SearchItem(BaseModel):
+    """One search of a batch, with the same filters as GET /search"""
+    query: str
+    year_start: Optional[int] = None
+    year_end: Optional[int] = None
+    genres: Optional[List[str]] = None
+    sort_by: str = 'relevance'
+
+
+class BatchSearchRequest(BaseModel):
+    searches: List[SearchItem] = Field(..., min_length=1, max_length=BATCH_MAX_QUERIES)
+    # Write an LLM answer per search; only the RAG API has an LLM
+    include_answers: bool = True
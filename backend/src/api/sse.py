@@ -0,0 +1,31 @@
+from typing import AsyncIterator, Tuple, Union
+from fastapi.responses import StreamingResponse
+from ..utils.json_codec import dumps
+
+
+def format_sse(event: str, data) -> bytes:
+    """
+    Encode one Server-Sent Event
+    Args:
+        event (str): Event name
+        data: JSON-serializable payload; ObjectIds and datetimes become
+            strings. Bytes are taken as already-encoded JSON.
+    Returns:
+        bytes: The ``event:``/``data:`` block terminated by a blank line
+    """
+    payload = data if isinstance(data, bytes) else dumps(data)
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + payload + b"\n\n"
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Union[dict, bytes]]]) -> StreamingResponse:
+    """Stream (event, data) pairs to the client as text/event-stream"""
+    async def body():
+        async for event, data in events:
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream or caching it
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
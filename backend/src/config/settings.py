@@ -0,0 +1,120 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Embedding model used for both indexing and query encoding
+EMBEDDING_MODEL_NAME = os.getenv('EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', '384'))
+
+# Fireworks chat model used to write the answer
+LLM_MODEL_NAME = os.getenv(
+    'LLM_MODEL_NAME',
+    'accounts/fireworks/models/mixtral-8x7b-instruct'
+)
+
+# Cached query results expire after 24 hours (TTL index on query_cache)
+CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', str(24 * 60 * 60)))
+
+# Text encoded once at startup so the first real query doesn't pay for it
+WARMUP_QUERY = os.getenv('WARMUP_QUERY', 'a movie about space exploration')
+
+# Query micro-batching: hold a batch open this long or until it is full
+EMBED_BATCH_WINDOW_MS = float(os.getenv('EMBED_BATCH_WINDOW_MS', '3'))
+EMBED_MAX_BATCH_SIZE = int(os.getenv('EMBED_MAX_BATCH_SIZE', '32'))
+
+# In-process cache of query vectors keyed on normalized query text
+EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', '10000'))
+EMBEDDING_CACHE_TTL_SECONDS = float(os.getenv('EMBEDDING_CACHE_TTL_SECONDS', '3600'))
+
+# Size budget of the in-process tier in front of query_cache
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+# Serve cached answers to queries whose embeddings are this similar
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.95'))
+SEMANTIC_CACHE_SIZE = int(os.getenv('SEMANTIC_CACHE_SIZE', '2048'))
+
+# Retrieval backend: "mongo" (Atlas $vectorSearch), "exact" (local matrix),
+# "ivf" (approximate local index) or "int8"/"binary" (quantized local codes
+# with float32 rescoring)
+VECTOR_BACKEND = os.getenv('VECTOR_BACKEND', 'mongo')
+LOCAL_VECTOR_DIR = os.getenv('LOCAL_VECTOR_DIR', 'data/vectors')
+
+# Connection pool of the process-wide Mongo clients (one sync, one async)
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '50'))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '60000'))
+# How long a request waits for a free pooled connection before failing
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '2000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+# Server-side limit of aggregations that get no tighter request budget; 0 disables
+MONGO_MAX_TIME_MS = int(os.getenv('MONGO_MAX_TIME_MS', '10000'))
+
+# Search-time breadth: Atlas numCandidates and IVF lists probed per query
+VECTOR_NUM_CANDIDATES = int(os.getenv('VECTOR_NUM_CANDIDATES', '100'))
+# Filters matching at most this many movies use exact $vectorSearch
+VECTOR_EXACT_FILTER_THRESHOLD = int(os.getenv('VECTOR_EXACT_FILTER_THRESHOLD', '2000'))
+IVF_NPROBE = int(os.getenv('IVF_NPROBE', '8'))
+
+# Shortlist size of the quantized first pass, as a multiple of top_k
+QUANTIZED_RESCORE_FACTOR = int(os.getenv('QUANTIZED_RESCORE_FACTOR', '8'))
+
+# Threads for blocking work called from the async request path (encoding
+# without a batcher, local vector backends, sync cache tiers)
+OFFLOAD_WORKERS = int(os.getenv('OFFLOAD_WORKERS', '4'))
+
+# Identical searches in flight share one answer; duplicates wait this long
+SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.getenv('SINGLE_FLIGHT_TIMEOUT_SECONDS', '60'))
+
+# End-to-end latency budget of a search. Stages take their timeouts from
+# what is left; when it runs out the movies are returned with a templated
+# answer and "degraded": true. 0 disables the budget.
+REQUEST_BUDGET_SECONDS = float(os.getenv('REQUEST_BUDGET_SECONDS', '15'))
+# Client-side timeout of a single LLM request
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', '12'))
+
+# Token budget of the LLM prompt. Retrieved movies are admitted by score
+# with at least CONTEXT_MIN_PLOT_TOKENS of plot until the budget is spent;
+# 0 sends every movie in full. CONTEXT_TOKENIZER names a Hugging Face
+# tokenizer to count with; empty uses a character-based estimate.
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '1500'))
+CONTEXT_MIN_PLOT_TOKENS = int(os.getenv('CONTEXT_MIN_PLOT_TOKENS', '32'))
+CONTEXT_TOKENIZER = os.getenv('CONTEXT_TOKENIZER', '')
+
+# Startup cache warm-up from query_cache history: the WARMUP_MAX_QUERIES
+# most frequent (or most recent) searches get their embeddings and results
+# loaded in-process; those expiring within WARMUP_REFRESH_WINDOW_SECONDS are
+# recomputed. At most WARMUP_CONCURRENCY searches at once and
+# WARMUP_RATE_PER_SECOND per second, so live traffic keeps priority.
+# WARMUP_MAX_QUERIES=0 disables it.
+WARMUP_MAX_QUERIES = int(os.getenv('WARMUP_MAX_QUERIES', '200'))
+WARMUP_ORDER = os.getenv('WARMUP_ORDER', 'frequent')
+WARMUP_REFRESH_WINDOW_SECONDS = float(os.getenv('WARMUP_REFRESH_WINDOW_SECONDS', '3600'))
+WARMUP_CONCURRENCY = int(os.getenv('WARMUP_CONCURRENCY', '2'))
+WARMUP_RATE_PER_SECOND = float(os.getenv('WARMUP_RATE_PER_SECOND', '5'))
+
+# Per-client rate limit on the search routes. "memory" keeps token buckets
+# per worker; "mongo" shares one sliding-window limit across all workers.
+RATE_LIMIT_PER_MINUTE = int(os.getenv('RATE_LIMIT_PER_MINUTE', '30'))
+RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', str(RATE_LIMIT_PER_MINUTE)))
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+
+# POST /search/batch: most searches per request, and LLM answers written
+# at once for one batch
+BATCH_MAX_QUERIES = int(os.getenv('BATCH_MAX_QUERIES', '64'))
+BATCH_LLM_CONCURRENCY = int(os.getenv('BATCH_LLM_CONCURRENCY', '4'))
+
+# Requests at least this slow are profiled with cProfile and dumped to
+# PROFILE_DIR; 0 starts with the profiler off. SIGUSR2 toggles it at runtime.
+PROFILE_THRESHOLD_MS = float(os.getenv('PROFILE_THRESHOLD_MS', '0'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+
+# Pre-fork production server (serve.py): WEB_WORKERS processes forked from a
+# master that has loaded the model; 0 uses one per available CPU. The master
+# logs every worker's unique and shared memory each MEMORY_REPORT_SECONDS
+# (0 turns the report off).
+SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = int(os.getenv('SERVER_PORT', '8000'))
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', '0'))
+MEMORY_REPORT_SECONDS = float(os.getenv('MEMORY_REPORT_SECONDS', '300'))
@@ -1,8 +1,11 @@
 import json
 import os
 from datetime import datetime
+from typing import Iterator, Optional
 from bson import ObjectId
 from ..database.mongodb_client import get_mongodb_client
+from ..utils.progress import ProgressReporter
+from .jsonl import count_records, last_record, truncate_partial_line
 
 def json_serial(obj):
     """JSON serializer for objects not serializable by default json code"""
@@ -12,11 +15,31 @@ def json_serial(obj):
         return str(obj)
     raise TypeError(f"Type {type(obj)} not serializable")
 
-def load_sample_movies(limit=100):
+def iter_movies(collection, batch_size: int = 1000, limit: int = 0, after_id: Optional[str] = None) -> Iterator[dict]:
+    """
+    Stream movies from a collection in _id order
+    Args:
+        collection: Source collection (e.g. sample_mflix.movies)
+        batch_size (int): Documents fetched per cursor round trip
+        limit (int): Maximum number of movies, 0 for all
+        after_id (str): Resume after this _id
+    Returns:
+        Iterator of movie documents
+    """
+    query = {"_id": {"$gt": ObjectId(after_id)}} if after_id else {}
+    cursor = collection.find(query).sort("_id", 1).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+    yield from cursor
+
+def load_sample_movies(limit=100, output_path=os.path.join('data', 'raw', 'sample_movies.jsonl'), batch_size=1000, resume=False):
     """
     Loads sample movies from MongoDB Atlas sample dataset
     Args:
-        limit (int): Number of movies to load
+        limit (int): Number of movies to load, 0 for the whole collection
+        output_path (str): JSONL file to write, one movie per line
+        batch_size (int): Cursor batch size
+        resume (bool): Continue after the last movie already in output_path
     Returns:
         bool: Success status
     """
@@ -27,21 +50,30 @@ def load_sample_movies(limit=100):
     try:
         # Access the sample_mflix database
         sample_collection = client.sample_mflix.movies
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
         
-        # Fetch movies
-        movies = list(sample_collection.find().limit(limit))
-        
-        # Prepare output path
-        output_path = os.path.join('data', 'raw', 'sample_movies.json')
-        os.makedirs(os.path.join('data', 'raw'), exist_ok=True)
+        after_id = None
+        if resume:
+            truncate_partial_line(output_path)
+            last = last_record(output_path)
+            after_id = last["_id"] if last else None
+            if limit:
+                limit -= count_records(output_path)
+                if limit <= 0:
+                    print(f"{output_path} already holds the requested movies")
+                    return True
         
-        # Save to file with custom serializer
-        with open(output_path, 'w') as f:
-            json.dump(movies, f, indent=2, default=json_serial)
+        progress = ProgressReporter("load")
+        with open(output_path, 'a' if resume else 'w') as f:
+            for movie in iter_movies(sample_collection, batch_size, limit, after_id):
+                # Save with custom serializer, one movie per line
+                f.write(json.dumps(movie, default=json_serial) + "\n")
+                progress.update()
         
-        print(f"Successfully saved {len(movies)} movies to {output_path}")
+        progress.finish()
+        print(f"Successfully saved {progress.count} movies to {output_path}")
         return True
         
     except Exception as e:
         print(f"Error loading sample data: {e}")
-        return False
\ No newline at end of file
+        return False
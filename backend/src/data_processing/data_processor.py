@@ -1,44 +1,63 @@
 import json
 import os
+from itertools import islice
+from typing import Iterable, Iterator
+from ..utils.progress import ProgressReporter
+from .jsonl import count_records, read_records, truncate_partial_line
 
-def process_movies(input_file='data/raw/sample_movies.json', output_file='data/processed/processed_movies.json'):
+def process_movie(movie: dict) -> dict:
+    """
+    Prepare a single raw movie for vector embeddings
+    Args:
+        movie (dict): Raw movie document
+    Returns:
+        dict: Processed movie with text_for_embedding
+    """
+    return {
+        'id': movie['_id'],
+        'title': movie.get('title', ''),
+        'plot': movie.get('plot', ''),
+        'year': movie.get('year', ''),
+        'genres': movie.get('genres', []),
+        # Combine plot and other fields for rich text representation
+        'text_for_embedding': f"{movie.get('title', '')} {movie.get('plot', '')} {' '.join(movie.get('genres', []))}"
+    }
+
+def iter_processed_movies(movies: Iterable[dict]) -> Iterator[dict]:
+    """Lazily process a stream of raw movies"""
+    for movie in movies:
+        yield process_movie(movie)
+
+def process_movies(input_file='data/raw/sample_movies.jsonl', output_file='data/processed/processed_movies.jsonl', resume=False):
     """
     Process movie data to prepare it for vector embeddings
     Args:
-        input_file (str): Path to raw movie data
-        output_file (str): Path to save processed data
+        input_file (str): Path to raw movie data (JSONL, or legacy JSON array)
+        output_file (str): Path to save processed data as JSONL
+        resume (bool): Skip movies already written to output_file
     Returns:
         bool: Success status
     """
     try:
-        # Read the raw movie data
-        with open(input_file, 'r') as f:
-            movies = json.load(f)
-        
-        # Process each movie
-        processed_movies = []
-        for movie in movies:
-            processed_movie = {
-                'id': movie['_id'],
-                'title': movie.get('title', ''),
-                'plot': movie.get('plot', ''),
-                'year': movie.get('year', ''),
-                'genres': movie.get('genres', []),
-                # Combine plot and other fields for rich text representation
-                'text_for_embedding': f"{movie.get('title', '')} {movie.get('plot', '')} {' '.join(movie.get('genres', []))}"
-            }
-            processed_movies.append(processed_movie)
-        
         # Create processed directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        
+        done = 0
+        if resume:
+            truncate_partial_line(output_file)
+            done = count_records(output_file)
         
-        # Save processed data
-        with open(output_file, 'w') as f:
-            json.dump(processed_movies, f, indent=2)
+        progress = ProgressReporter("process")
+        with open(output_file, 'a' if resume else 'w') as f:
+            remaining = islice(read_records(input_file), done, None)
+            for processed_movie in iter_processed_movies(remaining):
+                f.write(json.dumps(processed_movie) + "\n")
+                progress.update()
             
-        print(f"Successfully processed {len(processed_movies)} movies")
+        progress.finish()
+        print(f"Successfully processed {progress.count} movies")
         return True
         
     except Exception as e:
         print(f"Error processing movies: {e}")
-        return False
\ No newline at end of file
+        return False
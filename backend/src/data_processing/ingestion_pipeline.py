@@ -0,0 +1,51 @@
+import argparse
+import os
+from .data_loader import load_sample_movies
+from .data_processor import process_movies
+from ..embedding_service.vector_embeddings import MovieEmbeddingService
+
+
+def run_ingestion(data_dir='data', limit=100, batch_size=64, resume=False, model_name='all-MiniLM-L6-v2', incremental=False, workers=1):
+    """
+    Load, process and embed movies as streaming stages joined by JSONL files
+    Args:
+        data_dir (str): Directory for the raw/ and processed/ JSONL files
+        limit (int): Number of movies to load, 0 for the whole collection
+        batch_size (int): Movies encoded and written per batch
+        resume (bool): Continue an interrupted run from the files on disk
+        model_name (str): Sentence-transformer model used for embeddings
+        incremental (bool): Re-embed only new or changed movies instead of
+            rebuilding embedded_movies; removed movies are only deleted
+            when the whole collection is loaded (limit 0)
+        workers (int): Embedding worker processes, 1 to encode in-process
+    Returns:
+        bool: Success status
+    """
+    raw_file = os.path.join(data_dir, 'raw', 'sample_movies.jsonl')
+    processed_file = os.path.join(data_dir, 'processed', 'processed_movies.jsonl')
+
+    if not load_sample_movies(limit=limit, output_path=raw_file, resume=resume):
+        return False
+    if not process_movies(input_file=raw_file, output_file=processed_file, resume=resume):
+        return False
+    # With a worker pool the model is only loaded in the workers
+    service = MovieEmbeddingService(model_name, load_model=workers <= 1)
+    if incremental:
+        # A limited load is a sample, so stored movies missing from it
+        # haven't necessarily been removed upstream
+        if limit:
+            print(f"Loaded at most {limit} movies: keeping stored movies missing from the input (use --limit 0 to delete them)")
+        return service.sync_embeddings(input_file=processed_file, batch_size=batch_size, workers=workers, delete_missing=not limit) is not None
+    return service.generate_embeddings(input_file=processed_file, batch_size=batch_size, resume=resume, workers=workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream movies from Mongo into embedded_movies")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--limit", type=int, default=100, help="Movies to load, 0 for all")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run")
+    parser.add_argument("--incremental", action="store_true", help="Only re-embed new or changed movies; deletes removed ones with --limit 0")
+    parser.add_argument("--workers", type=int, default=1, help="Embedding worker processes")
+    args = parser.parse_args()
+    run_ingestion(args.data_dir, args.limit, args.batch_size, args.resume, incremental=args.incremental, workers=args.workers)
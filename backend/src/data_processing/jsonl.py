@@ -0,0 +1,68 @@
+import json
+import os
+from typing import Iterable, Iterator
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """
+    Stream records from a JSONL file, one document at a time.
+    Legacy .json array files are still accepted but loaded whole.
+    """
+    if path.endswith(".json"):
+        with open(path, "r") as f:
+            yield from json.load(f)
+        return
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def count_records(path: str) -> int:
+    """Number of complete records in a JSONL file (0 if it doesn't exist)"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.endswith(b"\n") and line.strip())
+
+
+def last_record(path: str):
+    """Last complete record of a JSONL file, or None"""
+    last = None
+    if os.path.exists(path):
+        for record in read_records(path):
+            last = record
+    return last
+
+
+def truncate_partial_line(path: str) -> None:
+    """Drop a trailing half-written line left by an interrupted run"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data_end = f.seek(0, os.SEEK_END)
+        if data_end == 0:
+            return
+        f.seek(data_end - 1)
+        if f.read(1) == b"\n":
+            return
+        # Walk back to the previous newline
+        pos = data_end - 1
+        while pos > 0:
+            f.seek(pos - 1)
+            if f.read(1) == b"\n":
+                break
+            pos -= 1
+        f.truncate(pos)
+
+
+def batched(records: Iterable, batch_size: int) -> Iterator[list]:
+    """Group an iterable into lists of at most batch_size items"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
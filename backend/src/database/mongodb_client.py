@@ -1,18 +1,240 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient, monitoring
+from pymongo.operations import SearchIndexModel
 from bson import ObjectId
 import os
-from typing import Dict, Any, List
-from datetime import datetime
+import threading
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timezone
+from ..config.settings import (
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_MAX_TIME_MS,
+)
+from ..utils.metrics import MONGO_POOL_WAIT_SECONDS, MongoCommandListener
+
+
+class ConnectionPoolStats(monitoring.ConnectionPoolListener):
+    """Pool listener counting connections and checkout waits across clients"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _add(self, field: str, amount=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def connection_created(self, event):
+        self._add("open")
+
+    def connection_closed(self, event):
+        self._add("open", -1)
+
+    def connection_checked_out(self, event):
+        wait = event.duration or 0.0
+        MONGO_POOL_WAIT_SECONDS.observe(wait)
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def connection_check_out_failed(self, event):
+        self._add("checkout_failures")
+
+    def connection_checked_in(self, event):
+        self._add("checked_out", -1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_pool_size": MONGO_MAX_POOL_SIZE,
+                "open_connections": self.open,
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "mean_wait_ms": 1000 * self.wait_seconds / self.checkouts if self.checkouts else 0.0,
+                "max_wait_ms": 1000 * self.max_wait_seconds,
+            }
+
+
+# Times every driver command for the /metrics histograms
+_command_listener = MongoCommandListener()
+pool_stats = ConnectionPoolStats()
+
+# One client per kind per process; MongoClient pools are thread-safe and
+# meant to be shared, so every module goes through these accessors
+_clients = {}
+_clients_lock = threading.Lock()
+_clients_pid = os.getpid()
+
+
+def _forget_clients():
+    """
+    Drop clients inherited over fork(). Their sockets belong to the parent,
+    so the child builds fresh clients instead of closing or reusing them.
+    """
+    global _clients_lock, _clients_pid
+    _clients.clear()
+    _clients_lock = threading.Lock()
+    _clients_pid = os.getpid()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_clients)
+
+
+def client_options() -> dict:
+    """Pool size, timeouts and listeners shared by the sync and async clients"""
+    return {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [_command_listener, pool_stats],
+    }
+
+
+def _shared_client(kind: str, client_class):
+    if os.getpid() != _clients_pid:
+        _forget_clients()
+    with _clients_lock:
+        client = _clients.get(kind)
+        if client is None:
+            client = _clients[kind] = client_class(os.getenv('MONGODB_URI'), **client_options())
+        return client
+
 
 def get_mongodb_client():
-    """Get MongoDB client instance"""
+    """Get the process-wide MongoClient, created on first use"""
     try:
-        client = MongoClient(os.getenv('MONGODB_URI'))
-        return client
+        return _shared_client("sync", MongoClient)
+    except Exception as e:
+        print(f"Error connecting to MongoDB: {e}")
+        return None
+
+def get_async_mongodb_client():
+    """
+    Get the process-wide AsyncMongoClient for the async request path. It
+    binds to the event loop of its first operation, i.e. the server's loop.
+    """
+    try:
+        return _shared_client("async", AsyncMongoClient)
     except Exception as e:
         print(f"Error connecting to MongoDB: {e}")
         return None
 
+def _unregister(client) -> None:
+    with _clients_lock:
+        for kind, shared in list(_clients.items()):
+            if shared is client:
+                del _clients[kind]
+
+def close_mongodb_client(client) -> None:
+    """Close a client; the shared one is rebuilt on the next get_mongodb_client"""
+    _unregister(client)
+    client.close()
+
+async def aclose_mongodb_client(client) -> None:
+    """close_mongodb_client for an AsyncMongoClient"""
+    _unregister(client)
+    await client.close()
+
+# Search hits as JSON-native documents: _id is converted in the pipeline
+# and nothing else BSON-specific is projected
+RESULT_PROJECTION = {
+    "_id": {"$toString": "$_id"},
+    "title": 1,
+    "plot": 1,
+    "year": 1,
+    "genres": 1,
+    "score": {"$meta": "vectorSearchScore"}
+}
+
+def time_limit(max_time_ms: Optional[int] = None) -> dict:
+    """
+    aggregate() options for a server-side time limit: the caller's
+    remaining budget, else MONGO_MAX_TIME_MS
+    """
+    if max_time_ms is None:
+        return {"maxTimeMS": MONGO_MAX_TIME_MS} if MONGO_MAX_TIME_MS > 0 else {}
+    # maxTimeMS=0 means no limit to the server, so an exhausted budget sends 1
+    return {"maxTimeMS": max(int(max_time_ms), 1)}
+
+def vector_index_definition(dimensions: int = 384) -> Dict[str, Any]:
+    """Atlas vector index on embedding with year and genres as filter fields"""
+    return {
+        "fields": [
+            {
+                "type": "vector",
+                "path": "embedding",
+                "numDimensions": dimensions,
+                "similarity": "cosine"
+            },
+            {"type": "filter", "path": "year"},
+            {"type": "filter", "path": "genres"}
+        ]
+    }
+
+def create_vector_search_index(dimensions: int = 384, client=None) -> bool:
+    """
+    Create or update the vector_index on embedded_movies so year and genre
+    filters can run inside $vectorSearch
+    Args:
+        dimensions (int): Embedding size
+        client: MongoClient to use, the process-wide one if omitted
+    Returns:
+        bool: Success status
+    """
+    try:
+        client = client if client is not None else get_mongodb_client()
+        if not client:
+            return False
+        collection = client.sample_mflix.embedded_movies
+        definition = vector_index_definition(dimensions)
+        existing = [index["name"] for index in collection.list_search_indexes()]
+        if "vector_index" in existing:
+            collection.update_search_index("vector_index", definition)
+        else:
+            collection.create_search_index(SearchIndexModel(
+                definition=definition,
+                name="vector_index",
+                type="vectorSearch"
+            ))
+        return True
+    except Exception as e:
+        print(f"Error creating vector search index: {e}")
+        return False
+
 def serialize_mongodb_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
     """Convert MongoDB document to JSON-serializable format"""
     if not doc:
@@ -52,11 +274,10 @@ class MongoDBClient:
                         "numCandidates": 100,
                         "limit": limit
                     }
-                }
-            ])
-            
-            # Serialize before returning
-            return [serialize_mongodb_doc(doc) for doc in results]
+                },
+                {"$project": RESULT_PROJECTION}
+            ], **time_limit())
+            return list(results)
             
         except Exception as e:
             print(f"Error in vector search: {e}")
@@ -80,7 +301,7 @@ class MongoDBClient:
             {"query": query},
             {"$set": {
                 "result": result,
-                "timestamp": datetime.utcnow()
+                "timestamp": datetime.now(timezone.utc)
             }},
             upsert=True
         ) 
\ No newline at end of file
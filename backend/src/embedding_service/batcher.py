@@ -0,0 +1,173 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+import numpy as np
+
+_STOP = object()
+
+
+class EmbeddingBatcher:
+    """
+    Dynamic micro-batching front end for query encoding.
+
+    Concurrent callers enqueue single query strings. A background thread
+    waits for the first item, keeps collecting for up to ``max_wait_ms``
+    (or until ``max_batch_size`` items are queued), encodes the whole batch
+    with one ``model.encode`` call and resolves each caller's future.
+    ``submit_many`` enqueues a list that is always encoded in one call.
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 3.0):
+        """
+        Args:
+            model: Embedding model exposing ``encode(list_of_texts)``
+            max_batch_size (int): Largest batch handed to the model
+            max_wait_ms (float): How long to hold a batch open for more queries
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Metrics used to tune the window
+        self.batches = 0
+        self.items = 0
+        self.max_observed_batch = 0
+        self.batch_size_counts = {}
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.total_encode_time = 0.0
+
+    def start(self):
+        """Start the background batching thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="embedding-batcher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread once the queue is drained"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, text: str) -> Future:
+        """Queue a query string and return a future for its embedding"""
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        """Encode a single query, blocking until its batch has run"""
+        return self.submit(text).result()
+
+    async def encode_async(self, text: str) -> np.ndarray:
+        """Encode a single query without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def submit_many(self, texts: List[str]) -> Future:
+        """Queue a list of queries; the future resolves to a (len(texts), D) array"""
+        future = Future()
+        self._queue.put((list(texts), future, time.perf_counter()))
+        return future
+
+    async def encode_many_async(self, texts: List[str]) -> np.ndarray:
+        """Encode a list of queries in one model call without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit_many(texts))
+
+    def _collect(self, first) -> List[tuple]:
+        batch = [first]
+        size = _item_size(first)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Re-queue so the run loop exits after this batch
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+            size += _item_size(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            # Skip requests cancelled while queued; the rest can no longer
+            # be cancelled, so setting their results below is safe
+            batch = [item for item in self._collect(first) if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started = time.perf_counter()
+            texts = []
+            for text, _, _ in batch:
+                if isinstance(text, list):
+                    texts.extend(text)
+                else:
+                    texts.append(text)
+            try:
+                embeddings = self.model.encode(texts)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finished = time.perf_counter()
+
+            offset = 0
+            for text, future, _ in batch:
+                if isinstance(text, list):
+                    future.set_result(np.asarray(embeddings[offset:offset + len(text)]))
+                    offset += len(text)
+                else:
+                    future.set_result(embeddings[offset])
+                    offset += 1
+            self._record(batch, started, finished, len(texts))
+
+    def _record(self, batch, started, finished, size):
+        waits = [started - enqueued for _, _, enqueued in batch]
+        # A submit_many list waited once for every text it carries
+        weighted_wait = sum(wait * _item_size(item) for wait, item in zip(waits, batch))
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.max_observed_batch = max(self.max_observed_batch, size)
+            self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+            self.total_queue_wait += weighted_wait
+            self.max_queue_wait = max(self.max_queue_wait, max(waits))
+            self.total_encode_time += finished - started
+
+    def stats(self) -> dict:
+        """Batch-size and queue-wait metrics for tuning the window"""
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "max_observed_batch_size": self.max_observed_batch,
+                "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+                "avg_queue_wait_ms": 1000 * self.total_queue_wait / self.items if self.items else 0.0,
+                "max_queue_wait_ms": 1000 * self.max_queue_wait,
+                "avg_encode_ms": 1000 * self.total_encode_time / self.batches if self.batches else 0.0,
+                "queue_depth": self._queue.qsize(),
+            }
+
+
+def _item_size(item) -> int:
+    """Number of texts carried by a queued (text, future, enqueued) item"""
+    return len(item[0]) if isinstance(item[0], list) else 1
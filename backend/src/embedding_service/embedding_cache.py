@@ -0,0 +1,153 @@
+import asyncio
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List
+import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize query text for cache lookups
+    Args:
+        text (str): Raw query string
+    Returns:
+        str: NFKC-normalized, case-folded text with collapsed whitespace
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU/TTL cache of query vectors in front of a query encoder.
+
+    Keys are normalized query text, so "Space Movies " and "space movies"
+    share one entry regardless of the filters attached to the search.
+    Vectors are stored as read-only float32 arrays.
+    """
+
+    def __init__(self, encoder, max_entries: int = 10000, ttl_seconds: float = 3600, executor=None):
+        """
+        Args:
+            encoder: Object exposing ``encode(text)``, e.g. an EmbeddingBatcher
+            max_entries (int): Maximum number of cached vectors
+            ttl_seconds (float): Lifetime of a cached vector
+            executor: Thread pool for ``encode_async`` when the encoder has
+                no async interface of its own (the loop's default if omitted)
+        """
+        self.encoder = encoder
+        self.executor = executor
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes = 0
+
+    def get(self, text: str):
+        """Return the cached vector for a query, or None"""
+        key = normalize_query(text)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            vector, expires_at = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, text: str, vector) -> np.ndarray:
+        """Store a query vector, evicting the least recently used entries"""
+        key = normalize_query(text)
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+            self.bytes += vector.nbytes
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return vector
+
+    def encode(self, text: str) -> np.ndarray:
+        """Return the query vector from cache, encoding it on a miss"""
+        vector = self.get(text)
+        if vector is None:
+            vector = self.put(text, self.encoder.encode(normalize_query(text)))
+        return vector
+
+    async def encode_async(self, text: str) -> np.ndarray:
+        """
+        Awaitable ``encode``. A miss goes through the encoder's own
+        ``encode_async`` (the batcher thread) when it has one, otherwise
+        ``encode`` runs on the executor so the event loop never blocks on
+        the model.
+        """
+        vector = self.get(text)
+        if vector is not None:
+            return vector
+        normalized = normalize_query(text)
+        if hasattr(self.encoder, "encode_async"):
+            encoded = await self.encoder.encode_async(normalized)
+        else:
+            encoded = await asyncio.get_running_loop().run_in_executor(self.executor, self.encoder.encode, normalized)
+        return self.put(text, encoded)
+
+    async def encode_many_async(self, texts: List[str]) -> np.ndarray:
+        """
+        Vectors for several queries as one (N, D) array. Cached vectors are
+        reused and the distinct misses are encoded together in one model
+        call rather than one call per query.
+        """
+        vectors = [self.get(text) for text in texts]
+        misses = list(dict.fromkeys(normalize_query(t) for t, v in zip(texts, vectors) if v is None))
+        if misses:
+            if hasattr(self.encoder, "encode_many_async"):
+                encoded = await self.encoder.encode_many_async(misses)
+            else:
+                encoded = await asyncio.get_running_loop().run_in_executor(self.executor, self.encoder.encode, misses)
+            fresh = {text: self.put(text, vector) for text, vector in zip(misses, encoded)}
+            vectors = [fresh[normalize_query(t)] if v is None else v for t, v in zip(texts, vectors)]
+        return np.stack(vectors)
+
+    def _remove(self, key):
+        vector, _ = self._entries.pop(key)
+        self.bytes -= vector.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        """Hit/miss and memory counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "vector_bytes": self.bytes,
+            }
@@ -0,0 +1,31 @@
+import os
+import numpy as np
+from ..config.settings import EMBEDDING_DIMENSIONS
+
+
+class DummyModel:
+    """Lightweight stand-in for SentenceTransformer used when TESTING=1"""
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def encode(self, sentences, **kwargs):
+        if isinstance(sentences, str):
+            return np.zeros(self.dimensions, dtype=np.float32)
+        return np.zeros((len(sentences), self.dimensions), dtype=np.float32)
+
+
+def load_embedding_model(model_name: str):
+    """
+    Load the sentence-transformer model, or a dummy model in testing mode
+    Args:
+        model_name (str): Name of the sentence-transformer model to load
+    Returns:
+        Model exposing an ``encode`` method
+    """
+    # Avoid network downloads when running tests
+    if os.getenv("TESTING") == "1":
+        return DummyModel()
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
@@ -0,0 +1,185 @@
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable, Iterator, List, Tuple
+import numpy as np
+from ..data_processing.jsonl import batched
+
+# Per-worker state, set by _init_worker in each child process
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int):
+    """Load the model once per worker and split the cores between workers"""
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from .models import load_embedding_model
+    _worker_model = load_embedding_model(model_name)
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attach to a block owned by the parent, which alone unlinks it"""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    # Spawned workers share the parent's resource tracker, so the
+    # duplicate registration is harmless and cleared by the parent's unlink
+    return SharedMemory(name=name)
+
+
+def _worker_dimensions() -> int:
+    return int(np.asarray(_worker_model.encode(["dimension probe"])).shape[1])
+
+
+def _encode_into(slot_name: str, texts: List[str], batch_size: int) -> int:
+    """Encode texts and write the float32 result straight into a shared slot"""
+    embeddings = np.asarray(_worker_model.encode(texts, batch_size=batch_size), dtype=np.float32)
+    shm = _attach(slot_name)
+    try:
+        out = np.ndarray(embeddings.shape, dtype=np.float32, buffer=shm.buf)
+        out[:] = embeddings
+        del out
+    finally:
+        shm.close()
+    return len(texts)
+
+
+class ParallelEmbedder:
+    """
+    Multi-process bulk encoder for large catalogue builds.
+
+    The input stream is cut into shards of ``shard_size`` texts and spread
+    over a pool of worker processes, each of which loads the model once.
+    Workers write embeddings into a ring of shared-memory slots owned by
+    the parent, so only slot names and row counts cross the process
+    boundary instead of pickled vectors.
+    """
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', workers: int = None, batch_size: int = 64, shard_size: int = 1024):
+        """
+        Args:
+            model_name (str): Sentence-transformer model to load in each worker
+            workers (int): Worker processes, defaults to the number of cores
+            batch_size (int): Batch size passed to model.encode
+            shard_size (int): Texts per task handed to a worker
+        """
+        self.model_name = model_name
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.shard_size = shard_size
+        self._pool = None
+        self._slots = []
+        self.dimensions = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            # spawn avoids forking a parent with live BLAS/torch threads
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, threads)
+        )
+        self.dimensions = self._pool.submit(_worker_dimensions).result()
+        # Two shards in flight per worker keeps every worker busy
+        slot_bytes = self.shard_size * self.dimensions * 4
+        self._slots = [SharedMemory(create=True, size=slot_bytes) for _ in range(self.workers * 2)]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for slot in self._slots:
+            slot.close()
+            slot.unlink()
+        self._slots = []
+
+    def encode_shards(self, items: Iterable, text_of=lambda item: item) -> Iterator[Tuple[list, np.ndarray]]:
+        """
+        Encode a stream in order, shard by shard
+        Args:
+            items (iterable): Items to encode, e.g. processed movies
+            text_of (callable): Extracts the text to encode from an item
+        Returns:
+            Iterator of (items, embeddings) pairs. The embeddings array is a
+            view of a shared slot and is only valid until the next iteration.
+        """
+        free = deque(self._slots)
+        in_flight = deque()
+        shards = batched(items, self.shard_size)
+
+        def submit(shard):
+            slot = free.popleft()
+            texts = [text_of(item) for item in shard]
+            future = self._pool.submit(_encode_into, slot.name, texts, self.batch_size)
+            in_flight.append((shard, slot, future))
+
+        for shard in shards:
+            submit(shard)
+            if not free:
+                break
+
+        while in_flight:
+            shard, slot, future = in_flight.popleft()
+            rows = future.result()
+            yield shard, np.ndarray((rows, self.dimensions), dtype=np.float32, buffer=slot.buf)
+            free.append(slot)
+            next_shard = next(shards, None)
+            if next_shard is not None:
+                submit(next_shard)
+
+    def encode_to_file(self, texts: Iterable[str], output_path: str, count: int) -> int:
+        """Encode texts into a float32 .npy file without holding it in memory"""
+        matrix = None
+        written = 0
+        for shard, embeddings in self.encode_shards(texts):
+            if matrix is None:
+                matrix = np.lib.format.open_memmap(
+                    output_path, mode="w+", dtype=np.float32, shape=(count, self.dimensions)
+                )
+            matrix[written:written + len(shard)] = embeddings
+            written += len(shard)
+        if matrix is not None:
+            matrix.flush()
+        return written
+
+
+if __name__ == "__main__":
+    from ..data_processing.jsonl import read_records
+    from .vector_embeddings import MovieEmbeddingService
+
+    parser = argparse.ArgumentParser(description="Embed processed movies with a pool of worker processes")
+    parser.add_argument("--input", default="backend/data/processed/processed_movies.jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=64, help="model.encode batch size")
+    parser.add_argument("--shard-size", type=int, default=1024, help="Texts per worker task")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--output", default=None, help="Write a float32 .npy instead of storing in MongoDB")
+    parser.add_argument("--incremental", action="store_true", help="Only re-embed new or changed movies")
+    args = parser.parse_args()
+
+    if args.output:
+        count = sum(1 for _ in read_records(args.input))
+        texts = (movie['text_for_embedding'] for movie in read_records(args.input))
+        with ParallelEmbedder(args.model, args.workers, args.batch_size, args.shard_size) as embedder:
+            print(f"Wrote {embedder.encode_to_file(texts, args.output, count)} embeddings to {args.output}")
+    else:
+        service = MovieEmbeddingService(args.model, load_model=False)
+        if args.incremental:
+            service.sync_embeddings(args.input, batch_size=args.batch_size, workers=args.workers, shard_size=args.shard_size)
+        else:
+            service.generate_embeddings(args.input, batch_size=args.batch_size, workers=args.workers, shard_size=args.shard_size)
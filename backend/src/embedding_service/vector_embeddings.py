@@ -1,37 +1,81 @@
-from sentence_transformers import SentenceTransformer
-import json
+import hashlib
 import os
+import time
+from itertools import islice
+from pymongo import DeleteMany, ReplaceOne
 from ..database.mongodb_client import get_mongodb_client, create_vector_search_index
+from ..data_processing.jsonl import batched, read_records
+from ..utils.progress import ProgressReporter
+from .models import load_embedding_model
+
+def content_hash(text: str, model_name: str) -> str:
+    """Hash of the embedded text and the model that embedded it"""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
 
 class MovieEmbeddingService:
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
+    def __init__(self, model_name='all-MiniLM-L6-v2', load_model=True):
         """
         Initialize the embedding service with a specified model
         Args:
             model_name (str): Name of the sentence-transformer model to use
+            load_model (bool): Load the model in this process now. Parallel
+            runs only need it in the worker processes.
+        """
+        self.model_name = model_name
+        self.model = load_embedding_model(model_name) if load_model else None
+        
+    def embed_batch(self, movies, batch_size=64):
+        """Encode the text of a batch of movies in one model call"""
+        if self.model is None:
+            self.model = load_embedding_model(self.model_name)
+        texts = [movie['text_for_embedding'] for movie in movies]
+        embeddings = self.model.encode(texts, batch_size=batch_size)
+        return self.attach_embeddings(movies, embeddings)
+        
+    def attach_embeddings(self, movies, embeddings):
+        """Store vectors and content hashes on the movie documents"""
+        for movie, embedding in zip(movies, embeddings):
+            movie['embedding'] = embedding.tolist()  # Convert numpy array to list for MongoDB storage
+            # Lets sync_embeddings skip movies whose text and model are unchanged
+            movie['content_hash'] = content_hash(movie['text_for_embedding'], self.model_name)
+            movie['embedding_model'] = self.model_name
+        return movies
+        
+    def iter_embedded_batches(self, movies, batch_size=64, workers=1, shard_size=1024):
+        """
+        Yield batches of movies with embeddings attached
+        Args:
+            movies (iterable): Processed movies to encode
+            batch_size (int): Batch size passed to model.encode
+            workers (int): Worker processes; 1 encodes in this process
+            shard_size (int): Movies per worker task when workers > 1
         """
-        self.model = SentenceTransformer(model_name)
+        if workers <= 1:
+            for batch in batched(movies, batch_size):
+                yield self.embed_batch(batch, batch_size)
+            return
         
-    def generate_embeddings(self, input_file='backend/data/processed/processed_movies.json'):
+        from .parallel_embeddings import ParallelEmbedder
+        with ParallelEmbedder(self.model_name, workers, batch_size, shard_size) as embedder:
+            shards = embedder.encode_shards(movies, text_of=lambda movie: movie['text_for_embedding'])
+            for shard, embeddings in shards:
+                yield self.attach_embeddings(shard, embeddings)
+        
+    def generate_embeddings(self, input_file='backend/data/processed/processed_movies.jsonl', batch_size=64, resume=False, workers=1, shard_size=1024):
         """
         Generate embeddings for processed movie data and store in MongoDB
         Args:
-            input_file (str): Path to processed movie data. 
-            Default is production path, override for testing.
+            input_file (str): Path to processed movie data (JSONL, or legacy
+            JSON array). Default is production path, override for testing.
+            batch_size (int): Movies encoded and written per batch
+            resume (bool): Continue after the last batch recorded in the
+            checkpoint file instead of clearing the collection
+            workers (int): Encode with this many worker processes
+            shard_size (int): Movies per worker task when workers > 1
         Returns:
             bool: Success status
         """
         try:
-            # Load processed movies
-            with open(input_file, 'r') as f:
-                movies = json.load(f)
-            
-            # Generate embeddings for each movie
-            for movie in movies:
-                text = movie['text_for_embedding']
-                embedding = self.model.encode(text)
-                movie['embedding'] = embedding.tolist()  # Convert numpy array to list for MongoDB storage
-            
             # Ensure vector search index exists
             if not create_vector_search_index():
                 return False
@@ -42,16 +86,121 @@ class MovieEmbeddingService:
                 return False
                 
             collection = client.sample_mflix.embedded_movies  # Updated database and collection names
+            collection.create_index("id")
             
-            # Clear existing data
-            collection.delete_many({})
+            checkpoint_file = input_file + '.checkpoint'
+            done = 0
+            if resume and os.path.exists(checkpoint_file):
+                with open(checkpoint_file, 'r') as f:
+                    done = int(f.read().strip() or 0)
+            elif not resume:
+                # Clear existing data
+                collection.delete_many({})
             
-            # Insert movies with embeddings
-            collection.insert_many(movies)
+            progress = ProgressReporter("embed")
+            movies = islice(read_records(input_file), done, None)
+            for batch in self.iter_embedded_batches(movies, batch_size, workers, shard_size):
+                if resume:
+                    # Upserts keep a batch replayed after a crash idempotent
+                    collection.bulk_write([
+                        ReplaceOne({"id": movie['id']}, movie, upsert=True) for movie in batch
+                    ])
+                else:
+                    # Unordered inserts let the server apply the batch in parallel
+                    collection.insert_many(batch, ordered=False)
+                done += len(batch)
+                with open(checkpoint_file, 'w') as f:
+                    f.write(str(done))
+                progress.update(len(batch))
             
-            print(f"Successfully generated and stored embeddings for {len(movies)} movies")
+            progress.finish()
+            print(f"Successfully generated and stored embeddings for {progress.count} movies")
             return True
             
         except Exception as e:
             print(f"Error generating embeddings: {e}")
-            return False
\ No newline at end of file
+            return False
+            
+    def sync_embeddings(self, input_file='backend/data/processed/processed_movies.jsonl', batch_size=64, workers=1, shard_size=1024, delete_missing=True):
+        """
+        Incrementally bring embedded_movies in line with the processed movies.
+        Only new movies and movies whose text or model changed are
+        re-encoded; movies missing from the input are deleted unless the
+        input is only part of the collection. The search index stays
+        populated throughout.
+        Args:
+            input_file (str): Path to processed movie data (JSONL, or legacy JSON array)
+            batch_size (int): Movies encoded and written per batch
+            workers (int): Encode with this many worker processes
+            shard_size (int): Movies per worker task when workers > 1
+            delete_missing (bool): Delete stored movies absent from the
+                input; only safe when the input is the whole collection
+        Returns:
+            dict: Summary with skipped/inserted/updated/deleted counts and
+            an estimate of the encoding time saved, or None on error
+        """
+        try:
+            if not create_vector_search_index():
+                return None
+            client = get_mongodb_client()
+            if not client:
+                return None
+            collection = client.sample_mflix.embedded_movies
+            collection.create_index("id")
+            
+            # Only ids and hashes are loaded, never the stored vectors
+            existing = {
+                doc['id']: doc.get('content_hash')
+                for doc in collection.find({}, {'_id': 0, 'id': 1, 'content_hash': 1})
+                if 'id' in doc
+            }
+            
+            started = time.perf_counter()
+            encode_seconds = 0.0
+            seen = set()
+            summary = {"skipped": 0, "inserted": 0, "updated": 0, "deleted": 0}
+            progress = ProgressReporter("sync")
+            
+            def changed_movies():
+                for movie in read_records(input_file):
+                    seen.add(movie['id'])
+                    progress.update()
+                    if existing.get(movie['id']) == content_hash(movie['text_for_embedding'], self.model_name):
+                        summary["skipped"] += 1
+                        continue
+                    yield movie
+            
+            batches = self.iter_embedded_batches(changed_movies(), batch_size, workers, shard_size)
+            while True:
+                batch_started = time.perf_counter()
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                encode_seconds += time.perf_counter() - batch_started
+                collection.bulk_write([
+                    ReplaceOne({"id": movie['id']}, movie, upsert=True) for movie in batch
+                ], ordered=True)
+                for movie in batch:
+                    summary["updated" if movie['id'] in existing else "inserted"] += 1
+            
+            removed = [movie_id for movie_id in existing if movie_id not in seen] if delete_missing else []
+            for chunk in batched(removed, 1000):
+                result = collection.bulk_write([DeleteMany({"id": {"$in": chunk}})], ordered=True)
+                summary["deleted"] += result.deleted_count
+            
+            encoded = summary["inserted"] + summary["updated"]
+            per_movie = encode_seconds / encoded if encoded else 0.0
+            summary["seconds"] = time.perf_counter() - started
+            # Estimated from this run's own per-movie encode time
+            summary["seconds_saved"] = per_movie * summary["skipped"]
+            progress.finish()
+            print(
+                f"Sync complete: {summary['skipped']} skipped, {summary['inserted']} inserted, "
+                f"{summary['updated']} updated, {summary['deleted']} deleted, "
+                f"~{summary['seconds_saved']:.1f}s of encoding saved"
+            )
+            return summary
+            
+        except Exception as e:
+            print(f"Error syncing embeddings: {e}")
+            return None
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from ..utils.json_codec import loads
+from ..utils.rate_limiter import MemoryRateLimitBackend
+from .result_cache import _as_utc, make_filter_key
+
+
+def search_from_key(key: str) -> Optional[dict]:
+    """
+    Search parameters encoded in a make_cache_key key
+    Returns:
+        dict: query, year_start, year_end, genres and sort_by, or None for
+            keys this version can't read
+    """
+    try:
+        fields = json.loads(key)
+        return {
+            "query": fields["q"],
+            "year_start": fields["ys"],
+            "year_end": fields["ye"],
+            "genres": fields["g"],
+            "sort_by": fields["s"],
+        }
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class CacheWarmer:
+    """
+    Background warm-up of the in-process caches after a restart.
+
+    The most requested (or most recent) unexpired query_cache entries are
+    replayed: each query is encoded into the embedding cache, and its stored
+    result is promoted into the in-process result and semantic caches.
+    Entries close to their TTL expiry are recomputed instead, so popular
+    searches don't go cold a few minutes after the deploy. Work is capped
+    by a semaphore and a token bucket so live requests keep priority.
+    """
+
+    def __init__(self, pipeline, max_queries: int = 200, order: str = "frequent", refresh_window_seconds: float = 3600,
+                 concurrency: int = 2, rate_per_second: float = 5.0):
+        """
+        Args:
+            pipeline (MovieRAGPipeline): Pipeline whose caches are warmed
+            max_queries (int): Most query_cache entries to replay
+            order (str): "frequent" or "recent"
+            refresh_window_seconds (float): Entries expiring within this many
+                seconds are recomputed; 0 never recomputes
+            concurrency (int): Searches warmed at once
+            rate_per_second (float): Searches warmed per second
+        """
+        self.pipeline = pipeline
+        self.max_queries = max_queries
+        self.order = order
+        self.refresh_window_seconds = refresh_window_seconds
+        self.concurrency = concurrency
+        self.rate = MemoryRateLimitBackend(rate_per_second, max(1, concurrency))
+        self._lock = threading.Lock()
+        self.state = "pending"
+        self.total = 0
+        self.processed = 0
+        self.embedded = 0
+        self.promoted = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.started_at = None
+        self.seconds = 0.0
+        self._baseline = None
+
+    async def _throttle(self) -> None:
+        while True:
+            allowed, retry_after = self.rate.take("warmup")
+            if allowed:
+                return
+            await asyncio.sleep(retry_after)
+
+    async def run(self) -> None:
+        """Warm the caches once; safe to cancel at any point"""
+        self.state = "running"
+        self.started_at = time.monotonic()
+        try:
+            entries = await self.pipeline.result_cache.atop_entries(self.max_queries, self.order)
+            self.total = len(entries)
+            gate = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(*(self._warm(gate, entry) for entry in entries))
+            self.state = "done"
+        except asyncio.CancelledError:
+            self.state = "cancelled"
+            raise
+        except Exception as e:
+            self.state = "failed"
+            print(f"Error warming caches: {e}")
+        finally:
+            self.seconds = time.monotonic() - self.started_at
+            self._baseline = self.pipeline.result_cache.stats()
+        print(f"Cache warm-up {self.state}: {self.embedded} of {self.total} queries embedded, "
+              f"{self.promoted} results loaded, {self.refreshed} refreshed, {self.failed} failed in {self.seconds:.1f}s")
+
+    async def _warm(self, gate: asyncio.Semaphore, entry: dict) -> None:
+        search = search_from_key(entry.get("query", ""))
+        if search is None:
+            self._count("failed")
+            self._count("processed")
+            return
+        async with gate:
+            await self._throttle()
+            try:
+                query_vector = await self.pipeline.query_engine.aencode_query(search["query"])
+                self._count("embedded")
+                age = (datetime.now(timezone.utc) - _as_utc(entry["timestamp"])).total_seconds()
+                expires_in = self.pipeline.result_cache.ttl_seconds - age
+                if expires_in <= self.refresh_window_seconds:
+                    result = await self.pipeline.arefresh(**search, query_vector=query_vector)
+                    self._count("failed" if result.get("degraded") else "refreshed")
+                    return
+                payload = await self.pipeline.result_cache.aget_encoded(entry["query"], record=False)
+                if payload is None:
+                    self._count("failed")
+                    return
+                filter_key = make_filter_key(search["year_start"], search["year_end"], search["genres"], search["sort_by"])
+                self.pipeline.semantic_cache.add(search["query"], query_vector, filter_key, loads(payload))
+                self._count("promoted")
+            except Exception as e:
+                print(f"Error warming {search['query']!r}: {e}")
+                self._count("failed")
+            finally:
+                self._count("processed")
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def stats(self) -> dict:
+        """Warm-up progress and the result cache hit rate since it finished"""
+        with self._lock:
+            stats = {
+                "state": self.state,
+                "done": int(self.state == "done"),
+                "total": self.total,
+                "embedded": self.embedded,
+                "promoted": self.promoted,
+                "refreshed": self.refreshed,
+                "failed": self.failed,
+                "progress": self.processed / self.total if self.total else float(self.state == "done"),
+                "seconds": time.monotonic() - self.started_at if self.state == "running" else self.seconds,
+            }
+        if self._baseline is not None:
+            now = self.pipeline.result_cache.stats()
+            hits = sum(now[tier] - self._baseline[tier] for tier in ("l1_hits", "l2_hits"))
+            lookups = hits + now["misses"] - self._baseline["misses"]
+            stats["hit_rate_since_warmup"] = hits / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,197 @@
+import math
+import re
+import threading
+from typing import List, Optional
+from ..utils.metrics import PROMPT_TOKENS
+
+# Word runs and single punctuation marks, the units the estimate counts
+_PIECES = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+ELLIPSIS = "..."
+
+
+class EstimatingTokenCounter:
+    """
+    Tokenizer-free token count close to what BPE/SentencePiece models see:
+    one token per punctuation mark and one per four characters of a word
+    """
+
+    def count(self, text: str) -> int:
+        return sum(math.ceil(len(piece) / 4) for piece in _PIECES.findall(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of ``text`` that counts at most ``max_tokens``"""
+        used = 0
+        end = 0
+        for match in _PIECES.finditer(text):
+            used += math.ceil(len(match.group()) / 4)
+            if used > max_tokens:
+                break
+            end = match.end()
+        return text[:end]
+
+
+class TokenizerCounter:
+    """Exact counts from a local Hugging Face tokenizer, e.g. the LLM's own"""
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+
+    def count(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        ids = self.tokenizer.encode(text, add_special_tokens=False)
+        if len(ids) <= max_tokens:
+            return text
+        return self.tokenizer.decode(ids[:max_tokens], skip_special_tokens=True)
+
+
+def load_token_counter(tokenizer_name: str = ""):
+    """
+    Token counter for prompt budgets
+    Args:
+        tokenizer_name (str): Hugging Face tokenizer to load from the local
+            cache or the hub; empty uses the character-based estimate
+    Returns:
+        Counter exposing ``count`` and ``truncate``
+    """
+    if not tokenizer_name:
+        return EstimatingTokenCounter()
+    from transformers import AutoTokenizer
+    return TokenizerCounter(AutoTokenizer.from_pretrained(tokenizer_name))
+
+
+def format_movie(movie: dict, plot: Optional[str] = None) -> str:
+    """One context entry; ``plot`` replaces the movie's own plot when given"""
+    plot = movie.get('plot', '') if plot is None else plot
+    return f"Title: {movie['title']}\nPlot: {plot}\nYear: {movie.get('year', 'N/A')}\nGenres: {', '.join(movie.get('genres', []))}\n"
+
+
+class ContextBuilder:
+    """
+    Fit the retrieved movies into a prompt token budget.
+
+    Movies are admitted in order of vectorSearchScore: first every movie
+    that still fits with its title, year, genres and a short plot, then the
+    remaining budget goes to longer plots, again best score first. Plots are
+    cut at sentence boundaries where possible, and movies that don't fit
+    even in short form are left out of the prompt (not out of the results).
+    """
+
+    def __init__(self, token_counter=None, max_tokens: int = 1500, min_plot_tokens: int = 32):
+        """
+        Args:
+            token_counter: Object with ``count`` and ``truncate``, the
+                estimating counter if omitted
+            max_tokens (int): Budget of the whole prompt; 0 only counts
+            min_plot_tokens (int): Plot tokens every admitted movie gets
+        """
+        self.counter = token_counter if token_counter is not None else EstimatingTokenCounter()
+        self.max_tokens = max_tokens
+        self.min_plot_tokens = min_plot_tokens
+        self._lock = threading.Lock()
+        self.prompts = 0
+        self.prompt_tokens = 0
+        self.movies_in = 0
+        self.movies_dropped = 0
+        self.plots_truncated = 0
+
+    def shorten_plot(self, plot: str, max_tokens: int) -> str:
+        """Leading sentences of ``plot`` within ``max_tokens``, else a hard cut"""
+        if max_tokens <= 0:
+            return ""
+        if self.counter.count(plot) <= max_tokens:
+            return plot
+        budget = max_tokens - self.counter.count(ELLIPSIS)
+        kept = []
+        used = 0
+        for sentence in _SENTENCE_END.split(plot):
+            cost = self.counter.count(sentence)
+            if used + cost > budget:
+                break
+            kept.append(sentence)
+            used += cost
+        if kept:
+            return " ".join(kept)
+        return self.counter.truncate(plot, max(budget, 0)).rstrip() + ELLIPSIS
+
+    def select(self, movies: List[dict], available: Optional[int]) -> List[str]:
+        """
+        Context entries for ``movies`` within ``available`` tokens
+        Args:
+            movies (list): Retrieved movies in display order
+            available (int): Tokens left for the context, None for no limit
+        Returns:
+            list: Formatted entries in display order
+        """
+        if available is None:
+            return [format_movie(movie) for movie in movies]
+
+        ranked = sorted(range(len(movies)), key=lambda i: movies[i].get('score') or 0.0, reverse=True)
+        # Pass 1: admit movies with a short plot while they fit
+        plots = {}
+        used = 0
+        for i in ranked:
+            movie = movies[i]
+            plot = movie.get('plot') or ''
+            short = self.shorten_plot(plot, self.min_plot_tokens)
+            cost = self.counter.count(format_movie(movie, short)) + 1  # joining newline
+            if used + cost > available:
+                continue
+            plots[i] = short
+            used += cost
+
+        # Pass 2: grow the plots of the admitted movies, best score first
+        for i in ranked:
+            if i not in plots:
+                continue
+            plot = movies[i].get('plot') or ''
+            if plots[i] == plot:
+                continue
+            short_cost = self.counter.count(plots[i])
+            longer = self.shorten_plot(plot, short_cost + available - used)
+            if self.counter.count(longer) > short_cost:
+                used += self.counter.count(longer) - short_cost
+                plots[i] = longer
+
+        truncated = sum(1 for i, plot in plots.items() if plot != (movies[i].get('plot') or ''))
+        with self._lock:
+            self.movies_dropped += len(movies) - len(plots)
+            self.plots_truncated += truncated
+        return [format_movie(movies[i], plots[i]) for i in range(len(movies)) if i in plots]
+
+    def build(self, template, query: str, movies: List[dict]) -> str:
+        """
+        Render the prompt for ``query`` with as much context as the budget allows
+        Args:
+            template: Prompt template with ``context`` and ``question`` fields
+            query (str): The user's question
+            movies (list): Retrieved movies, each with its vectorSearchScore
+        Returns:
+            str: The prompt to send to the LLM
+        """
+        available = None
+        if self.max_tokens:
+            overhead = self.counter.count(template.format(context="", question=query))
+            available = max(self.max_tokens - overhead, 0)
+        entries = self.select(movies, available)
+        prompt = template.format(context="\n".join(entries), question=query)
+        tokens = self.counter.count(prompt)
+        PROMPT_TOKENS.observe(tokens)
+        with self._lock:
+            self.prompts += 1
+            self.prompt_tokens += tokens
+            self.movies_in += len(entries)
+        return prompt
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_tokens": self.max_tokens,
+                "prompts": self.prompts,
+                "mean_prompt_tokens": self.prompt_tokens / self.prompts if self.prompts else 0.0,
+                "movies_in_context": self.movies_in,
+                "movies_dropped": self.movies_dropped,
+                "plots_truncated": self.plots_truncated,
+            }
@@ -1,17 +1,63 @@
-from sentence_transformers import SentenceTransformer
-from ..database.mongodb_client import get_mongodb_client
+import asyncio
+from pymongo.errors import ExecutionTimeout
+from ..embedding_service.models import load_embedding_model
+from ..vector_store.base import VectorSearchBackend, search_many
+from ..vector_store.factory import create_vector_backend
+from ..utils.latency_budget import BudgetExceeded
+from ..utils.metrics import timed
 from typing import List, Optional
 
 class MovieQueryEngine:
-    def __init__(self, model_name='all-MiniLM-L6-v2', top_k=5):
+    def __init__(self, model_name='all-MiniLM-L6-v2', top_k=5, model=None, client=None, encoder=None, backend: VectorSearchBackend = None, executor=None):
         """
         Initialize the query engine
         Args:
             model_name (str): Name of the sentence-transformer model
             top_k (int): Number of similar movies to return
+            model: Preloaded embedding model, loaded from model_name if omitted
+            client: MongoClient to use, the process-wide one if omitted
+            encoder: Query encoder such as an EmbeddingBatcher, defaults to the model
+            backend (VectorSearchBackend): Retrieval backend, chosen by the
+                VECTOR_BACKEND setting if omitted
+            executor: Bounded thread pool for blocking work on the async path
         """
-        self.model = SentenceTransformer(model_name)
+        self.model = model if model is not None else load_embedding_model(model_name)
         self.top_k = top_k
+        self.client = client
+        self.encoder = encoder if encoder is not None else self.model
+        self.backend = backend if backend is not None else create_vector_backend(client)
+        self.executor = executor
+        
+    def encode_query(self, query: str):
+        """Encode a query with the configured (possibly cached) encoder"""
+        with timed("embed"):
+            return self.encoder.encode(query)
+        
+    async def aencode_query(self, query: str):
+        """encode_query without blocking the event loop"""
+        with timed("embed"):
+            if hasattr(self.encoder, "encode_async"):
+                return await self.encoder.encode_async(query)
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self.encoder.encode, query)
+        
+    async def aencode_queries(self, queries: List[str]):
+        """Encode several queries in one model call, returning an (N, D) array"""
+        with timed("embed"):
+            if hasattr(self.encoder, "encode_many_async"):
+                return await self.encoder.encode_many_async(queries)
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self.encoder.encode, queries)
+        
+    async def asearch_many(self, searches: List[dict], query_vectors) -> list:
+        """
+        Retrieve movies for a batch of encoded searches
+        Args:
+            searches (list): Dicts with optional year_start, year_end, genres, sort_by
+            query_vectors: One embedding per search
+        Returns:
+            list: Per search, its movies or the exception that failed it
+        """
+        with timed("vector_search"):
+            return await search_many(self.backend, query_vectors, searches, self.top_k, self.executor)
         
     def search_similar_movies(
         self, 
@@ -19,84 +65,65 @@ class MovieQueryEngine:
         year_start: Optional[int] = None,
         year_end: Optional[int] = None,
         genres: Optional[List[str]] = None,
-        sort_by: str = 'relevance'
+        sort_by: str = 'relevance',
+        query_vector=None,
+        max_time_ms: Optional[int] = None
     ):
         """
         Search for movies with filters
+        Args:
+            query_vector: Precomputed query embedding, encoded from query if omitted
+            max_time_ms (int): Time left for the search; running out raises
+                BudgetExceeded instead of returning no movies
         """
         try:
-            query_embedding = self.model.encode(query).tolist()
-            client = get_mongodb_client()
-            if not client:
-                return []
-                
-            collection = client.sample_mflix.embedded_movies
-            
-            # Start with vector search
-            pipeline = [
-                {
-                    "$vectorSearch": {
-                        "index": "vector_index",
-                        "path": "embedding",
-                        "queryVector": query_embedding,
-                        "numCandidates": 100,
-                        "limit": 100  # Increased limit to allow for filtering
-                    }
-                }
-            ]
-            
-            # Add year filter if provided
-            if year_start and year_end:
-                pipeline.append({
-                    "$match": {
-                        "year": {
-                            "$gte": year_start,
-                            "$lte": year_end
-                        }
-                    }
-                })
-            
-            # Add genres filter if provided
-            if genres and len(genres) > 0:
-                pipeline.append({
-                    "$match": {
-                        "genres": {
-                            "$in": genres
-                        }
-                    }
-                })
-            
-            # Add sorting
-            if sort_by != 'relevance':
-                sort_stage = {
-                    "year_desc": {"$sort": {"year": -1}},
-                    "year_asc": {"$sort": {"year": 1}},
-                    "title_asc": {"$sort": {"title": 1}},
-                    "title_desc": {"$sort": {"title": -1}}
-                }.get(sort_by)
-                
-                if sort_stage:
-                    pipeline.append(sort_stage)
+            if query_vector is None:
+                query_vector = self.encode_query(query)
+            with timed("vector_search"):
+                return self.backend.search(
+                    query_vector,
+                    top_k=self.top_k,
+                    year_start=year_start,
+                    year_end=year_end,
+                    genres=genres,
+                    sort_by=sort_by,
+                    max_time_ms=max_time_ms
+                )
             
-            # Add final projection
-            pipeline.append({
-                "$project": {
-                    "title": 1,
-                    "plot": 1,
-                    "year": 1,
-                    "genres": 1,
-                    "score": {
-                        "$meta": "vectorSearchScore"
-                    }
-                }
-            })
-            
-            # Limit results
-            pipeline.append({"$limit": self.top_k})
+        except ExecutionTimeout:
+            raise BudgetExceeded("vector_search")
+        except Exception as e:
+            print(f"Error searching movies: {e}")
+            return []
             
-            results = list(collection.aggregate(pipeline))
-            return results
+    async def asearch_similar_movies(
+        self, 
+        query: str,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None,
+        sort_by: str = 'relevance',
+        query_vector=None,
+        max_time_ms: Optional[int] = None
+    ):
+        """search_similar_movies on the backend's async path"""
+        try:
+            if query_vector is None:
+                query_vector = await self.aencode_query(query)
+            with timed("vector_search"):
+                return await self.backend.asearch(
+                    query_vector,
+                    top_k=self.top_k,
+                    year_start=year_start,
+                    year_end=year_end,
+                    genres=genres,
+                    sort_by=sort_by,
+                    executor=self.executor,
+                    max_time_ms=max_time_ms
+                )
             
+        except ExecutionTimeout:
+            raise BudgetExceeded("vector_search")
         except Exception as e:
             print(f"Error searching movies: {e}")
             return []
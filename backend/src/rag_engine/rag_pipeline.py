@@ -1,36 +1,48 @@
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-from langchain_fireworks import ChatFireworks
+from ..config.settings import (
+    LLM_MODEL_NAME,
+    CACHE_TTL_SECONDS,
+    RESULT_CACHE_MAX_BYTES,
+    EMBEDDING_DIMENSIONS,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_SIZE,
+    SINGLE_FLIGHT_TIMEOUT_SECONDS,
+    REQUEST_BUDGET_SECONDS,
+    LLM_TIMEOUT_SECONDS,
+    BATCH_LLM_CONCURRENCY,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_MIN_PLOT_TOKENS,
+)
 from ..database.mongodb_client import get_mongodb_client
 from .query_engine import MovieQueryEngine
+from .context_builder import ContextBuilder
+from .result_cache import ResultCache, make_cache_key, make_filter_key
+from .semantic_cache import SemanticCache
+from ..utils.single_flight import SingleFlight
+from ..utils.latency_budget import BudgetExceeded, LatencyBudget
+from ..utils.metrics import timed
+from ..utils.json_codec import dumps
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from functools import partial
 from dotenv import load_dotenv
-from datetime import datetime, timedelta, UTC
 from typing import Optional, List
 
 load_dotenv()
 
-class MovieRAGPipeline:
-    def __init__(self):
-        """Initialize the RAG pipeline with vector store and LLM"""
-        self.query_engine = MovieQueryEngine()
-        self.llm = ChatFireworks(
-            fireworks_api_key=os.getenv('FIREWORKS_API_KEY'),
-            model="accounts/fireworks/models/mixtral-8x7b-instruct"
-        )
-        self.client = get_mongodb_client()
-        self.cache_collection = self.client.sample_mflix.query_cache
-        
-        # Create TTL index for cache expiry (24 hours)
-        self.cache_collection.create_index(
-            "timestamp", 
-            expireAfterSeconds=24*60*60
-        )
-        
-        # Create prompt template
-        self.prompt_template = PromptTemplate(
-            input_variables=["context", "question"],
-            template="""You are a helpful movie expert. Use the following movie information to answer the question.
+EMPTY_QUERY_RESULT = {
+    "answer": "I couldn't find any movies. Please provide a search query.",
+    "movies": []
+}
+NO_MOVIES_RESULT = {
+    "answer": "I couldn't find any relevant movies. Please try a different query.",
+    "movies": []
+}
+ERROR_RESULT = {
+    "answer": "Sorry, I encountered an error processing your request.",
+    "movies": []
+}
+PROMPT_TEMPLATE = """You are a helpful movie expert. Use the following movie information to answer the question.
             If you don't know the answer, just say you don't know.
 
             Context: {context}
@@ -38,28 +50,116 @@ class MovieRAGPipeline:
             Question: {question}
             
             Answer: """
+TIMEOUT_ANSWER = "Sorry, the search took too long. Please try again."
+
+def fallback_answer(query: str, movies: List[dict]) -> str:
+    """Templated answer listing the retrieved movies when the LLM can't be used"""
+    if not movies:
+        return TIMEOUT_ANSWER
+    titles = ", ".join(f"{movie['title']} ({movie.get('year', 'N/A')})" for movie in movies)
+    return f"Here are the movies that best match \"{query}\": {titles}."
+
+def create_llm():
+    """Create the Fireworks chat model used to write answers"""
+    # Imported here so the pipeline runs with any injected chat model
+    # without langchain installed
+    from langchain_fireworks import ChatFireworks
+
+    return ChatFireworks(
+        fireworks_api_key=os.getenv('FIREWORKS_API_KEY'),
+        model=LLM_MODEL_NAME,
+        request_timeout=LLM_TIMEOUT_SECONDS
+    )
+
+async def _within(deadline, stage: str, awaitable):
+    """Await a stage with what is left of the deadline"""
+    try:
+        return await asyncio.wait_for(awaitable, deadline.remaining())
+    except asyncio.TimeoutError:
+        raise BudgetExceeded(stage)
+
+class MovieRAGPipeline:
+    def __init__(self, query_engine=None, llm=None, client=None, async_client=None, context_builder=None):
+        """
+        Initialize the RAG pipeline with vector store and LLM
+        Args:
+            query_engine (MovieQueryEngine): Shared query engine, built if omitted
+            llm: Shared chat model, built if omitted
+            client: MongoClient to use, the process-wide one if omitted
+            async_client: Shared AsyncMongoClient for the query_cache lookups
+                of ``aget_movie_recommendations``
+            context_builder (ContextBuilder): Fits the retrieved movies into
+                the prompt token budget, built with the estimating counter
+                if omitted
+        """
+        self.query_engine = query_engine if query_engine is not None else MovieQueryEngine()
+        self.llm = llm if llm is not None else create_llm()
+        self.client = client if client is not None else get_mongodb_client()
+        self.cache_collection = self.client.sample_mflix.query_cache
+        self.ensure_indexes()
+        self.result_cache = ResultCache(
+            self.cache_collection,
+            max_bytes=RESULT_CACHE_MAX_BYTES,
+            ttl_seconds=CACHE_TTL_SECONDS,
+            async_collection=async_client.sample_mflix.query_cache if async_client is not None else None
+        )
+        self.semantic_cache = SemanticCache(
+            EMBEDDING_DIMENSIONS,
+            threshold=SEMANTIC_CACHE_THRESHOLD,
+            max_entries=SEMANTIC_CACHE_SIZE,
+            ttl_seconds=CACHE_TTL_SECONDS
+        )
+        self.single_flight = SingleFlight(timeout=SINGLE_FLIGHT_TIMEOUT_SECONDS)
+        self.budget = LatencyBudget(REQUEST_BUDGET_SECONDS or None)
+        # Runs sync LLM calls so a request can stop waiting when its
+        # deadline passes; the call itself ends at the client's timeout
+        self.llm_executor = ThreadPoolExecutor(thread_name_prefix="llm")
+        self.context_builder = context_builder if context_builder is not None else ContextBuilder(
+            max_tokens=CONTEXT_TOKEN_BUDGET,
+            min_plot_tokens=CONTEXT_MIN_PLOT_TOKENS
+        )
+        
+        # Prompt template, filled with str.format
+        self.prompt_template = PROMPT_TEMPLATE
+        
+    def ensure_indexes(self):
+        """Create TTL index for cache expiry (24 hours) and the lookup indexes"""
+        self.cache_collection.create_index(
+            "timestamp", 
+            expireAfterSeconds=CACHE_TTL_SECONDS
         )
+        self.cache_collection.create_index("query")
+        # Popular-first scan of the startup cache warmer
+        self.cache_collection.create_index([("requests", -1), ("timestamp", -1)])
         
     def get_from_cache(self, query):
-        """Check if query result exists in cache"""
-        cache_entry = self.cache_collection.find_one({
-            "query": query,
-            "timestamp": {"$gt": datetime.now(UTC) - timedelta(hours=24)}
-        })
-        return cache_entry.get("result") if cache_entry else None
+        """Check if query result exists in the in-process or Mongo cache"""
+        with timed("cache_lookup"):
+            return self.result_cache.get(query)
         
     def save_to_cache(self, query, result):
-        """Save query result to cache"""
-        self.cache_collection.update_one(
-            {"query": query},
-            {
-                "$set": {
-                    "result": result,
-                    "timestamp": datetime.utcnow()
-                }
-            },
-            upsert=True
-        )
+        """Save query result to both cache tiers"""
+        self.result_cache.set(query, result)
+        
+    def degraded_result(self, stage: str, query: str, movies: List[dict]) -> dict:
+        """
+        Answer from whatever finished before the budget ran out. Degraded
+        results are returned but never cached.
+        """
+        if stage == "llm_error":
+            self.budget.record_llm_error()
+        else:
+            self.budget.record(stage)
+        return {
+            "answer": fallback_answer(query, movies),
+            "movies": movies,
+            "degraded": True,
+            "degraded_stage": stage
+        }
+        
+    def build_prompt(self, query: str, similar_movies: List[dict]) -> str:
+        """Format the retrieved movies as context for the LLM prompt, within the token budget"""
+        return self.context_builder.build(self.prompt_template, query, similar_movies)
         
     def get_movie_recommendations(
         self, 
@@ -70,65 +170,436 @@ class MovieRAGPipeline:
         sort_by: str = 'relevance'
     ):
         """Get movie recommendations based on user query with filters"""
+        deadline = self.budget.start()
         try:
             if not query.strip():
-                return {
-                    "answer": "I couldn't find any movies. Please provide a search query.",
-                    "movies": []
-                }
+                return dict(EMPTY_QUERY_RESULT)
                 
-            # Create cache key that includes filters
-            cache_key = f"{query}_{year_start}_{year_end}_{','.join(genres or [])}_{sort_by}"
+            # Create canonical cache key that includes filters
+            cache_key = make_cache_key(query, year_start, year_end, genres, sort_by)
             
             # Check cache first
             cached_result = self.get_from_cache(cache_key)
             if cached_result:
-                print("Cache hit!")
                 return cached_result
                 
-            # If not in cache, proceed with normal flow
-            similar_movies = self.query_engine.search_similar_movies(
+            # Identical searches already in flight share one search and one
+            # LLM call instead of each missing the cache and repeating them
+            return self.single_flight.do(
+                cache_key,
+                partial(self._generate, query, cache_key, year_start, year_end, genres, sort_by, deadline)
+            )
+            
+        except BudgetExceeded as e:
+            return self.degraded_result(e.stage, query, [])
+        except Exception as e:
+            print(f"Error in RAG pipeline: {e}")
+            return dict(ERROR_RESULT)
+            
+    def _generate(self, query, cache_key, year_start, year_end, genres, sort_by, deadline):
+        """Answer a cache miss: semantic cache, vector search, then the LLM"""
+        # Serve near-duplicate queries with the same filters from the
+        # semantic cache without calling the LLM
+        query_vector = self.query_engine.encode_query(query)
+        deadline.check("embedding")
+        filter_key = make_filter_key(year_start, year_end, genres, sort_by)
+        with timed("cache_lookup"):
+            semantic_result = self.semantic_cache.lookup(query_vector, filter_key)
+        if semantic_result:
+            return semantic_result
+            
+        # If not in cache, proceed with normal flow
+        similar_movies = self.query_engine.search_similar_movies(
+            query,
+            year_start=year_start,
+            year_end=year_end,
+            genres=genres,
+            sort_by=sort_by,
+            query_vector=query_vector,
+            max_time_ms=deadline.remaining_ms()
+        )
+        
+        if not similar_movies:
+            return dict(NO_MOVIES_RESULT)
+        if deadline.expired():
+            # No time left for the LLM: answer with the movies found
+            return self.degraded_result("vector_search", query, similar_movies)
+        
+        # Format movies for context and generate response using LLM
+        prompt = self.build_prompt(query, similar_movies)
+        
+        # Bounded by what is left of the deadline; a slow or failed LLM
+        # still returns the movies that were found
+        try:
+            with timed("llm"):
+                response = self._invoke_within(deadline, prompt)
+        except BudgetExceeded:
+            return self.degraded_result("llm", query, similar_movies)
+        except Exception as e:
+            print(f"Error calling LLM: {e}")
+            return self.degraded_result("llm_error", query, similar_movies)
+        
+        result = {
+            "answer": response,
+            "movies": similar_movies
+        }
+        
+        # Save to cache with the new cache key
+        self.save_to_cache(cache_key, result)
+        self.semantic_cache.add(query, query_vector, filter_key, result)
+        
+        return result
+            
+    def _invoke_within(self, deadline, prompt) -> str:
+        """Sync LLM answer, given up on once the deadline passes"""
+        future = self.llm_executor.submit(self.llm.invoke, prompt)
+        try:
+            return future.result(timeout=deadline.remaining()).content
+        except FuturesTimeoutError:
+            future.cancel()
+            raise BudgetExceeded("llm")
+            
+    async def aget_movie_recommendations(
+        self, 
+        query: str,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None,
+        sort_by: str = 'relevance',
+        encoded: bool = False
+    ):
+        """
+        Async get_movie_recommendations: Mongo calls go through the async
+        client, encoding runs off the event loop and the LLM is awaited
+        with ainvoke, so one slow request doesn't stall the others
+        Args:
+            encoded (bool): Return the result as JSON bytes ready for the
+                response; cache hits are returned exactly as stored
+        """
+        result = await self._arecommend(query, year_start, year_end, genres, sort_by, encoded)
+        if encoded and not isinstance(result, bytes):
+            with timed("serialize"):
+                result = dumps(result)
+        return result
+            
+    async def _arecommend(self, query, year_start, year_end, genres, sort_by, encoded):
+        embedding = None
+        deadline = self.budget.start()
+        try:
+            if not query.strip():
+                return dict(EMPTY_QUERY_RESULT)
+                
+            cache_key = make_cache_key(query, year_start, year_end, genres, sort_by)
+            
+            # Encode while the exact cache is consulted; a hit cancels the
+            # encode if the batcher hasn't picked it up yet
+            embedding = asyncio.ensure_future(self.query_engine.aencode_query(query))
+            with timed("cache_lookup"):
+                if encoded:
+                    cached_result = await self.result_cache.aget_encoded(cache_key)
+                else:
+                    cached_result = await self.result_cache.aget(cache_key)
+            if cached_result:
+                embedding.cancel()
+                return cached_result
+                
+            query_vector = await _within(deadline, "embedding", embedding)
+            return await self.single_flight.ado(
+                cache_key,
+                partial(self._agenerate, query, cache_key, year_start, year_end, genres, sort_by, query_vector, deadline)
+            )
+            
+        except BudgetExceeded as e:
+            return self.degraded_result(e.stage, query, [])
+        except Exception as e:
+            if embedding is not None and not embedding.done():
+                embedding.cancel()
+            print(f"Error in RAG pipeline: {e}")
+            return dict(ERROR_RESULT)
+            
+    async def _agenerate(self, query, cache_key, year_start, year_end, genres, sort_by, query_vector, deadline):
+        """Async _generate for an already encoded query"""
+        filter_key = make_filter_key(year_start, year_end, genres, sort_by)
+        with timed("cache_lookup"):
+            semantic_result = self.semantic_cache.lookup(query_vector, filter_key)
+        if semantic_result:
+            return semantic_result
+        return await self._aanswer(query, cache_key, filter_key, year_start, year_end, genres, sort_by, query_vector, deadline)
+        
+    async def _aanswer(self, query, cache_key, filter_key, year_start, year_end, genres, sort_by, query_vector, deadline):
+        """Retrieve and answer an encoded query, bypassing both caches, and cache the result"""
+        similar_movies = await _within(deadline, "vector_search", self.query_engine.asearch_similar_movies(
+            query,
+            year_start=year_start,
+            year_end=year_end,
+            genres=genres,
+            sort_by=sort_by,
+            query_vector=query_vector,
+            max_time_ms=deadline.remaining_ms()
+        ))
+        
+        if not similar_movies:
+            return dict(NO_MOVIES_RESULT)
+        
+        prompt = self.build_prompt(query, similar_movies)
+        try:
+            with timed("llm"):
+                response = (await _within(deadline, "llm", self.llm.ainvoke(prompt))).content
+        except BudgetExceeded:
+            return self.degraded_result("llm", query, similar_movies)
+        except Exception as e:
+            print(f"Error calling LLM: {e}")
+            return self.degraded_result("llm_error", query, similar_movies)
+        
+        result = {
+            "answer": response,
+            "movies": similar_movies
+        }
+        
+        await self.result_cache.aset(cache_key, result)
+        self.semantic_cache.add(query, query_vector, filter_key, result)
+        
+        return result
+        
+    async def arefresh(
+        self,
+        query: str,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None,
+        sort_by: str = 'relevance',
+        query_vector=None
+    ) -> dict:
+        """
+        Recompute a cached search and overwrite both cache tiers, e.g. before
+        its query_cache entry expires. Concurrent requests for the same
+        search share the refresh.
+        Args:
+            query_vector: Embedding of the query, encoded if omitted
+        Returns:
+            dict: The new result; degraded results are not cached
+        """
+        if query_vector is None:
+            query_vector = await self.query_engine.aencode_query(query)
+        cache_key = make_cache_key(query, year_start, year_end, genres, sort_by)
+        filter_key = make_filter_key(year_start, year_end, genres, sort_by)
+        deadline = self.budget.start()
+        try:
+            return await self.single_flight.ado(
+                cache_key,
+                partial(self._aanswer, query, cache_key, filter_key, year_start, year_end, genres, sort_by, query_vector, deadline)
+            )
+        except BudgetExceeded as e:
+            return self.degraded_result(e.stage, query, [])
+
+            
+    async def abatch_recommendations(
+        self,
+        searches: List[dict],
+        include_answers: bool = True,
+        llm_concurrency: int = BATCH_LLM_CONCURRENCY
+    ) -> List[dict]:
+        """
+        Answer many searches in one call.
+
+        Cached answers are served first; the remaining queries are encoded
+        in one model call, retrieved together (searches with equal filters
+        share a backend batch) and answered by at most ``llm_concurrency``
+        LLM calls at a time. A failing search doesn't fail the others.
+        Args:
+            searches (list): Dicts with query and optional year_start,
+                year_end, genres and sort_by
+            include_answers (bool): Write an LLM answer per search; False
+                returns the retrieved movies only
+            llm_concurrency (int): LLM calls in flight at once
+        Returns:
+            list: One dict per search, in order: the usual result, or
+                {"error": ...} for a search that failed
+
+        The batch shares one latency budget: if retrieval runs out of it
+        every pending search is answered degraded, and answers whose LLM
+        call doesn't finish in time keep their movies with a templated
+        answer. Every search counts as one request of the budget.
+        """
+        deadline = self.budget.start(len(searches))
+        searches = [{"year_start": None, "year_end": None, "genres": None, "sort_by": 'relevance', **search} for search in searches]
+        results = [None] * len(searches)
+        pending = []
+        for index, search in enumerate(searches):
+            if not search.get("query", "").strip():
+                results[index] = dict(EMPTY_QUERY_RESULT)
+            else:
+                pending.append(index)
+                
+        keys = {
+            index: make_cache_key(searches[index]["query"], searches[index]["year_start"], searches[index]["year_end"], searches[index]["genres"], searches[index]["sort_by"])
+            for index in pending
+        }
+        if include_answers and pending:
+            with timed("cache_lookup"):
+                cached = await asyncio.gather(*(self.result_cache.aget(keys[index]) for index in pending), return_exceptions=True)
+            for index, hit in zip(pending, cached):
+                if hit and not isinstance(hit, BaseException):
+                    results[index] = hit
+            pending = [index for index in pending if results[index] is None]
+        if not pending:
+            return results
+            
+        try:
+            vectors = await _within(deadline, "embedding", self.query_engine.aencode_queries([searches[index]["query"] for index in pending]))
+            found = await _within(deadline, "vector_search", self.query_engine.asearch_many([searches[index] for index in pending], vectors))
+        except BudgetExceeded as e:
+            for index in pending:
+                results[index] = self.degraded_result(e.stage, searches[index]["query"], [])
+            return results
+        except Exception as e:
+            print(f"Error in batch search: {e}")
+            for index in pending:
+                results[index] = {"error": str(e)}
+            return results
+            
+        gate = asyncio.Semaphore(llm_concurrency)
+        answered, answers = [], []
+        for index, query_vector, movies in zip(pending, vectors, found):
+            if isinstance(movies, BaseException):
+                print(f"Error searching movies: {movies}")
+                results[index] = {"error": str(movies)}
+            elif not include_answers:
+                results[index] = {"movies": movies}
+            elif not movies:
+                results[index] = dict(NO_MOVIES_RESULT)
+            else:
+                answered.append(index)
+                answers.append(self._abatch_answer(gate, searches[index], keys[index], query_vector, movies, deadline))
+        
+        for index, result in zip(answered, await asyncio.gather(*answers)):
+            results[index] = result
+        return results
+        
+    async def _abatch_answer(self, gate, search, cache_key, query_vector, movies, deadline):
+        """LLM answer for one batch item, limited by the batch's semaphore and deadline"""
+        query = search["query"]
+        filter_key = make_filter_key(search["year_start"], search["year_end"], search["genres"], search["sort_by"])
+        with timed("cache_lookup"):
+            semantic_result = self.semantic_cache.lookup(query_vector, filter_key)
+        if semantic_result:
+            return semantic_result
+            
+        async with gate:
+            try:
+                with timed("llm"):
+                    response = (await _within(deadline, "llm", self.llm.ainvoke(self.build_prompt(query, movies)))).content
+            except BudgetExceeded:
+                return self.degraded_result("llm", query, movies)
+            except Exception as e:
+                print(f"Error calling LLM: {e}")
+                return self.degraded_result("llm_error", query, movies)
+                
+        result = {
+            "answer": response,
+            "movies": movies
+        }
+        await self.result_cache.aset(cache_key, result)
+        self.semantic_cache.add(query, query_vector, filter_key, result)
+        return result
+            
+    async def astream_movie_recommendations(
+        self, 
+        query: str,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None,
+        sort_by: str = 'relevance'
+    ):
+        """
+        Stream recommendations as (event, data) pairs for Server-Sent Events.
+
+        A fresh answer yields ``movies`` as soon as retrieval finishes, then
+        one ``token`` per LLM chunk and ``done`` once the assembled answer is
+        cached. Cache hits and early exits yield a single ``result`` event
+        with the whole answer (exact cache hits as the stored JSON bytes);
+        failures yield ``error``.
+
+        The stream has the same latency budget as a search. Running out
+        before the LLM yields a degraded ``result``; running out while the
+        answer streams ends it with a ``done`` event marked degraded, and
+        the partial answer is not cached.
+        """
+        embedding = None
+        deadline = self.budget.start()
+        similar_movies = []
+        try:
+            if not query.strip():
+                yield "result", dict(EMPTY_QUERY_RESULT)
+                return
+                
+            cache_key = make_cache_key(query, year_start, year_end, genres, sort_by)
+            embedding = asyncio.ensure_future(self.query_engine.aencode_query(query))
+            with timed("cache_lookup"):
+                cached_payload = await self.result_cache.aget_encoded(cache_key)
+            if cached_payload is not None:
+                embedding.cancel()
+                # Already-encoded JSON, framed as is
+                yield "result", cached_payload
+                return
+                
+            query_vector = await _within(deadline, "embedding", embedding)
+            filter_key = make_filter_key(year_start, year_end, genres, sort_by)
+            with timed("cache_lookup"):
+                semantic_result = self.semantic_cache.lookup(query_vector, filter_key)
+            if semantic_result:
+                yield "result", semantic_result
+                return
+                
+            similar_movies = await _within(deadline, "vector_search", self.query_engine.asearch_similar_movies(
                 query,
                 year_start=year_start,
                 year_end=year_end,
                 genres=genres,
-                sort_by=sort_by
-            )
-            
+                sort_by=sort_by,
+                query_vector=query_vector,
+                max_time_ms=deadline.remaining_ms()
+            ))
             if not similar_movies:
-                return {
-                    "answer": "I couldn't find any relevant movies. Please try a different query.",
-                    "movies": []
-                }
-            
-            # Format movies for context
-            context = "\n".join([
-                f"Title: {movie['title']}\nPlot: {movie['plot']}\nYear: {movie.get('year', 'N/A')}\nGenres: {', '.join(movie.get('genres', []))}\n"
-                for movie in similar_movies
-            ])
-            
-            # Generate response using LLM
-            prompt = self.prompt_template.format(
-                context=context,
-                question=query
-            )
+                yield "result", dict(NO_MOVIES_RESULT)
+                return
+            yield "movies", {"movies": similar_movies}
             
-            # Updated to use invoke instead of predict (fixes deprecation warning)
-            response = self.llm.invoke(prompt).content
+            parts = []
+            stream = self.llm.astream(self.build_prompt(query, similar_movies))
+            try:
+                with timed("llm"):
+                    while True:
+                        try:
+                            chunk = await _within(deadline, "llm", stream.__anext__())
+                        except StopAsyncIteration:
+                            break
+                        if chunk.content:
+                            parts.append(chunk.content)
+                            yield "token", {"text": chunk.content}
+            except BudgetExceeded:
+                self.budget.record("llm")
+                yield "done", {"answer": "".join(parts) or fallback_answer(query, similar_movies), "degraded": True, "degraded_stage": "llm"}
+                return
+            finally:
+                if hasattr(stream, "aclose"):
+                    await stream.aclose()
             
             result = {
-                "answer": response,
+                "answer": "".join(parts),
                 "movies": similar_movies
             }
+            # Only a completed answer is cached; a dropped stream never gets here
+            await self.result_cache.aset(cache_key, result)
+            self.semantic_cache.add(query, query_vector, filter_key, result)
+            yield "done", {"answer": result["answer"]}
             
-            # Save to cache with the new cache key
-            self.save_to_cache(cache_key, result)
-            
-            return result
-            
+        except BudgetExceeded as e:
+            if embedding is not None and not embedding.done():
+                embedding.cancel()
+            yield "result", self.degraded_result(e.stage, query, similar_movies)
         except Exception as e:
+            if embedding is not None and not embedding.done():
+                embedding.cancel()
             print(f"Error in RAG pipeline: {e}")
-            return {
-                "answer": "Sorry, I encountered an error processing your request.",
-                "movies": []
-            }
\ No newline at end of file
+            yield "error", {"answer": ERROR_RESULT["answer"]}
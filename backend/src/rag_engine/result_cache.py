@@ -0,0 +1,350 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from pymongo import UpdateOne
+from ..config.settings import CACHE_TTL_SECONDS
+from ..embedding_service.embedding_cache import normalize_query
+from ..utils.json_codec import dumps, loads
+
+
+def make_filter_key(
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    genres: Optional[List[str]] = None,
+    sort_by: str = 'relevance'
+) -> str:
+    """
+    Build a canonical key for the search filters alone
+    Args:
+        year_start (int): Start of the year filter
+        year_end (int): End of the year filter
+        genres (list): Genre filter, order and duplicates are ignored
+        sort_by (str): Sort order
+    Returns:
+        str: Compact JSON key
+    """
+    return json.dumps(_filter_fields(year_start, year_end, genres, sort_by), sort_keys=True, separators=(",", ":"))
+
+
+def make_cache_key(
+    query: str,
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    genres: Optional[List[str]] = None,
+    sort_by: str = 'relevance'
+) -> str:
+    """
+    Build a canonical cache key for a search
+    Args:
+        query (str): User query, normalized for case, whitespace and unicode
+        year_start (int): Start of the year filter
+        year_end (int): End of the year filter
+        genres (list): Genre filter, order and duplicates are ignored
+        sort_by (str): Sort order
+    Returns:
+        str: Compact JSON key
+    """
+    fields = _filter_fields(year_start, year_end, genres, sort_by)
+    fields["q"] = normalize_query(query)
+    return json.dumps(fields, sort_keys=True, separators=(",", ":"))
+
+
+def _filter_fields(year_start, year_end, genres, sort_by) -> dict:
+    genre_set = sorted({g.strip() for g in (genres or []) if g and g.strip()})
+    return {"ys": year_start, "ye": year_end, "g": genre_set, "s": sort_by}
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    # pymongo returns naive datetimes that are already in UTC
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+class ResultCache:
+    """
+    Two-tier cache for search results.
+
+    L1 is an in-process LRU bounded by the encoded size of the cached
+    results. L2 is the Mongo query_cache collection. Both tiers use the same
+    TTL as the collection's TTL index, and L1 entries promoted from L2 only
+    live for the remainder of the L2 entry's lifetime.
+
+    Results are stored as encoded JSON bytes (``payload`` in query_cache),
+    so ``get_encoded`` serves a hit to the API without decoding and
+    re-encoding it; ``get`` decodes for callers that need the dict.
+
+    Hits are counted per key in-process and added to the entry's
+    ``requests`` field in batched bulk writes, which ranks entries by
+    popularity for the startup cache warmer.
+    """
+
+    def __init__(self, collection, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: int = CACHE_TTL_SECONDS, async_collection=None,
+                 hit_flush_size: int = 100, hit_flush_seconds: float = 10.0):
+        """
+        Args:
+            collection: Mongo query_cache collection used as L2 (may be None)
+            max_bytes (int): Size budget of the in-process tier
+            ttl_seconds (int): Lifetime of a cached result
+            async_collection: The same collection on an AsyncMongoClient,
+                used by ``aget``/``aset``
+            hit_flush_size (int): Hits counted in-process before they are
+                written to the ``requests`` field of their entries
+            hit_flush_seconds (float): Longest time hits stay unwritten
+        """
+        self.collection = collection
+        self.async_collection = async_collection
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hit_flush_size = hit_flush_size
+        self.hit_flush_seconds = hit_flush_seconds
+        self._pending_hits = {}
+        self._pending_total = 0
+        self._next_flush = time.monotonic() + hit_flush_seconds
+
+    def get_encoded(self, key: str, record: bool = True) -> Optional[bytes]:
+        """
+        Look the encoded result up in L1, then L2
+        Args:
+            key (str): Cache key
+            record (bool): Count the lookup in the hit statistics and the
+                entry's ``requests``; off for internal reads like warm-up
+        Returns:
+            bytes: The encoded result, None on a miss
+        """
+        payload = self._get_local(key, record)
+        if payload is None:
+            entry = None
+            now = datetime.now(timezone.utc)
+            if self.collection is not None:
+                entry = self.collection.find_one(self._fresh_filter(key, now))
+            payload = self._l2_result(key, entry, now, record)
+        if payload is not None and record:
+            self.flush_hits(self._record_hit(key))
+        return payload
+
+    def get(self, key: str):
+        """Decoded ``get_encoded``"""
+        payload = self.get_encoded(key)
+        return loads(payload) if payload is not None else None
+
+    async def aget_encoded(self, key: str, record: bool = True) -> Optional[bytes]:
+        """``get_encoded`` awaiting L2 on the async collection"""
+        payload = self._get_local(key, record)
+        if payload is None:
+            entry = None
+            now = datetime.now(timezone.utc)
+            if self.async_collection is not None:
+                entry = await self.async_collection.find_one(self._fresh_filter(key, now))
+            elif self.collection is not None:
+                entry = await asyncio.to_thread(self.collection.find_one, self._fresh_filter(key, now))
+            payload = self._l2_result(key, entry, now, record)
+        if payload is not None and record:
+            await self.aflush_hits(self._record_hit(key))
+        return payload
+
+    async def aget(self, key: str):
+        """Decoded ``aget_encoded``"""
+        payload = await self.aget_encoded(key)
+        return loads(payload) if payload is not None else None
+
+    def _record_hit(self, key: Optional[str]) -> dict:
+        """Count a hit for ``key``; returns all pending hits once a flush is due"""
+        with self._lock:
+            if key is not None:
+                self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+                self._pending_total += 1
+            now = time.monotonic()
+            due = key is None or self._pending_total >= self.hit_flush_size or now >= self._next_flush
+            if not due or not self._pending_hits:
+                return {}
+            pending = self._pending_hits
+            self._pending_hits = {}
+            self._pending_total = 0
+            self._next_flush = now + self.hit_flush_seconds
+            return pending
+
+    @staticmethod
+    def _hit_updates(pending: dict) -> list:
+        # No upsert: hits on entries that expired in the meantime are dropped
+        return [UpdateOne({"query": key}, {"$inc": {"requests": count}}) for key, count in pending.items()]
+
+    def flush_hits(self, pending: Optional[dict] = None) -> None:
+        """
+        Add counted hits to the ``requests`` field of their query_cache
+        entries in one bulk write
+        Args:
+            pending (dict): Hits per key, everything pending if omitted
+        """
+        if pending is None:
+            pending = self._record_hit(None)
+        if not pending or self.collection is None:
+            return
+        try:
+            self.collection.bulk_write(self._hit_updates(pending), ordered=False)
+        except Exception as e:
+            print(f"Error recording cache hits: {e}")
+
+    async def aflush_hits(self, pending: Optional[dict] = None) -> None:
+        """``flush_hits`` awaiting the async collection"""
+        if pending is None:
+            pending = self._record_hit(None)
+        if not pending:
+            return
+        if self.async_collection is None:
+            await asyncio.to_thread(self.flush_hits, pending)
+            return
+        try:
+            await self.async_collection.bulk_write(self._hit_updates(pending), ordered=False)
+        except Exception as e:
+            print(f"Error recording cache hits: {e}")
+
+    def set(self, key: str, result) -> bytes:
+        """Encode a result once and store it in both tiers; returns the encoding"""
+        payload = dumps(result)
+        self._put_local(key, payload, self.ttl_seconds)
+        if self.collection is not None:
+            self.collection.update_one(*self._l2_upsert(key, payload), upsert=True)
+        return payload
+
+    async def aset(self, key: str, result) -> bytes:
+        """``set`` awaiting L2 on the async collection"""
+        if self.async_collection is None:
+            if self.collection is not None:
+                return await asyncio.to_thread(self.set, key, result)
+            payload = dumps(result)
+            self._put_local(key, payload, self.ttl_seconds)
+            return payload
+        payload = dumps(result)
+        self._put_local(key, payload, self.ttl_seconds)
+        await self.async_collection.update_one(*self._l2_upsert(key, payload), upsert=True)
+        return payload
+
+    def top_entries(self, limit: int, order: str = "frequent") -> List[dict]:
+        """
+        Unexpired query_cache entries, without their payloads
+        Args:
+            limit (int): Most entries to return
+            order (str): "frequent" (most computed first, then newest) or
+                "recent" (newest first)
+        Returns:
+            list: Documents with the cache key as ``query``, ``timestamp``
+                and ``requests``, the searches served from the entry
+        """
+        if self.collection is None:
+            return []
+        return list(self.collection.find(*self._top_entries_query(), sort=self._top_entries_sort(order), limit=limit))
+
+    async def atop_entries(self, limit: int, order: str = "frequent") -> List[dict]:
+        """``top_entries`` awaiting the async collection"""
+        if self.async_collection is None:
+            return await asyncio.to_thread(self.top_entries, limit, order)
+        cursor = self.async_collection.find(*self._top_entries_query(), sort=self._top_entries_sort(order), limit=limit)
+        return await cursor.to_list(length=limit)
+
+    def _top_entries_query(self):
+        now = datetime.now(timezone.utc)
+        return (
+            {"timestamp": {"$gt": now - timedelta(seconds=self.ttl_seconds)}},
+            {"_id": 0, "query": 1, "timestamp": 1, "requests": 1}
+        )
+
+    @staticmethod
+    def _top_entries_sort(order: str) -> list:
+        if order == "recent":
+            return [("timestamp", -1)]
+        return [("requests", -1), ("timestamp", -1)]
+
+    def _fresh_filter(self, key: str, now: datetime) -> dict:
+        return {
+            "query": key,
+            "timestamp": {"$gt": now - timedelta(seconds=self.ttl_seconds)}
+        }
+
+    def _l2_upsert(self, key: str, payload: bytes):
+        return (
+            {"query": key},
+            {
+                "$set": {
+                    "payload": payload,
+                    "timestamp": datetime.now(timezone.utc)
+                }
+            }
+        )
+
+    def _l2_result(self, key: str, entry, now: datetime, record: bool = True) -> Optional[bytes]:
+        """Promote an L2 hit into L1 for its remaining lifetime, or count a miss"""
+        if entry:
+            # Entries written before payloads were stored hold the decoded result
+            payload = bytes(entry["payload"]) if "payload" in entry else dumps(entry["result"])
+            age = (now - _as_utc(entry["timestamp"])).total_seconds()
+            self._put_local(key, payload, self.ttl_seconds - age)
+            if record:
+                with self._lock:
+                    self.l2_hits += 1
+            return payload
+
+        if record:
+            with self._lock:
+                self.misses += 1
+        return None
+
+    def _get_local(self, key: str, record: bool = True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            if record:
+                self.l1_hits += 1
+            return payload
+
+    def _put_local(self, key: str, payload: bytes, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (payload, time.monotonic() + ttl)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        payload, _ = self._entries.pop(key)
+        self.bytes -= len(payload)
+
+    def stats(self) -> dict:
+        """Hit counters per tier and L1 memory usage"""
+        with self._lock:
+            lookups = self.l1_hits + self.l2_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "l1_hits": self.l1_hits,
+                "l2_hits": self.l2_hits,
+                "misses": self.misses,
+                "hit_rate": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,147 @@
+import threading
+import time
+from typing import Optional
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Answer cache matched on query meaning rather than exact text.
+
+    Each entry stores the unit-normalized query vector of a cached result in
+    one preallocated float32 matrix. A lookup scores every live entry with a
+    single matrix-vector product and serves the best match when it shares the
+    same filters and its cosine similarity reaches ``threshold``. When full,
+    the least recently used slot is overwritten.
+    """
+
+    def __init__(self, dimensions: int, threshold: float = 0.95, max_entries: int = 2048, ttl_seconds: float = 24 * 60 * 60):
+        """
+        Args:
+            dimensions (int): Size of the query vectors
+            threshold (float): Minimum cosine similarity for a hit
+            max_entries (int): Number of cached answers
+            ttl_seconds (float): Lifetime of a cached answer
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._vectors = np.zeros((max_entries, dimensions), dtype=np.float32)
+        self._filter_ids = np.full(max_entries, -1, dtype=np.int64)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._queries = [None] * max_entries
+        self._results = [None] * max_entries
+        # Filter keys of live slots only: an id is reused once no slot holds it
+        self._filter_key_ids = {}
+        self._filter_keys = {}
+        self._filter_refs = {}
+        self._free_filter_ids = []
+        self._size = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _acquire_filter_id(self, filter_key: str) -> int:
+        filter_id = self._filter_key_ids.get(filter_key)
+        if filter_id is None:
+            filter_id = self._free_filter_ids.pop() if self._free_filter_ids else len(self._filter_key_ids)
+            self._filter_key_ids[filter_key] = filter_id
+            self._filter_keys[filter_id] = filter_key
+            self._filter_refs[filter_id] = 0
+        self._filter_refs[filter_id] += 1
+        return filter_id
+
+    def _release_filter_id(self, filter_id: int) -> None:
+        if filter_id < 0:
+            return
+        self._filter_refs[filter_id] -= 1
+        if self._filter_refs[filter_id] == 0:
+            del self._filter_refs[filter_id]
+            del self._filter_key_ids[self._filter_keys.pop(filter_id)]
+            self._free_filter_ids.append(filter_id)
+
+    def lookup(self, vector, filter_key: str) -> Optional[dict]:
+        """
+        Find a cached answer for a semantically equivalent query
+        Args:
+            vector: Query embedding
+            filter_key (str): Canonical key of the search filters
+        Returns:
+            dict: Copy of the cached result with a ``cache`` metadata entry
+                holding the similarity score, or None on a miss
+        """
+        query = self._normalize(vector)
+        with self._lock:
+            self.lookups += 1
+            filter_id = self._filter_key_ids.get(filter_key)
+            if filter_id is None or self._size == 0:
+                return None
+
+            n = self._size
+            scores = self._vectors[:n] @ query
+            live = (self._filter_ids[:n] == filter_id) & (self._expires[:n] > time.monotonic())
+            scores = np.where(live, scores, -np.inf)
+            slot = int(np.argmax(scores))
+            similarity = float(scores[slot])
+            if similarity < self.threshold:
+                return None
+
+            self.hits += 1
+            self._clock += 1
+            self._last_used[slot] = self._clock
+            result = dict(self._results[slot])
+            result["cache"] = {
+                "type": "semantic",
+                "similarity": round(similarity, 4),
+                "matched_query": self._queries[slot],
+            }
+            return result
+
+    def add(self, query: str, vector, filter_key: str, result: dict) -> None:
+        """Store a freshly generated answer with its query vector"""
+        if self.max_entries <= 0:
+            return
+        normalized = self._normalize(vector)
+        with self._lock:
+            now = time.monotonic()
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                expired = np.flatnonzero(self._expires <= now)
+                if len(expired):
+                    slot = int(expired[0])
+                else:
+                    slot = int(np.argmin(self._last_used))
+                    self.evictions += 1
+
+            self._clock += 1
+            self._vectors[slot] = normalized
+            self._release_filter_id(int(self._filter_ids[slot]))
+            self._filter_ids[slot] = self._acquire_filter_id(filter_key)
+            self._expires[slot] = now + self.ttl_seconds
+            self._last_used[slot] = self._clock
+            self._queries[slot] = query
+            self._results[slot] = result
+
+    def stats(self) -> dict:
+        """Semantic hit-rate counters"""
+        with self._lock:
+            return {
+                "entries": self._size,
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "evictions": self.evictions,
+            }
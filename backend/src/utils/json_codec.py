@@ -0,0 +1,41 @@
+import json
+from datetime import datetime
+from bson import ObjectId
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # the standard library encoder is correct, just slower
+    orjson = None
+
+
+def _default(value):
+    """Encode the non-JSON types that can still reach a response"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(obj) -> bytes:
+    """
+    Encode to compact UTF-8 JSON in one pass
+    Args:
+        obj: JSON-native data; ObjectIds, datetimes and numpy scalars are
+            converted on the way
+    Returns:
+        bytes: The encoded document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data):
+    """Decode JSON bytes or text"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Optional
+
+# Request stages a budget can run out in, in pipeline order
+STAGES = ("embedding", "vector_search", "llm")
+
+
+class BudgetExceeded(Exception):
+    """Raised when a request's deadline passes during ``stage``"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"Latency budget exhausted during {stage}")
+
+
+class Deadline:
+    """Absolute point in time by which one request must answer"""
+
+    def __init__(self, seconds: Optional[float]):
+        """
+        Args:
+            seconds (float): Time allowed from now, None for no deadline
+        """
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), None without a deadline"""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def remaining_ms(self) -> Optional[int]:
+        remaining = self.remaining()
+        return None if remaining is None else int(remaining * 1000)
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, stage: str) -> None:
+        """Raise BudgetExceeded if the deadline passed before ``stage`` finished"""
+        if self.expired():
+            raise BudgetExceeded(stage)
+
+
+class LatencyBudget:
+    """
+    Per-request deadline factory with exhaustion counters.
+
+    Each request takes a fresh Deadline from ``start``; stages size their
+    timeouts from what is left of it, and the pipeline records the stage
+    in which a request ran out of time and was answered degraded.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Args:
+            seconds (float): End-to-end budget of a request, None to disable
+        """
+        self.seconds = seconds
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.exhausted = {stage: 0 for stage in STAGES}
+        self.llm_errors = 0
+
+    def start(self, requests: int = 1) -> Deadline:
+        """
+        Deadline for a request
+        Args:
+            requests (int): Searches sharing the deadline, e.g. a batch,
+                each counted as one request
+        """
+        with self._lock:
+            self.requests += requests
+        return Deadline(self.seconds)
+
+    def record(self, stage: str) -> None:
+        """Count a request degraded because its budget ran out in ``stage``"""
+        with self._lock:
+            self.exhausted[stage] = self.exhausted.get(stage, 0) + 1
+
+    def record_llm_error(self) -> None:
+        """Count a request degraded because the LLM call failed outright"""
+        with self._lock:
+            self.llm_errors += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            degraded = sum(self.exhausted.values()) + self.llm_errors
+            return {
+                "budget_seconds": self.seconds,
+                "requests": self.requests,
+                "exhausted": dict(self.exhausted),
+                "llm_errors": self.llm_errors,
+                "degraded_rate": degraded / self.requests if self.requests else 0.0,
+            }
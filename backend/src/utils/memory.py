@@ -0,0 +1,63 @@
+import os
+from typing import List
+
+# smaps_rollup fields, in kB, summed into each reported figure
+_FIELDS = {
+    "rss_mb": ("Rss",),
+    "pss_mb": ("Pss",),
+    "shared_mb": ("Shared_Clean", "Shared_Dirty"),
+    "unique_mb": ("Private_Clean", "Private_Dirty"),
+    "swap_mb": ("Swap",),
+}
+
+
+def parse_smaps_rollup(text: str) -> dict:
+    """
+    Memory figures from the contents of /proc/<pid>/smaps_rollup
+    Returns:
+        dict: rss_mb, pss_mb (shared pages split between their users),
+            shared_mb, unique_mb (pages no other process maps) and swap_mb
+    """
+    kb = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+            kb[parts[0][:-1]] = int(parts[1])
+    return {name: sum(kb.get(field, 0) for field in fields) / 1024 for name, fields in _FIELDS.items()}
+
+
+def process_memory(pid="self") -> dict:
+    """
+    Unique versus shared memory of a process
+    Args:
+        pid: Process id, "self" for the calling process
+    Returns:
+        dict: See parse_smaps_rollup; empty where /proc has no smaps_rollup
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            return parse_smaps_rollup(f.read())
+    except OSError:
+        return {}
+
+
+def memory_report(pids: List[int]) -> str:
+    """One line per process plus the total the processes really take up"""
+    lines = [f"{'pid':>8} {'rss':>9} {'unique':>9} {'shared':>9} {'pss':>9}  (MB)"]
+    total_pss = 0.0
+    for pid in pids:
+        usage = process_memory(pid)
+        if not usage:
+            lines.append(f"{pid:>8} {'unavailable':>9}")
+            continue
+        total_pss += usage["pss_mb"]
+        lines.append(f"{pid:>8} {usage['rss_mb']:>9.1f} {usage['unique_mb']:>9.1f} {usage['shared_mb']:>9.1f} {usage['pss_mb']:>9.1f}")
+    lines.append(f"Total PSS of {len(pids)} processes: {total_pss:.1f} MB")
+    return "\n".join(lines)
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
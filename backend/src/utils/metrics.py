@@ -0,0 +1,329 @@
+import bisect
+import cProfile
+import os
+import re
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Sequence
+from pymongo import monitoring
+
+# Upper bounds in seconds, from a cache hit to a slow LLM answer
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _metric_name(text: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", text)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus text format.
+
+    Observations are kept per label set as bucket counts, a sum and a count,
+    so recording is a binary search and three additions under a lock.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labelvalues, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames + ("le",), labelvalues + (le,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """Value that goes up and down, such as requests in flight"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labelvalues) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, amount: float = 1, *labelvalues) -> None:
+        self.inc(-amount, *labelvalues)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            values = list(self._values.items())
+        for labelvalues, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "movie_search_stage_duration_seconds",
+    "Time spent in one stage of a search (embed, cache_lookup, vector_search, llm, serialize)",
+    ("stage",)
+)
+REQUEST_SECONDS = Histogram(
+    "movie_search_http_request_duration_seconds",
+    "End-to-end HTTP request time",
+    ("method", "route", "status")
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "movie_search_mongodb_command_duration_seconds",
+    "MongoDB command round trips as reported by the driver",
+    ("command", "outcome")
+)
+MONGO_POOL_WAIT_SECONDS = Histogram(
+    "movie_search_mongodb_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the Mongo pool"
+)
+PROMPT_TOKENS = Histogram(
+    "movie_search_llm_prompt_tokens",
+    "Tokens in each prompt sent to the LLM, after the context budget",
+    buckets=(128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096, 8192)
+)
+IN_FLIGHT = Gauge("movie_search_http_requests_in_flight", "HTTP requests being handled")
+
+METRICS = (STAGE_SECONDS, REQUEST_SECONDS, MONGO_COMMAND_SECONDS, MONGO_POOL_WAIT_SECONDS, PROMPT_TOKENS, IN_FLIGHT)
+
+# Stage durations of the request being handled, for its Server-Timing header
+_request_timings: ContextVar[Optional[dict]] = ContextVar("request_timings", default=None)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Observe a stage duration and add it to the current request's timings"""
+    STAGE_SECONDS.observe(seconds, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str):
+    """Time the enclosed block as ``stage``; works around ``await`` too"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def server_timing(timings: dict, total: float) -> str:
+    """Server-Timing header value with durations in milliseconds"""
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def render_metrics(stats: Optional[dict] = None) -> str:
+    """
+    Prometheus exposition of the registered metrics
+    Args:
+        stats (dict): Component counters as served by /stats; every numeric
+            value is exported as a gauge named after its component, e.g.
+            result_cache.hit_rate as movie_search_result_cache_hit_rate
+    Returns:
+        str: text/plain exposition format 0.0.4
+    """
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for component, values in (stats or {}).items():
+        for key, value in values.items():
+            name = _metric_name(f"movie_search_{component}_{key}")
+            if isinstance(value, dict):
+                samples = [(f'{{key="{_escape(k)}"}}', v) for k, v in value.items()]
+            else:
+                samples = [("", value)]
+            samples = [(labels, v) for labels, v in samples if isinstance(v, (int, float)) and not isinstance(v, bool)]
+            if samples:
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f"{name}{labels} {v}" for labels, v in samples)
+    return "\n".join(lines) + "\n"
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Driver event listener timing every Mongo command"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, event.command_name, "success")
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, event.command_name, "failure")
+
+
+class RequestProfiler:
+    """
+    Opt-in cProfile hook for slow requests.
+
+    While enabled, one request at a time is profiled and its stats are
+    written to ``directory`` if it took at least ``threshold_ms``. cProfile
+    follows the event loop thread, so work of other requests interleaved
+    with the profiled one shows up in its dump as well.
+    """
+
+    def __init__(self, threshold_ms: float = 0, directory: str = "profiles"):
+        """
+        Args:
+            threshold_ms (float): Requests at least this slow are dumped;
+                0 leaves the profiler disabled
+            directory (str): Where .prof files are written
+        """
+        self.threshold_ms = threshold_ms
+        self.directory = directory
+        self.enabled = threshold_ms > 0
+        self._busy = threading.Lock()
+        self.profiled = 0
+        self.dumps = 0
+
+    def enable(self, threshold_ms: Optional[float] = None) -> None:
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def toggle(self, *_) -> None:
+        """Flip the profiler on or off, usable as a signal handler"""
+        self.enabled = not self.enabled
+        print(f"Request profiler {'enabled' if self.enabled else 'disabled'} (threshold {self.threshold_ms} ms)")
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Profile the current request, None when disabled or already busy"""
+        if not self.enabled or not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish(self, profile: cProfile.Profile, seconds: float, label: str) -> Optional[str]:
+        """Stop profiling and dump the stats if the request was slow enough"""
+        profile.disable()
+        self._busy.release()
+        self.profiled += 1
+        if seconds * 1000 < self.threshold_ms:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{_metric_name(label.strip('/')) or 'root'}-{int(seconds * 1000)}ms.prof")
+        profile.dump_stats(path)
+        self.dumps += 1
+        return path
+
+    def stats(self) -> dict:
+        return {
+            "enabled": int(self.enabled),
+            "threshold_ms": self.threshold_ms,
+            "profiled": self.profiled,
+            "dumps": self.dumps,
+        }
+
+
+def install_toggle_signal(profiler: RequestProfiler) -> bool:
+    """Let SIGUSR2 switch the profiler on and off; False where unsupported"""
+    if not hasattr(signal, "SIGUSR2"):
+        return False
+    try:
+        signal.signal(signal.SIGUSR2, profiler.toggle)
+    except ValueError:
+        # Signal handlers can only be installed from the main thread
+        return False
+    return True
+
+
+def route_label(scope) -> str:
+    """Route template of a request, so metric labels stay bounded"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request durations and in-flight requests,
+    adding a Server-Timing header with the stage timings of each response
+    and running the optional request profiler.
+    """
+
+    def __init__(self, app, profiler: Optional[RequestProfiler] = None):
+        """
+        Args:
+            app: The wrapped ASGI application
+            profiler (RequestProfiler): Slow-request profiler, if any
+        """
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing(timings, time.perf_counter() - started)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        profile = self.profiler.start() if self.profiler is not None else None
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            REQUEST_SECONDS.observe(elapsed, scope["method"], route_label(scope), str(status))
+            if profile is not None:
+                self.profiler.finish(profile, elapsed, scope["path"])
+            _request_timings.reset(token)
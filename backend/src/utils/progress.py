@@ -0,0 +1,36 @@
+import time
+
+
+class ProgressReporter:
+    """Prints document counts and throughput (docs/s) for one pipeline stage"""
+
+    def __init__(self, stage: str, every: int = 1000):
+        """
+        Args:
+            stage (str): Stage name shown in the log lines
+            every (int): Report after roughly this many documents
+        """
+        self.stage = stage
+        self.every = every
+        self.count = 0
+        self.started = time.perf_counter()
+        self._next_report = every
+
+    def update(self, n: int = 1) -> None:
+        self.count += n
+        if self.count >= self._next_report:
+            self._next_report = self.count + self.every
+            print(f"[{self.stage}] {self.count} docs, {self.rate:.1f} docs/s")
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.count / self.elapsed if self.elapsed > 0 else 0.0
+
+    def finish(self) -> dict:
+        """Print and return the stage summary"""
+        print(f"[{self.stage}] done: {self.count} docs in {self.elapsed:.1f}s ({self.rate:.1f} docs/s)")
+        return {"stage": self.stage, "docs": self.count, "seconds": self.elapsed, "docs_per_second": self.rate}
@@ -1,32 +1,274 @@
-from fastapi import HTTPException
-from datetime import datetime, timedelta
-from collections import defaultdict
+import asyncio
+import json
+import threading
 import time
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Tuple
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+RATE_LIMIT_DETAIL = "Too many requests. Please try again in a minute."
+
+
+class RateLimitBackend:
+    """
+    Where rate-limit state lives.
+
+    ``hit`` records one request for a client and returns whether it is
+    allowed and, if not, how many seconds until it would be.
+    """
+
+    async def hit(self, key: str) -> Tuple[bool, float]:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process token buckets.
+
+    Each client holds two floats, so a check is O(1) in time and memory
+    no matter how many requests it sent. Buckets idle long enough to have
+    refilled completely are indistinguishable from new ones and are swept
+    every ``sweep_interval`` seconds.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int, sweep_interval: float = 60.0, clock=time.monotonic):
+        """
+        Args:
+            rate_per_second (float): Sustained requests per second per client
+            burst (int): Requests a client may send back to back
+            sweep_interval (float): Seconds between idle-client sweeps
+            clock (callable): Monotonic time source
+        """
+        self.rate = rate_per_second
+        self.burst = burst
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._next_sweep = clock() + sweep_interval
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def take(self, key: str) -> Tuple[bool, float]:
+        """Spend one token for ``key``; returns (allowed, retry_after_seconds)"""
+        now = self.clock()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(self.burst, now)
+            else:
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                self.allowed += 1
+                return True, 0.0
+            self.rejected += 1
+            return False, (1 - bucket.tokens) / self.rate
+
+    async def hit(self, key: str) -> Tuple[bool, float]:
+        return self.take(key)
+
+    def _sweep(self, now: float) -> None:
+        refill_seconds = self.burst / self.rate
+        idle = [key for key, bucket in self._buckets.items() if now - bucket.updated >= refill_seconds]
+        for key in idle:
+            del self._buckets[key]
+        self.evicted += len(idle)
+        self._next_sweep = now + self.sweep_interval
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "clients": len(self._buckets),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evicted": self.evicted,
+            }
+
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """
+    Sliding-window counter shared by every worker through one collection.
+
+    Requests are counted per client in fixed windows with an atomic
+    upsert-and-increment; the limit applies to the current count plus the
+    previous window's count weighted by how much of it still overlaps the
+    sliding window. Counter documents expire through a TTL index. The same
+    two operations map onto Redis as INCR + EXPIRE and GET.
+    """
+
+    def __init__(self, limit: int, window_seconds: float = 60.0, collection=None, clock=time.time):
+        """
+        Args:
+            limit (int): Requests allowed per client per window
+            window_seconds (float): Window length
+            collection: AsyncCollection holding the counters, the
+                sample_mflix.rate_limits collection if omitted
+            clock (callable): Wall-clock time source shared by all workers
+        """
+        self.limit = limit
+        self.window = window_seconds
+        self.clock = clock
+        self._collection = collection
+        self._indexed = False
+        self.allowed = 0
+        self.rejected = 0
+        self.errors = 0
+
+    async def _counters(self):
+        if self._collection is None:
+            from ..database.mongodb_client import get_async_mongodb_client
+            self._collection = get_async_mongodb_client().sample_mflix.rate_limits
+        if not self._indexed:
+            await self._collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+        return self._collection
+
+    async def hit(self, key: str) -> Tuple[bool, float]:
+        now = self.clock()
+        window = int(now // self.window)
+        elapsed = now - window * self.window
+        try:
+            collection = await self._counters()
+            current, previous = await asyncio.gather(
+                collection.find_one_and_update(
+                    {"_id": f"{key}:{window}"},
+                    {
+                        "$inc": {"count": 1},
+                        # Kept until the next window no longer looks back at it
+                        "$setOnInsert": {"expires_at": datetime.fromtimestamp((window + 2) * self.window, timezone.utc)}
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                ),
+                collection.find_one({"_id": f"{key}:{window - 1}"})
+            )
+        except Exception as e:
+            # Fail open: an unavailable counter store must not take the API down
+            print(f"Error checking rate limit: {e}")
+            self.errors += 1
+            return True, 0.0
+
+        current_count = current["count"]
+        previous_count = previous["count"] if previous else 0
+        overlap = 1 - elapsed / self.window
+        if previous_count * overlap + current_count <= self.limit:
+            self.allowed += 1
+            return True, 0.0
+
+        self.rejected += 1
+        if current_count > self.limit or previous_count == 0:
+            return False, self.window - elapsed
+        # Time until the previous window's weight drops enough
+        wait = self.window * (1 - (self.limit - current_count) / previous_count) - elapsed
+        return False, max(wait, 0.0)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "mongo",
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+def create_rate_limit_backend(backend: str, requests_per_minute: int, burst: Optional[int] = None) -> RateLimitBackend:
+    """
+    Build the configured backend
+    Args:
+        backend (str): "memory" for per-process buckets, "mongo" to share
+            one limit across workers
+        requests_per_minute (int): Sustained limit per client
+        burst (int): Back-to-back requests allowed by the memory backend,
+            defaults to the per-minute limit
+    """
+    if backend == "memory":
+        return MemoryRateLimitBackend(requests_per_minute / 60.0, burst or requests_per_minute)
+    if backend == "mongo":
+        return MongoRateLimitBackend(requests_per_minute, 60.0)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+def client_ip(scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware answering 429 before a limited route runs.
+
+    Only paths starting with one of ``paths`` are limited, so health and
+    readiness probes are never throttled.
+    """
+
+    def __init__(self, app, backend: RateLimitBackend, paths: Sequence[str] = ("/search",), key_func=client_ip):
+        """
+        Args:
+            app: The wrapped ASGI application
+            backend (RateLimitBackend): Where the counters live
+            paths (sequence): Path prefixes to limit
+            key_func (callable): Maps the ASGI scope to a client key
+        """
+        self.app = app
+        self.backend = backend
+        self.paths = tuple(paths)
+        self.key_func = key_func
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        allowed, retry_after = await self.backend.hit(self.key_func(scope))
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": RATE_LIMIT_DETAIL}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", str(max(1, int(retry_after + 0.999))).encode("ascii")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
 
 class RateLimiter:
+    """In-handler limiter kept for callers that check limits themselves"""
+
     def __init__(self, requests_per_minute=30):
         self.requests_per_minute = requests_per_minute
-        self.requests = defaultdict(list)
-        
+        self.backend = MemoryRateLimitBackend(requests_per_minute / 60.0, requests_per_minute)
+
     def check_rate_limit(self, client_ip: str):
         """
         Check if the client has exceeded the rate limit
         """
-        now = datetime.now()
-        minute_ago = now - timedelta(minutes=1)
-        
-        # Clean old requests
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip]
-            if req_time > minute_ago
-        ]
-        
-        # Check rate limit
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
+        allowed, _ = self.backend.take(client_ip)
+        if not allowed:
             raise HTTPException(
                 status_code=429,
-                detail="Too many requests. Please try again in a minute."
+                detail=RATE_LIMIT_DETAIL
             )
-            
-        # Add new request
-        self.requests[client_ip].append(now) 
\ No newline at end of file
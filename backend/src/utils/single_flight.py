@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from functools import partial
+from typing import Optional
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is in flight wait for the leader's result instead of repeating
+    the work, and receive its exception if it fails. Calls are tracked with
+    ``concurrent.futures.Future`` so threadpool callers (``do``) and event
+    loop callers (``ado``) coalesce with each other.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Args:
+            timeout (float): Longest a duplicate caller waits for the
+                leader before raising TimeoutError, None to wait forever
+        """
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _join(self, key: str):
+        """Return (future, is_leader), registering a new call if none is in flight"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result=None, error: BaseException = None):
+        with self._lock:
+            self._calls.pop(key, None)
+            if error is not None:
+                self.errors += 1
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn, timeout: Optional[float] = None):
+        """
+        Run ``fn()`` once for all concurrent callers with the same key
+        Args:
+            key (str): Canonical identity of the call
+            fn (callable): The work, run only by the leader
+            timeout (float): Overrides the default wait for duplicates
+        Returns:
+            The leader's result
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return self._wait(future, timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def ado(self, key: str, coro_fn, timeout: Optional[float] = None):
+        """
+        Async ``do``: ``coro_fn()`` returns the coroutine doing the work.
+
+        The leader's work runs in its own task, so a leader whose request
+        is cancelled still completes the call for the callers waiting on it.
+        """
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(coro_fn())
+            task.add_done_callback(partial(self._finish_task, key, future))
+            return await asyncio.shield(task)
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            # shield keeps a timed-out waiter from cancelling the shared future
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def _finish_task(self, key: str, future: Future, task: asyncio.Task):
+        if task.cancelled():
+            self._finish(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, future, error=task.exception())
+        else:
+            self._finish(key, future, task.result())
+
+    def _wait(self, future: Future, timeout: Optional[float]):
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FuturesTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def stats(self) -> dict:
+        """How many calls ran, how many were served by another call's result"""
+        with self._lock:
+            calls = self.leaders + self.coalesced
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "coalesced_rate": self.coalesced / calls if calls else 0.0,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+            }
@@ -0,0 +1,128 @@
+import asyncio
+from functools import partial
+from typing import List, Optional
+
+# Fields returned for every search hit, matching the Mongo $project stage
+RESULT_FIELDS = ("title", "plot", "year", "genres")
+
+# Per-search options accepted by every backend
+FILTER_FIELDS = ("year_start", "year_end", "genres", "sort_by")
+
+SORT_KEYS = {
+    "year_desc": ("year", True),
+    "year_asc": ("year", False),
+    "title_asc": ("title", False),
+    "title_desc": ("title", True),
+}
+
+
+def sort_results(results: List[dict], sort_by: str) -> List[dict]:
+    """Apply the API sort order to a list of hits, like the Mongo $sort stage"""
+    if sort_by not in SORT_KEYS:
+        return results
+    field, reverse = SORT_KEYS[sort_by]
+    # Missing values sort first ascending, as in Mongo
+    present = [r for r in results if r.get(field) is not None]
+    missing = [r for r in results if r.get(field) is None]
+    present.sort(key=lambda r: r[field], reverse=reverse)
+    return present + missing if reverse else missing + present
+
+
+async def search_many(backend, query_vectors, searches: List[dict], top_k: int = 5, executor=None) -> list:
+    """
+    Retrieve movies for many searches at once.
+
+    Searches with identical filters go to the backend together through
+    ``asearch_batch``; the filter groups run concurrently.
+    Args:
+        backend (VectorSearchBackend): Retrieval backend
+        query_vectors: One query embedding per search
+        searches (list): Dicts with optional year_start, year_end, genres
+            and sort_by
+        top_k (int): Movies per search
+        executor: Thread pool for blocking backend work
+    Returns:
+        list: Per search, in order, its movies or the exception that failed it
+    """
+    groups = {}
+    for index, search in enumerate(searches):
+        filters = {field: search.get(field) for field in FILTER_FIELDS}
+        filters["sort_by"] = filters["sort_by"] or 'relevance'
+        if filters["genres"]:
+            filters["genres"] = sorted(filters["genres"])
+        groups.setdefault(repr(sorted(filters.items())), (filters, []))[1].append(index)
+
+    outcomes = await asyncio.gather(*(
+        backend.asearch_batch([query_vectors[i] for i in members], top_k, executor=executor, **filters)
+        for filters, members in groups.values()
+    ), return_exceptions=True)
+
+    results = [None] * len(searches)
+    for (_, members), outcome in zip(groups.values(), outcomes):
+        for position, index in enumerate(members):
+            results[index] = outcome if isinstance(outcome, BaseException) else outcome[position]
+    return results
+
+
+class VectorSearchBackend:
+    """
+    Interface for retrieval backends.
+
+    Implementations return documents shaped like the Mongo pipeline output:
+    ``_id``, ``title``, ``plot``, ``year``, ``genres`` and ``score``.
+    """
+
+    def search(
+        self,
+        query_vector,
+        top_k: int = 5,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None,
+        sort_by: str = 'relevance',
+        max_time_ms: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Args:
+            max_time_ms (int): Server-side time limit for remote backends;
+                in-process backends finish the scan regardless
+        """
+        raise NotImplementedError
+
+    def search_batch(self, query_vectors, top_k: int = 5, **filters) -> List[List[dict]]:
+        """Search several queries; backends override this when they can batch"""
+        return [self.search(vector, top_k, **filters) for vector in query_vectors]
+
+    async def asearch(
+        self,
+        query_vector,
+        top_k: int = 5,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None,
+        sort_by: str = 'relevance',
+        executor=None,
+        max_time_ms: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Search without blocking the event loop. The default runs ``search``
+        on ``executor`` (the loop's default executor if omitted); backends
+        with an async client override this.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(
+            self.search,
+            query_vector,
+            top_k=top_k,
+            year_start=year_start,
+            year_end=year_end,
+            genres=genres,
+            sort_by=sort_by,
+            max_time_ms=max_time_ms
+        ))
+
+    async def asearch_batch(self, query_vectors, top_k: int = 5, executor=None, **filters) -> List[List[dict]]:
+        """Search several queries sharing the same filters concurrently"""
+        return list(await asyncio.gather(*(
+            self.asearch(vector, top_k, executor=executor, **filters) for vector in query_vectors
+        )))
@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import numpy as np
+from ..database.mongodb_client import get_mongodb_client
+from .base import RESULT_FIELDS
+from .local_exact import EMBEDDINGS_FILE, METADATA_FILE
+
+
+def export_embeddings(client, output_dir: str, batch_size: int = 1000) -> int:
+    """
+    Export embedded_movies into a float32 .npy matrix plus metadata.jsonl
+    Args:
+        client: MongoClient connected to the cluster
+        output_dir (str): Directory to write the files into
+        batch_size (int): Cursor batch size
+    Returns:
+        int: Number of exported movies
+    """
+    collection = client.sample_mflix.embedded_movies
+    query = {"embedding": {"$exists": True}}
+    projection = {"embedding": 1, **{field: 1 for field in RESULT_FIELDS}}
+    expected = collection.count_documents(query)
+
+    os.makedirs(output_dir, exist_ok=True)
+    matrix_path = os.path.join(output_dir, EMBEDDINGS_FILE)
+    tmp_matrix_path = matrix_path + ".tmp.npy"
+    matrix = None
+    written = 0
+
+    with open(os.path.join(output_dir, METADATA_FILE), "w") as meta:
+        cursor = collection.find(query, projection).batch_size(batch_size)
+        for doc in cursor:
+            if written >= expected:
+                break
+            vector = np.asarray(doc.pop("embedding"), dtype=np.float32)
+            if matrix is None:
+                matrix = np.lib.format.open_memmap(
+                    tmp_matrix_path, mode="w+", dtype=np.float32,
+                    shape=(expected, len(vector))
+                )
+            norm = np.linalg.norm(vector)
+            matrix[written] = vector / norm if norm > 0 else vector
+            doc["_id"] = str(doc["_id"])
+            meta.write(json.dumps(doc) + "\n")
+            written += 1
+
+    if matrix is None:
+        np.save(matrix_path, np.zeros((0, 0), dtype=np.float32))
+        return 0
+
+    matrix.flush()
+    if written < expected:
+        # Collection shrank while exporting; keep only the rows we wrote
+        np.save(matrix_path, np.asarray(matrix[:written]))
+        del matrix
+        os.remove(tmp_matrix_path)
+    else:
+        del matrix
+        os.replace(tmp_matrix_path, matrix_path)
+
+    print(f"Exported {written} embeddings to {output_dir}")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export embedded_movies for local vector search")
+    parser.add_argument("--out", default="data/vectors", help="Output directory")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    export_embeddings(get_mongodb_client(), args.out, batch_size=args.batch_size)
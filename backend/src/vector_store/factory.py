@@ -0,0 +1,42 @@
+from ..config.settings import (
+    VECTOR_BACKEND,
+    LOCAL_VECTOR_DIR,
+    VECTOR_NUM_CANDIDATES,
+    VECTOR_EXACT_FILTER_THRESHOLD,
+    IVF_NPROBE,
+    QUANTIZED_RESCORE_FACTOR,
+)
+from .base import VectorSearchBackend
+from .mongo_backend import MongoVectorSearch
+
+
+def create_vector_backend(client=None, backend: str = VECTOR_BACKEND, async_client=None) -> VectorSearchBackend:
+    """
+    Build the retrieval backend selected by configuration
+    Args:
+        client: Shared MongoClient used by the Mongo backend
+        async_client: Shared AsyncMongoClient used by the Mongo backend's asearch
+        backend (str): "mongo" for Atlas $vectorSearch, "exact" for the
+            memory-mapped local matrix in LOCAL_VECTOR_DIR, "ivf" for the
+            approximate IVF index stored next to it, "int8"/"binary" for
+            quantized codes with float32 rescoring
+    Returns:
+        VectorSearchBackend
+    """
+    if backend == "mongo":
+        return MongoVectorSearch(
+            client,
+            num_candidates=VECTOR_NUM_CANDIDATES,
+            exact_filter_threshold=VECTOR_EXACT_FILTER_THRESHOLD,
+            async_client=async_client
+        )
+    if backend == "exact":
+        from .local_exact import ExactVectorSearch
+        return ExactVectorSearch.load(LOCAL_VECTOR_DIR)
+    if backend == "ivf":
+        from .ivf_index import IVFVectorSearch
+        return IVFVectorSearch.load(LOCAL_VECTOR_DIR, nprobe=IVF_NPROBE)
+    if backend in ("int8", "binary"):
+        from .quantization import QuantizedVectorSearch
+        return QuantizedVectorSearch.load(LOCAL_VECTOR_DIR, mode=backend, rescore_factor=QUANTIZED_RESCORE_FACTOR)
+    raise ValueError(f"Unknown vector backend: {backend}")
@@ -0,0 +1,60 @@
+from collections import defaultdict
+from typing import List, Optional
+import numpy as np
+
+
+class FilterIndex:
+    """
+    Precomputed filter structures for the local backends.
+
+    Years are kept as a sorted array with the matching row order, so a year
+    range is two binary searches. Each genre has a packed bitmap (N/8 bytes),
+    so a genre list is a bitwise OR. Both produce an exact row mask without
+    touching the movie documents at query time.
+    """
+
+    def __init__(self, documents: List[dict]):
+        self.n_rows = len(documents)
+        years = np.array(
+            [d.get("year") if isinstance(d.get("year"), int) else -1 for d in documents],
+            dtype=np.int32
+        )
+        self.year_order = np.argsort(years, kind="stable")
+        self.sorted_years = years[self.year_order]
+
+        genre_rows = defaultdict(list)
+        for row, doc in enumerate(documents):
+            for genre in doc.get("genres") or ():
+                genre_rows[genre].append(row)
+        self.genre_bitmaps = {}
+        for genre, rows in genre_rows.items():
+            mask = np.zeros(self.n_rows, dtype=bool)
+            mask[rows] = True
+            self.genre_bitmaps[genre] = np.packbits(mask)
+
+    def year_rows(self, year_start: int, year_end: int) -> np.ndarray:
+        """Row ids with year_start <= year <= year_end"""
+        lo = np.searchsorted(self.sorted_years, year_start, side="left")
+        hi = np.searchsorted(self.sorted_years, year_end, side="right")
+        return self.year_order[lo:hi]
+
+    def mask(
+        self,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None
+    ) -> Optional[np.ndarray]:
+        """Boolean row mask for the filters, or None when nothing is filtered"""
+        mask = None
+        if genres:
+            bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            for genre in genres:
+                bitmap = self.genre_bitmaps.get(genre)
+                if bitmap is not None:
+                    bits |= bitmap
+            mask = np.unpackbits(bits, count=self.n_rows).astype(bool)
+        if year_start and year_end:
+            year_mask = np.zeros(self.n_rows, dtype=bool)
+            year_mask[self.year_rows(year_start, year_end)] = True
+            mask = year_mask if mask is None else mask & year_mask
+        return mask
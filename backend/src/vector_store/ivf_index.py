@@ -0,0 +1,260 @@
+import argparse
+import os
+import struct
+from typing import List, Optional
+import numpy as np
+from .local_exact import EMBEDDINGS_FILE, LocalVectorSearch, load_metadata, normalize_rows
+
+IVF_INDEX_FILE = "ivf.index"
+
+_MAGIC = b"IVF1"
+_VERSION = 1
+# magic, version, dimensions, n_lists, n_vectors
+_HEADER = struct.Struct("<4sIIIQ")
+_ALIGN = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _layout(dimensions: int, n_lists: int, n_vectors: int):
+    """Byte offsets of the centroid, offset, id and vector sections"""
+    centroids = _aligned(_HEADER.size)
+    offsets = _aligned(centroids + n_lists * dimensions * 4)
+    ids = _aligned(offsets + (n_lists + 1) * 8)
+    vectors = _aligned(ids + n_vectors * 8)
+    end = vectors + n_vectors * dimensions * 4
+    return centroids, offsets, ids, vectors, end
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        block = np.asarray(vectors[start:start + chunk_size], dtype=np.float32)
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(vectors: np.ndarray, n_lists: int, n_iter: int = 10, sample_size: int = 256, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means coarse quantizer
+    Args:
+        vectors (np.ndarray): (N, D) unit vectors
+        n_lists (int): Number of inverted lists
+        n_iter (int): k-means iterations
+        sample_size (int): Training points per list
+        seed (int): Random seed
+    Returns:
+        np.ndarray: (n_lists, D) unit centroids
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    sample_idx = rng.choice(n, size=min(n, n_lists * sample_size), replace=False)
+    sample = normalize_rows(vectors[np.sort(sample_idx)])
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignments = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=n_lists)
+        empty = counts == 0
+        if empty.any():
+            # Reseed empty lists with random training points
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def build_ivf_index(vectors: np.ndarray, path: str, n_lists: Optional[int] = None, n_iter: int = 10, seed: int = 0) -> str:
+    """
+    Build an IVF index and write it to a single mmap-able file
+    Args:
+        vectors (np.ndarray): (N, D) embeddings, e.g. the exported embeddings.npy
+        path (str): Output file
+        n_lists (int): Number of inverted lists, defaults to about sqrt(N)
+        n_iter (int): k-means iterations
+        seed (int): Random seed
+    Returns:
+        str: The written path
+    """
+    n_vectors, dimensions = vectors.shape
+    if n_lists is None:
+        n_lists = max(1, int(np.sqrt(n_vectors)))
+    n_lists = min(n_lists, n_vectors)
+
+    centroids = train_centroids(vectors, n_lists, n_iter=n_iter, seed=seed)
+    assignments = _assign(vectors, centroids)
+    # Stable sort keeps rows of one list in catalogue order
+    ids = np.argsort(assignments, kind="stable").astype(np.int64)
+    counts = np.bincount(assignments, minlength=n_lists)
+    offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    c_off, o_off, i_off, v_off, end = _layout(dimensions, n_lists, n_vectors)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, dimensions, n_lists, n_vectors))
+        f.truncate(end)
+    out = np.memmap(tmp_path, dtype=np.uint8, mode="r+")
+    out[c_off:c_off + centroids.nbytes] = centroids.astype(np.float32).view(np.uint8).ravel()
+    out[o_off:o_off + offsets.nbytes] = offsets.view(np.uint8)
+    out[i_off:i_off + ids.nbytes] = ids.view(np.uint8)
+    packed = np.ndarray((n_vectors, dimensions), dtype=np.float32, buffer=out, offset=v_off)
+    for start in range(0, n_vectors, 65536):
+        rows = ids[start:start + 65536]
+        # Read the source in row order, write it back in list order
+        order = np.argsort(rows)
+        block = np.empty((len(rows), dimensions), dtype=np.float32)
+        block[order] = normalize_rows(vectors[rows[order]])
+        packed[start:start + len(rows)] = block
+    out.flush()
+    del packed, out
+    os.replace(tmp_path, path)
+    return path
+
+
+class IVFIndex:
+    """
+    Inverted-file index loaded from disk with mmap.
+
+    Vectors are stored grouped by list, so probing a list scans one
+    contiguous block of the file with a single matrix-vector product.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            magic, version, dimensions, n_lists, n_vectors = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not an IVF index file: {path}")
+        c_off, o_off, i_off, v_off, _ = _layout(dimensions, n_lists, n_vectors)
+
+        self.path = path
+        self.dimensions = dimensions
+        self.n_lists = n_lists
+        self.n_vectors = n_vectors
+        self.centroids = np.memmap(path, dtype=np.float32, mode="r", offset=c_off, shape=(n_lists, dimensions))
+        self.offsets = np.memmap(path, dtype=np.int64, mode="r", offset=o_off, shape=(n_lists + 1,))
+        self.ids = np.memmap(path, dtype=np.int64, mode="r", offset=i_off, shape=(n_vectors,))
+        self.vectors = np.memmap(path, dtype=np.float32, mode="r", offset=v_off, shape=(n_vectors, dimensions))
+        self._positions = None
+
+    @property
+    def nbytes(self) -> int:
+        return os.path.getsize(self.path)
+
+    def probe(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Ids of the nprobe lists whose centroids are closest to the query"""
+        nprobe = min(nprobe, self.n_lists)
+        centroid_scores = self.centroids @ query
+        return np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+    def scan(self, query: np.ndarray, lists: np.ndarray):
+        """Score every vector in the given lists; returns (row ids, similarities)"""
+        ranges = [(self.offsets[l], self.offsets[l + 1]) for l in lists]
+        ranges = [(start, end) for start, end in ranges if end > start]
+        if not ranges:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        # Each list is a contiguous slice of the file: no gather copies
+        scores = np.concatenate([self.vectors[start:end] @ query for start, end in ranges])
+        row_ids = np.concatenate([self.ids[start:end] for start, end in ranges])
+        return row_ids, scores
+
+    def search(self, queries: np.ndarray, k: int, nprobe: int = 8, mask: Optional[np.ndarray] = None):
+        """
+        Approximate top-k rows for each query
+        Args:
+            queries (np.ndarray): (Q, D) query vectors
+            k (int): Number of rows per query
+            nprobe (int): Lists scanned per query; higher trades speed for recall
+            mask (np.ndarray): Optional boolean mask over original row ids
+        Returns:
+            tuple: (Q, k) original row ids and cosine similarities, best
+                first; slots without a candidate have id -1
+        """
+        queries = normalize_rows(queries)
+        best_idx = np.full((len(queries), k), -1, dtype=np.int64)
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+
+        matching_rows = None
+        if mask is not None:
+            # A filter matching fewer rows than nprobe lists hold is cheaper
+            # to score exactly than to probe, and cannot come up short
+            expected_scan = nprobe * self.n_vectors / self.n_lists
+            if mask.sum() <= expected_scan:
+                # Gather in file order so reads stay sequential
+                file_positions = np.sort(self.positions[np.flatnonzero(mask)])
+                matching_rows = self.ids[file_positions]
+                matching_vectors = np.asarray(self.vectors[file_positions])
+
+        for qi, query in enumerate(queries):
+            if matching_rows is not None:
+                row_ids, scores = matching_rows, matching_vectors @ query
+            else:
+                row_ids, scores = self._probe_until(query, k, nprobe, mask)
+            if len(scores) == 0:
+                continue
+            kk = min(k, len(scores))
+            top = np.argpartition(-scores, kk - 1)[:kk]
+            top = top[np.argsort(-scores[top])]
+            best_idx[qi, :kk] = row_ids[top]
+            best_scores[qi, :kk] = scores[top]
+        return best_idx, best_scores
+
+    def _probe_until(self, query: np.ndarray, k: int, nprobe: int, mask: Optional[np.ndarray]):
+        """Probe nprobe lists, doubling the breadth while the filter leaves fewer than k rows"""
+        while True:
+            row_ids, scores = self.scan(query, self.probe(query, nprobe))
+            if mask is not None:
+                keep = mask[row_ids]
+                row_ids, scores = row_ids[keep], scores[keep]
+            if len(scores) >= k or nprobe >= self.n_lists:
+                return row_ids, scores
+            nprobe *= 2
+
+    @property
+    def positions(self) -> np.ndarray:
+        """File position of every original row id (inverse of ids)"""
+        if self._positions is None:
+            positions = np.empty(self.n_vectors, dtype=np.int64)
+            positions[self.ids] = np.arange(self.n_vectors)
+            self._positions = positions
+        return self._positions
+
+
+class IVFVectorSearch(LocalVectorSearch):
+    """Approximate local retrieval backend backed by an IVFIndex"""
+
+    def __init__(self, index: IVFIndex, documents: List[dict], nprobe: int = 8, candidate_limit: int = 100):
+        """
+        Args:
+            index (IVFIndex): Loaded index
+            documents (list): Movie documents aligned with the original rows
+            nprobe (int): Lists scanned per query, the counterpart of numCandidates
+            candidate_limit (int): Hits collected before a non-relevance sort
+        """
+        if index.n_vectors != len(documents):
+            raise ValueError("Index rows and documents are not aligned")
+        super().__init__(documents, candidate_limit)
+        self.index = index
+        self.nprobe = nprobe
+
+    @classmethod
+    def load(cls, directory: str, **kwargs) -> "IVFVectorSearch":
+        return cls(IVFIndex(os.path.join(directory, IVF_INDEX_FILE)), load_metadata(directory), **kwargs)
+
+    def top_candidates(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None):
+        return self.index.search(queries, k, nprobe=self.nprobe, mask=mask)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build an IVF index from exported embeddings")
+    parser.add_argument("--vectors", default="data/vectors", help="Directory with embeddings.npy")
+    parser.add_argument("--lists", type=int, default=None, help="Number of inverted lists")
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    matrix = np.load(os.path.join(args.vectors, EMBEDDINGS_FILE), mmap_mode="r")
+    output = build_ivf_index(matrix, os.path.join(args.vectors, IVF_INDEX_FILE), n_lists=args.lists, n_iter=args.iterations)
+    print(f"Wrote {output}")
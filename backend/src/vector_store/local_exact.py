@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+from functools import partial
+from typing import List, Optional
+import numpy as np
+from .base import RESULT_FIELDS, VectorSearchBackend, sort_results
+from .filters import FilterIndex
+
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.jsonl"
+
+
+def to_vectorsearch_score(similarity):
+    """Map cosine similarity to Atlas' normalized cosine vectorSearchScore"""
+    return (1.0 + similarity) / 2.0
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """Return float32 copies of the rows scaled to unit length"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def merge_top_k(scores: np.ndarray, k: int, offset: int, best_idx: np.ndarray, best_scores: np.ndarray):
+    """
+    Merge the best k columns of a (Q, chunk) score block into a running top-k
+    Args:
+        scores (np.ndarray): Scores of rows offset..offset+chunk
+        k (int): Number of rows to keep per query
+        offset (int): Row index of the first column
+        best_idx (np.ndarray): (Q, <=k) running best rows
+        best_scores (np.ndarray): (Q, <=k) running best scores
+    Returns:
+        tuple: Updated (best_idx, best_scores), unordered
+    """
+    kk = min(k, scores.shape[1])
+    part = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+    merged_idx = np.concatenate([best_idx, part + offset], axis=1)
+    merged_scores = np.concatenate([best_scores, np.take_along_axis(scores, part, axis=1)], axis=1)
+    if merged_idx.shape[1] > k:
+        keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        merged_idx = np.take_along_axis(merged_idx, keep, axis=1)
+        merged_scores = np.take_along_axis(merged_scores, keep, axis=1)
+    return merged_idx, merged_scores
+
+
+def load_metadata(directory: str) -> List[dict]:
+    """Read the per-row movie documents written next to the embedding matrix"""
+    with open(os.path.join(directory, METADATA_FILE), "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class LocalVectorSearch(VectorSearchBackend):
+    """
+    Shared filtering and result shaping for the in-process backends.
+
+    Subclasses implement ``top_candidates``, which returns the best row
+    indices and cosine similarities for a batch of queries.
+    """
+
+    def __init__(self, documents: List[dict], candidate_limit: int = 100):
+        """
+        Args:
+            documents (list): Movie documents, one per embedding row
+            candidate_limit (int): Hits collected before a non-relevance sort,
+                mirroring the $vectorSearch limit of the Mongo backend
+        """
+        self.documents = documents
+        self.candidate_limit = candidate_limit
+        self.filters = FilterIndex(documents)
+
+    def top_candidates(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None):
+        raise NotImplementedError
+
+    def filter_mask(
+        self,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None
+    ) -> Optional[np.ndarray]:
+        """Boolean row mask for the filters, or None when nothing is filtered"""
+        return self.filters.mask(year_start, year_end, genres)
+
+    def _documents_for(self, indices, similarities) -> List[dict]:
+        results = []
+        for idx, similarity in zip(indices, similarities):
+            if idx < 0:
+                break
+            doc = self.documents[idx]
+            hit = {"_id": doc.get("_id")}
+            for field in RESULT_FIELDS:
+                if field in doc:
+                    hit[field] = doc[field]
+            hit["score"] = float(to_vectorsearch_score(similarity))
+            results.append(hit)
+        return results
+
+    def search_batch(
+        self,
+        query_vectors,
+        top_k: int = 5,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None,
+        sort_by: str = 'relevance'
+    ) -> List[List[dict]]:
+        """Score all queries against the matrix in one pass"""
+        if len(self.documents) == 0:
+            return [[] for _ in query_vectors]
+        k = top_k if sort_by == 'relevance' else max(top_k, self.candidate_limit)
+        k = min(k, len(self.documents))
+        mask = self.filter_mask(year_start, year_end, genres)
+        indices, similarities = self.top_candidates(np.atleast_2d(query_vectors), k, mask)
+        return [
+            sort_results(self._documents_for(idx_row, sim_row), sort_by)[:top_k]
+            for idx_row, sim_row in zip(indices, similarities)
+        ]
+
+    async def asearch_batch(self, query_vectors, top_k: int = 5, executor=None, **filters) -> List[List[dict]]:
+        """Score the whole batch in one matrix pass on the executor"""
+        filters.pop("max_time_ms", None)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(self.search_batch, query_vectors, top_k, **filters))
+
+    def search(
+        self,
+        query_vector,
+        top_k: int = 5,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None,
+        sort_by: str = 'relevance',
+        max_time_ms: Optional[int] = None
+    ) -> List[dict]:
+        return self.search_batch(
+            [query_vector],
+            top_k,
+            year_start=year_start,
+            year_end=year_end,
+            genres=genres,
+            sort_by=sort_by
+        )[0]
+
+
+class ExactVectorSearch(LocalVectorSearch):
+    """
+    Exact top-k search over a memory-mapped float32 embedding matrix.
+
+    Rows are unit-normalized at export time, so scoring is a chunked matrix
+    product against the normalized queries followed by ``argpartition``.
+    Only the pages of the matrix being scanned need to be resident.
+    """
+
+    def __init__(self, embeddings: np.ndarray, documents: List[dict], candidate_limit: int = 100, chunk_size: int = 65536, gather_fraction: float = 0.1):
+        """
+        Args:
+            embeddings (np.ndarray): (N, D) float32 unit vectors, may be a memmap
+            documents (list): N movie documents aligned with the rows
+            candidate_limit (int): Hits collected before a non-relevance sort
+            chunk_size (int): Rows scored per matrix product
+            gather_fraction (float): Filters matching at most this fraction of
+                rows score only the matching rows instead of the whole matrix
+        """
+        if len(embeddings) != len(documents):
+            raise ValueError("Embedding rows and documents are not aligned")
+        super().__init__(documents, candidate_limit)
+        self.embeddings = embeddings
+        self.chunk_size = chunk_size
+        self.gather_fraction = gather_fraction
+
+    @classmethod
+    def load(cls, directory: str, **kwargs) -> "ExactVectorSearch":
+        """Memory-map an exported embedding directory"""
+        embeddings = np.load(os.path.join(directory, EMBEDDINGS_FILE), mmap_mode="r")
+        return cls(embeddings, load_metadata(directory), **kwargs)
+
+    def top_candidates(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None):
+        """
+        Exact top-k rows for each query
+        Args:
+            queries (np.ndarray): (Q, D) query vectors
+            k (int): Number of rows per query
+            mask (np.ndarray): Optional boolean mask of eligible rows
+        Returns:
+            tuple: (Q, k) row indices and cosine similarities, best first;
+                slots without an eligible row have index -1
+        """
+        queries = normalize_rows(queries)
+        if mask is not None and mask.sum() <= self.gather_fraction * len(mask):
+            return self._top_candidates_in(queries, k, np.flatnonzero(mask))
+
+        n_queries = len(queries)
+        best_idx = np.full((n_queries, 0), -1, dtype=np.int64)
+        best_scores = np.full((n_queries, 0), -np.inf, dtype=np.float32)
+
+        for start in range(0, len(self.embeddings), self.chunk_size):
+            block = self.embeddings[start:start + self.chunk_size]
+            scores = queries @ block.T
+            if mask is not None:
+                scores[:, ~mask[start:start + len(block)]] = -np.inf
+
+            # Keep the best k of this chunk, merged with the running best
+            best_idx, best_scores = merge_top_k(scores, k, start, best_idx, best_scores)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_idx = np.take_along_axis(best_idx, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_idx[~np.isfinite(best_scores)] = -1
+        return best_idx, best_scores
+
+    def _top_candidates_in(self, queries: np.ndarray, k: int, rows: np.ndarray):
+        """Exact top-k restricted to the given rows, for selective filters"""
+        best_idx = np.full((len(queries), k), -1, dtype=np.int64)
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        if len(rows) == 0:
+            return best_idx, best_scores
+        scores = queries @ np.asarray(self.embeddings[rows], dtype=np.float32).T
+        kk = min(k, len(rows))
+        part = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        best_idx[:, :kk] = rows[np.take_along_axis(part, order, axis=1)]
+        best_scores[:, :kk] = np.take_along_axis(part_scores, order, axis=1)
+        return best_idx, best_scores
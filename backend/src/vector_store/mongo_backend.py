@@ -0,0 +1,180 @@
+import json
+import math
+from typing import List, Optional
+import numpy as np
+from ..database.mongodb_client import RESULT_PROJECTION, get_mongodb_client, time_limit
+from .base import VectorSearchBackend
+
+# Atlas rejects numCandidates above this value
+MAX_NUM_CANDIDATES = 10000
+# Atlas guidance: consider 10-20 candidates for every hit returned
+CANDIDATES_PER_HIT = 10
+
+
+def build_vector_filter(
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    genres: Optional[List[str]] = None
+) -> dict:
+    """
+    MQL pre-filter for $vectorSearch; year and genres must be indexed as
+    filter fields (see create_vector_search_index)
+    """
+    conditions = []
+    if year_start and year_end:
+        conditions.append({"year": {"$gte": year_start, "$lte": year_end}})
+    if genres:
+        conditions.append({"genres": {"$in": list(genres)}})
+    if len(conditions) > 1:
+        return {"$and": conditions}
+    return conditions[0] if conditions else {}
+
+
+class MongoVectorSearch(VectorSearchBackend):
+    """
+    Retrieval through Atlas $vectorSearch on sample_mflix.embedded_movies.
+
+    Year and genre filters run inside the vector stage, so a narrow filter
+    still returns ``top_k`` hits. numCandidates grows with filter
+    selectivity, and filters matching few enough documents switch to exact
+    (ENN) search over just those documents.
+    """
+
+    def __init__(self, client=None, num_candidates: int = 100, candidate_limit: int = 100, exact_filter_threshold: int = 2000, async_client=None):
+        """
+        Args:
+            client: MongoClient to use, the process-wide one if omitted
+            num_candidates (int): Minimum candidates considered by the
+                vector index for an unfiltered search
+            candidate_limit (int): Hits fetched before a non-relevance sort
+            exact_filter_threshold (int): Filters matching at most this many
+                documents use exact search instead of the ANN index
+            async_client: Shared AsyncMongoClient used by ``asearch``
+        """
+        self.client = client
+        self.async_client = async_client
+        self.num_candidates = num_candidates
+        self.candidate_limit = candidate_limit
+        self.exact_filter_threshold = exact_filter_threshold
+        self._selectivity = {}
+
+    def filter_stats(self, collection, vector_filter: dict):
+        """
+        Matching document count and selectivity of a filter, cached per filter
+        Returns:
+            tuple: (matching documents, fraction of the collection)
+        """
+        key = json.dumps(vector_filter, sort_keys=True)
+        stats = self._selectivity.get(key)
+        if stats is None:
+            total = collection.estimated_document_count()
+            stats = self._remember_stats(key, collection.count_documents(vector_filter), total)
+        return stats
+
+    async def afilter_stats(self, collection, vector_filter: dict):
+        """filter_stats for an AsyncCollection"""
+        key = json.dumps(vector_filter, sort_keys=True)
+        stats = self._selectivity.get(key)
+        if stats is None:
+            total = await collection.estimated_document_count()
+            stats = self._remember_stats(key, await collection.count_documents(vector_filter), total)
+        return stats
+
+    def _remember_stats(self, key: str, matching: int, total: int):
+        stats = (matching, matching / max(total, 1))
+        if len(self._selectivity) >= 1024:
+            self._selectivity.clear()
+        self._selectivity[key] = stats
+        return stats
+
+    def vector_stage(self, collection, query_vector, limit: int, vector_filter: dict, stats=None) -> dict:
+        """
+        Build the $vectorSearch stage with an adaptive candidate count
+        Args:
+            stats (tuple): Precomputed filter_stats, looked up on collection if omitted
+        """
+        stage = {
+            "index": "vector_index",
+            "path": "embedding",
+            "queryVector": np.asarray(query_vector).tolist(),
+            "limit": limit
+        }
+        num_candidates = max(self.num_candidates, limit * CANDIDATES_PER_HIT)
+        if vector_filter:
+            stage["filter"] = vector_filter
+            matching, selectivity = stats if stats is not None else self.filter_stats(collection, vector_filter)
+            if matching <= self.exact_filter_threshold:
+                stage["exact"] = True
+                return {"$vectorSearch": stage}
+            num_candidates = math.ceil(num_candidates / max(selectivity, 1e-3))
+        stage["numCandidates"] = min(max(num_candidates, limit), MAX_NUM_CANDIDATES)
+        return {"$vectorSearch": stage}
+
+    def search(
+        self,
+        query_vector,
+        top_k: int = 5,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None,
+        sort_by: str = 'relevance',
+        max_time_ms: Optional[int] = None
+    ) -> List[dict]:
+        client = self.client if self.client is not None else get_mongodb_client()
+        if not client:
+            return []
+            
+        collection = client.sample_mflix.embedded_movies
+        
+        # Non-relevance sorts reorder a larger candidate set, as before
+        limit = top_k if sort_by == 'relevance' else max(top_k, self.candidate_limit)
+        vector_filter = build_vector_filter(year_start, year_end, genres)
+        stage = self.vector_stage(collection, query_vector, limit, vector_filter)
+        return list(collection.aggregate(self.search_pipeline(stage, top_k, sort_by), **time_limit(max_time_ms)))
+
+    async def asearch(
+        self,
+        query_vector,
+        top_k: int = 5,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        genres: Optional[List[str]] = None,
+        sort_by: str = 'relevance',
+        executor=None,
+        max_time_ms: Optional[int] = None
+    ) -> List[dict]:
+        """Same pipeline as ``search``, awaited on the async client"""
+        if self.async_client is None:
+            return await super().asearch(query_vector, top_k, year_start, year_end, genres, sort_by, executor, max_time_ms)
+
+        collection = self.async_client.sample_mflix.embedded_movies
+        limit = top_k if sort_by == 'relevance' else max(top_k, self.candidate_limit)
+        vector_filter = build_vector_filter(year_start, year_end, genres)
+        stats = await self.afilter_stats(collection, vector_filter) if vector_filter else None
+        stage = self.vector_stage(collection, query_vector, limit, vector_filter, stats)
+        cursor = await collection.aggregate(self.search_pipeline(stage, top_k, sort_by), **time_limit(max_time_ms))
+        return await cursor.to_list()
+
+    def search_pipeline(self, stage: dict, top_k: int, sort_by: str) -> List[dict]:
+        """The stages after $vectorSearch: optional sort, projection and limit"""
+        pipeline = [stage]
+        
+        # Add sorting
+        if sort_by != 'relevance':
+            sort_stage = {
+                "year_desc": {"$sort": {"year": -1}},
+                "year_asc": {"$sort": {"year": 1}},
+                "title_asc": {"$sort": {"title": 1}},
+                "title_desc": {"$sort": {"title": -1}}
+            }.get(sort_by)
+            
+            if sort_stage:
+                pipeline.append(sort_stage)
+        
+        # Add final projection: JSON-native fields only, so results can be
+        # encoded straight into the response
+        pipeline.append({"$project": RESULT_PROJECTION})
+        
+        # Limit results
+        pipeline.append({"$limit": top_k})
+        return pipeline
@@ -0,0 +1,176 @@
+import argparse
+import os
+from typing import List, Optional
+import numpy as np
+from .local_exact import EMBEDDINGS_FILE, LocalVectorSearch, load_metadata, merge_top_k, normalize_rows
+
+INT8_CODES_FILE = "embeddings_int8.npy"
+INT8_SCALE_FILE = "embeddings_int8_scale.npy"
+BINARY_CODES_FILE = "embeddings_binary.npy"
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(values):
+        return _POPCOUNT_TABLE[values]
+
+
+def fit_int8_scale(vectors: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """Per-dimension symmetric scale mapping the largest magnitude to 127"""
+    absmax = np.zeros(vectors.shape[1], dtype=np.float32)
+    for start in range(0, len(vectors), chunk_size):
+        block = np.abs(np.asarray(vectors[start:start + chunk_size], dtype=np.float32))
+        np.maximum(absmax, block.max(axis=0), out=absmax)
+    return np.where(absmax > 0, absmax / 127.0, 1.0).astype(np.float32)
+
+
+def quantize_int8(vectors: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Encode float vectors as per-dimension scaled int8 codes"""
+    return np.clip(np.rint(np.asarray(vectors, dtype=np.float32) / scale), -127, 127).astype(np.int8)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """Encode float vectors as packed sign bits (D/8 bytes per vector)"""
+    return np.packbits(np.asarray(vectors) > 0, axis=-1)
+
+
+def quantize_directory(directory: str, chunk_size: int = 65536) -> None:
+    """
+    Write int8 and binary codes next to an exported embeddings.npy
+    Args:
+        directory (str): Directory created by vector_store.export
+        chunk_size (int): Rows converted at a time
+    """
+    vectors = np.load(os.path.join(directory, EMBEDDINGS_FILE), mmap_mode="r")
+    n, dim = vectors.shape
+    scale = fit_int8_scale(vectors, chunk_size)
+    np.save(os.path.join(directory, INT8_SCALE_FILE), scale)
+
+    int8_codes = np.lib.format.open_memmap(
+        os.path.join(directory, INT8_CODES_FILE), mode="w+", dtype=np.int8, shape=(n, dim)
+    )
+    binary_codes = np.lib.format.open_memmap(
+        os.path.join(directory, BINARY_CODES_FILE), mode="w+", dtype=np.uint8, shape=(n, (dim + 7) // 8)
+    )
+    for start in range(0, n, chunk_size):
+        block = vectors[start:start + chunk_size]
+        int8_codes[start:start + len(block)] = quantize_int8(block, scale)
+        binary_codes[start:start + len(block)] = quantize_binary(block)
+    int8_codes.flush()
+    binary_codes.flush()
+
+
+class QuantizedVectorSearch(LocalVectorSearch):
+    """
+    Two-pass local search over compact codes.
+
+    The first pass scans int8 codes (4x smaller than float32) or packed
+    sign bits (32x smaller) to shortlist ``rescore_factor * k`` candidates;
+    the second pass rescores only those rows against the memory-mapped
+    float32 matrix, so the returned scores are exact.
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        embeddings: np.ndarray,
+        documents: List[dict],
+        mode: str = "int8",
+        scale: Optional[np.ndarray] = None,
+        rescore_factor: int = 4,
+        candidate_limit: int = 100,
+        chunk_size: int = 65536
+    ):
+        """
+        Args:
+            codes (np.ndarray): (N, D) int8 codes or (N, D/8) packed bits
+            embeddings (np.ndarray): (N, D) float32 unit vectors for rescoring
+            documents (list): N movie documents aligned with the rows
+            mode (str): "int8" or "binary"
+            scale (np.ndarray): Per-dimension int8 scale, required for int8
+            rescore_factor (int): Shortlist size as a multiple of k
+            candidate_limit (int): Hits collected before a non-relevance sort
+            chunk_size (int): Rows scanned per block in the first pass
+        """
+        if mode not in ("int8", "binary"):
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        if len(codes) != len(documents) or len(embeddings) != len(documents):
+            raise ValueError("Codes, embeddings and documents are not aligned")
+        super().__init__(documents, candidate_limit)
+        self.codes = codes
+        self.embeddings = embeddings
+        self.mode = mode
+        self.scale = scale
+        self.rescore_factor = rescore_factor
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def load(cls, directory: str, mode: str = "int8", **kwargs) -> "QuantizedVectorSearch":
+        """Memory-map the codes and float matrix written by quantize_directory"""
+        embeddings = np.load(os.path.join(directory, EMBEDDINGS_FILE), mmap_mode="r")
+        if mode == "int8":
+            codes = np.load(os.path.join(directory, INT8_CODES_FILE), mmap_mode="r")
+            kwargs["scale"] = np.load(os.path.join(directory, INT8_SCALE_FILE))
+        else:
+            codes = np.load(os.path.join(directory, BINARY_CODES_FILE), mmap_mode="r")
+        return cls(codes, embeddings, load_metadata(directory), mode=mode, **kwargs)
+
+    @property
+    def code_bytes(self) -> int:
+        return self.codes.nbytes
+
+    def _approximate_scores(self, queries: np.ndarray, block: np.ndarray) -> np.ndarray:
+        if self.mode == "int8":
+            # Fold the per-dimension scale into the query once per block
+            return (queries * self.scale) @ block.astype(np.float32).T
+        query_bits = quantize_binary(queries)
+        hamming = _popcount(query_bits[:, None, :] ^ block[None, :, :]).sum(axis=2, dtype=np.int32)
+        return -hamming.astype(np.float32)
+
+    def shortlist(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """First pass: (Q, k) candidate rows ranked on the compact codes"""
+        n_queries = len(queries)
+        best_idx = np.full((n_queries, 0), -1, dtype=np.int64)
+        best_scores = np.full((n_queries, 0), -np.inf, dtype=np.float32)
+        step = self.chunk_size
+        if self.mode == "binary":
+            # XOR broadcasting materialises (Q, rows, D/8) bytes per block
+            step = max(1024, self.chunk_size // n_queries)
+        for start in range(0, len(self.codes), step):
+            block = self.codes[start:start + step]
+            scores = self._approximate_scores(queries, block)
+            if mask is not None:
+                scores[:, ~mask[start:start + len(block)]] = -np.inf
+            best_idx, best_scores = merge_top_k(scores, k, start, best_idx, best_scores)
+        best_idx[~np.isfinite(best_scores)] = -1
+        return best_idx
+
+    def top_candidates(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None):
+        queries = normalize_rows(queries)
+        n_short = min(len(self.documents), k * self.rescore_factor)
+        shortlist = self.shortlist(queries, n_short, mask)
+
+        best_idx = np.full((len(queries), k), -1, dtype=np.int64)
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for qi, rows in enumerate(shortlist):
+            rows = np.sort(rows[rows >= 0])
+            if len(rows) == 0:
+                continue
+            # Second pass: exact float32 scores for the shortlisted rows only
+            exact = np.asarray(self.embeddings[rows], dtype=np.float32) @ queries[qi]
+            kk = min(k, len(rows))
+            top = np.argpartition(-exact, kk - 1)[:kk]
+            top = top[np.argsort(-exact[top])]
+            best_idx[qi, :kk] = rows[top]
+            best_scores[qi, :kk] = exact[top]
+        return best_idx, best_scores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write int8 and binary codes for exported embeddings")
+    parser.add_argument("--vectors", default="data/vectors", help="Directory with embeddings.npy")
+    args = parser.parse_args()
+    quantize_directory(args.vectors)
+    print(f"Wrote quantized codes to {args.vectors}")
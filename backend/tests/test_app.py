@@ -0,0 +1,90 @@
+import time
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+from backend.app import app
+
+
+def wait_until_ready(client, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/ready")
+        if response.status_code == 200:
+            return response
+        time.sleep(0.02)
+    return response
+
+
+def test_ready_after_warm_up():
+    with TestClient(app) as client:
+        response = wait_until_ready(client)
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready"}
+
+
+def test_model_is_shared_across_requests(monkeypatch):
+    monkeypatch.delenv("MONGODB_URI", raising=False)
+    with TestClient(app) as client:
+        wait_until_ready(client)
+        model = app.state.container.model
+        client.get("/search", params={"query": "space"})
+        client.get("/search", params={"query": "space"})
+        assert app.state.container.model is model
+
+
+def test_search_runs_on_the_async_path():
+    import numpy as np
+    from backend.src.vector_store.local_exact import ExactVectorSearch
+
+    documents = [{"_id": i, "title": f"Movie {i}", "plot": "", "year": 2000, "genres": []} for i in range(3)]
+    backend = ExactVectorSearch(np.eye(3, 384, dtype=np.float32), documents)
+    with TestClient(app) as client:
+        wait_until_ready(client)
+        app.state.container.vector_backend = backend
+        response = client.get("/search", params={"query": "space", "limit": 2})
+        assert response.status_code == 200
+        assert len(response.json()["movies"]) == 2
+
+
+def test_batch_search_returns_one_result_per_query():
+    import numpy as np
+    from backend.src.vector_store.local_exact import ExactVectorSearch
+
+    documents = [{"_id": i, "title": f"Movie {i}", "plot": "", "year": 1990 + i, "genres": []} for i in range(4)]
+    backend = ExactVectorSearch(np.eye(4, 384, dtype=np.float32), documents)
+    body = {"searches": [
+        {"query": "space"},
+        {"query": "war", "year_start": 1992, "year_end": 2000},
+        {"query": "space"},
+    ]}
+    with TestClient(app) as client:
+        wait_until_ready(client)
+        app.state.container.vector_backend = backend
+        response = client.post("/search/batch", params={"limit": 3}, json=body)
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["query"] for r in results] == ["space", "war", "space"]
+        assert len(results[0]["movies"]) == 3
+        assert all(m["year"] >= 1992 for m in results[1]["movies"])
+        assert client.post("/search/batch", json={"searches": []}).status_code == 422
+
+
+def test_metrics_and_server_timing():
+    import numpy as np
+    from backend.src.vector_store.local_exact import ExactVectorSearch
+
+    documents = [{"_id": i, "title": f"Movie {i}", "plot": "", "year": 2000, "genres": []} for i in range(3)]
+    with TestClient(app) as client:
+        wait_until_ready(client)
+        app.state.container.vector_backend = ExactVectorSearch(np.eye(3, 384, dtype=np.float32), documents)
+        response = client.get("/search", params={"query": "space"})
+        assert "total;dur=" in response.headers["server-timing"]
+        assert "embed;dur=" in response.headers["server-timing"]
+
+        metrics = client.get("/metrics")
+        assert metrics.status_code == 200
+        assert metrics.headers["content-type"].startswith("text/plain")
+        assert 'movie_search_stage_duration_seconds_count{stage="embed"}' in metrics.text
+        assert 'route="/search"' in metrics.text
+        assert "movie_search_embedding_cache_hits" in metrics.text
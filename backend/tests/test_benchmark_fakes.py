@@ -0,0 +1,29 @@
+import asyncio
+import numpy as np
+from backend.benchmarks.fakes import FakeMongo, make_movies
+from backend.src.vector_store.mongo_backend import MongoVectorSearch
+
+
+def test_fake_atlas_runs_the_mongo_backend_pipeline():
+    movies = make_movies(300, dim=16)
+    mongo = FakeMongo(movies)
+    backend = MongoVectorSearch(mongo.client, async_client=mongo.async_client)
+    query = np.asarray(movies[7]["embedding"])
+
+    hits = backend.search(query, top_k=3)
+    assert hits[0]["_id"] == "7"
+    assert set(hits[0]) == {"_id", "title", "plot", "year", "genres", "score"}
+    assert hits[0]["score"] >= hits[1]["score"] >= hits[2]["score"]
+
+    filtered = backend.search(query, top_k=5, year_start=1950, year_end=1970, genres=["Drama"], sort_by="year_desc")
+    assert all(1950 <= m["year"] <= 1970 and "Drama" in m["genres"] for m in filtered)
+    assert [m["year"] for m in filtered] == sorted((m["year"] for m in filtered), reverse=True)
+
+    assert asyncio.run(backend.asearch(query, top_k=3)) == hits
+
+
+def test_fake_collections_share_data_between_clients():
+    mongo = FakeMongo([])
+    mongo.client.sample_mflix.query_cache.update_one({"query": "k"}, {"$set": {"result": 1}}, upsert=True)
+    found = asyncio.run(mongo.async_client.sample_mflix.query_cache.find_one({"query": "k"}))
+    assert found["result"] == 1
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import numpy as np
+from backend.benchmarks.fakes import AsyncFakeCollection, FakeCollection
+from backend.src.rag_engine.cache_warmer import CacheWarmer, search_from_key
+from backend.src.rag_engine.result_cache import ResultCache, make_cache_key
+from backend.src.rag_engine.semantic_cache import SemanticCache
+
+
+class StubQueryEngine:
+    def __init__(self):
+        self.encoded = []
+
+    async def aencode_query(self, query):
+        self.encoded.append(query)
+        return np.ones(4, dtype=np.float32)
+
+
+def make_pipeline(collection):
+    refreshed = []
+
+    async def arefresh(query, year_start=None, year_end=None, genres=None, sort_by='relevance', query_vector=None):
+        refreshed.append(query)
+        return {"answer": "fresh", "movies": []}
+
+    pipeline = SimpleNamespace(
+        result_cache=ResultCache(collection, async_collection=AsyncFakeCollection(collection)),
+        semantic_cache=SemanticCache(4),
+        query_engine=StubQueryEngine(),
+        arefresh=arefresh,
+    )
+    return pipeline, refreshed
+
+
+def test_search_from_key_round_trips_cache_keys():
+    key = make_cache_key("Space  Movies", 1990, 2000, ["Sci-Fi", "Action"], "year")
+    assert search_from_key(key) == {
+        "query": "space movies", "year_start": 1990, "year_end": 2000,
+        "genres": ["Action", "Sci-Fi"], "sort_by": "year",
+    }
+    assert search_from_key("not json") is None
+
+
+def test_warmer_loads_popular_entries_and_refreshes_expiring_ones():
+    collection = FakeCollection()
+    writer = ResultCache(collection, hit_flush_size=1)
+    popular = make_cache_key("space adventure")
+    expiring = make_cache_key("old favourite")
+    rare = make_cache_key("rare query")
+    # Recomputing doesn't make an entry popular, serving it does
+    for _ in range(5):
+        writer.set(rare, {"answer": "c", "movies": []})
+    writer.set(popular, {"answer": "a", "movies": []})
+    writer.set(expiring, {"answer": "b", "movies": []})
+    for key, hits in ((popular, 3), (expiring, 2)):
+        for _ in range(hits):
+            writer.get(key)
+    assert collection._find({"query": popular})["requests"] == 3
+    old = datetime.now(timezone.utc) - timedelta(seconds=writer.ttl_seconds - 60)
+    collection._find({"query": expiring})["timestamp"] = old
+
+    pipeline, refreshed = make_pipeline(collection)
+    warmer = CacheWarmer(pipeline, max_queries=2, refresh_window_seconds=3600, rate_per_second=1000)
+    asyncio.run(warmer.run())
+
+    assert pipeline.query_engine.encoded == ["space adventure", "old favourite"]
+    assert refreshed == ["old favourite"]
+    stats = warmer.stats()
+    assert (stats["state"], stats["total"], stats["promoted"], stats["refreshed"], stats["failed"]) == ("done", 2, 1, 1, 0)
+    assert stats["progress"] == 1.0
+
+    # Warm-up reads are neither hits nor requests
+    assert pipeline.result_cache.stats()["l2_hits"] == 0
+    assert collection._find({"query": popular})["requests"] == 3
+
+    # The popular result is now served from memory
+    assert pipeline.result_cache.get(popular) == {"answer": "a", "movies": []}
+    assert pipeline.result_cache.stats()["l1_hits"] == 1
+    assert pipeline.semantic_cache.stats()["entries"] == 1
+    assert warmer.stats()["hit_rate_since_warmup"] == 1.0
@@ -0,0 +1,47 @@
+from backend.src.rag_engine.context_builder import ContextBuilder, EstimatingTokenCounter
+
+TEMPLATE = "Use the movies below.\nContext: {context}\nQuestion: {question}\nAnswer: "
+
+
+def make_movie(i, score, sentences=20):
+    plot = " ".join(f"Sentence {n} of the plot of movie {i} goes on for a while." for n in range(sentences))
+    return {"title": f"Movie {i}", "plot": plot, "year": 2000 + i, "genres": ["Drama"], "score": score}
+
+
+def test_unlimited_budget_keeps_every_plot():
+    movies = [make_movie(i, 0.9 - i / 10) for i in range(5)]
+    builder = ContextBuilder(max_tokens=0)
+    prompt = builder.build(TEMPLATE, "sad dramas", movies)
+    assert all(movie["plot"] in prompt for movie in movies)
+    assert builder.stats()["movies_dropped"] == 0
+
+
+def test_budget_is_respected_and_lower_scores_are_dropped_first():
+    counter = EstimatingTokenCounter()
+    # Display order differs from score order, e.g. sort_by=year
+    movies = [make_movie(i, score) for i, score in enumerate([0.2, 0.9, 0.5, 0.8, 0.1, 0.7])]
+    builder = ContextBuilder(counter, max_tokens=150, min_plot_tokens=16)
+    prompt = builder.build(TEMPLATE, "sad dramas", movies)
+
+    assert counter.count(prompt) <= 150
+    included = [movie["title"] for movie in movies if f"Title: {movie['title']}\n" in prompt]
+    assert "Movie 1" in included
+    assert "Movie 4" not in included
+    # Entries keep the display order
+    assert included == sorted(included, key=lambda t: int(t.split()[1]))
+    stats = builder.stats()
+    assert stats["movies_dropped"] == len(movies) - len(included)
+    assert stats["plots_truncated"] == len(included)
+
+
+def test_plots_are_cut_at_sentence_boundaries():
+    builder = ContextBuilder(max_tokens=0)
+    plot = make_movie(0, 1.0)["plot"]
+    short = builder.shorten_plot(plot, 40)
+    assert plot.startswith(short)
+    assert short.endswith(".")
+    assert builder.counter.count(short) <= 40
+    # A single long sentence is hard cut with an ellipsis
+    cut = builder.shorten_plot("word " * 100, 10)
+    assert cut.endswith("...")
+    assert builder.counter.count(cut) <= 10
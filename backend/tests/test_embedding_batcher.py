@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from backend.src.embedding_service.batcher import EmbeddingBatcher
+
+
+class RecordingModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t))] for t in texts], dtype=np.float32)
+
+
+def test_concurrent_queries_share_a_batch():
+    model = RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=8, max_wait_ms=50)
+    batcher.start()
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(batcher.encode, ["a" * i for i in range(1, 9)]))
+    finally:
+        batcher.stop()
+
+    assert [r[0] for r in results] == [float(i) for i in range(1, 9)]
+    assert len(model.calls) < 8
+    stats = batcher.stats()
+    assert stats["items"] == 8
+    assert stats["avg_batch_size"] > 1
+
+
+def test_encode_errors_reach_every_caller():
+    class FailingModel:
+        def encode(self, texts):
+            raise ValueError("boom")
+
+    batcher = EmbeddingBatcher(FailingModel(), max_wait_ms=1)
+    batcher.start()
+    try:
+        with pytest.raises(ValueError):
+            batcher.encode("space movies")
+    finally:
+        batcher.stop()
+
+
+def test_cancelled_requests_are_skipped():
+    model = RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=8, max_wait_ms=50)
+    cancelled = batcher.submit("dropped")
+    assert cancelled.cancel()
+    batcher.start()
+    try:
+        assert batcher.encode("kept")[0] == 4.0
+    finally:
+        batcher.stop()
+    assert all("dropped" not in call for call in model.calls)
+
+
+def test_submit_many_is_encoded_in_one_call():
+    model = RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=4, max_wait_ms=1)
+    batcher.start()
+    try:
+        embeddings = batcher.submit_many(["a", "bb", "ccc", "dddd", "eeeee", "ffffff"]).result()
+    finally:
+        batcher.stop()
+    assert embeddings.shape == (6, 1)
+    assert list(embeddings[:, 0]) == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert len(model.calls) == 1
+    assert batcher.stats()["items"] == 6
@@ -0,0 +1,60 @@
+import numpy as np
+from backend.src.embedding_service.embedding_cache import QueryEmbeddingCache, normalize_query
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text):
+        self.calls += 1
+        return np.ones(4) * len(text)
+
+
+def test_normalize_query_folds_case_whitespace_and_unicode():
+    assert normalize_query("  Space\tMovies ") == "space movies"
+    assert normalize_query("ｓｐａｃｅ movies") == "space movies"
+
+
+def test_equivalent_queries_are_encoded_once():
+    encoder = CountingEncoder()
+    cache = QueryEmbeddingCache(encoder)
+    first = cache.encode("Romantic  Comedy")
+    second = cache.encode("romantic comedy")
+    assert encoder.calls == 1
+    assert first.dtype == np.float32
+    assert second is first
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryEmbeddingCache(CountingEncoder(), max_entries=2)
+    cache.encode("a")
+    cache.encode("b")
+    cache.encode("a")
+    cache.encode("c")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["vector_bytes"] == 2 * 4 * 4
+
+
+def test_batch_encodes_distinct_misses_in_one_call():
+    import asyncio
+
+    class BatchEncoder:
+        def __init__(self):
+            self.batches = []
+
+        def encode(self, texts):
+            self.batches.append(list(texts))
+            return np.array([np.ones(4) * len(t) for t in texts])
+
+    encoder = BatchEncoder()
+    cache = QueryEmbeddingCache(encoder)
+    cache.put("space", np.zeros(4))
+    vectors = asyncio.run(cache.encode_many_async(["Space", "war  movies", "war movies", "drama"]))
+    assert encoder.batches == [["war movies", "drama"]]
+    assert vectors.shape == (4, 4)
+    assert vectors[0].sum() == 0
+    assert np.array_equal(vectors[1], vectors[2])
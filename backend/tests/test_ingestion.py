@@ -0,0 +1,136 @@
+import json
+import os
+from pymongo import DeleteMany
+from backend.src.data_processing.data_processor import process_movies
+from backend.src.data_processing.jsonl import batched, count_records, read_records
+
+
+def write_raw_movies(path, n):
+    with open(path, "w") as f:
+        for i in range(n):
+            f.write(json.dumps({"_id": str(i), "title": f"Movie {i}", "plot": "A plot", "genres": ["Drama"]}) + "\n")
+
+
+def test_process_movies_streams_jsonl(tmp_path):
+    write_raw_movies(tmp_path / "raw.jsonl", 3)
+    assert process_movies(str(tmp_path / "raw.jsonl"), str(tmp_path / "processed.jsonl"))
+    processed = list(read_records(str(tmp_path / "processed.jsonl")))
+    assert [m["id"] for m in processed] == ["0", "1", "2"]
+    assert processed[0]["text_for_embedding"] == "Movie 0 A plot Drama"
+
+
+def test_resume_drops_partial_line_and_continues(tmp_path):
+    write_raw_movies(tmp_path / "raw.jsonl", 4)
+    output = tmp_path / "processed.jsonl"
+    write_raw_movies(tmp_path / "first_two.jsonl", 2)
+    process_movies(str(tmp_path / "first_two.jsonl"), str(output))
+    with open(output, "a") as f:
+        f.write('{"id": "2", "tit')
+
+    assert process_movies(str(tmp_path / "raw.jsonl"), str(output), resume=True)
+    assert count_records(str(output)) == 4
+    assert [m["id"] for m in read_records(str(output))] == ["0", "1", "2", "3"]
+
+
+def test_batched_keeps_the_tail():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+class FakeEmbeddedMovies:
+    def __init__(self):
+        self.docs = {}
+
+    def create_index(self, *args, **kwargs):
+        pass
+
+    def find(self, filter, projection):
+        return [{"id": d["id"], "content_hash": d.get("content_hash")} for d in self.docs.values()]
+
+    def bulk_write(self, requests, ordered=True):
+        deleted = 0
+        for request in requests:
+            if isinstance(request, DeleteMany):
+                for movie_id in request._filter["id"]["$in"]:
+                    deleted += self.docs.pop(movie_id, None) is not None
+            else:
+                self.docs[request._filter["id"]] = dict(request._doc)
+
+        class Result:
+            deleted_count = deleted
+        return Result()
+
+
+def make_sync_service(collection, monkeypatch):
+    import numpy as np
+    from backend.src.embedding_service import vector_embeddings
+
+    class FakeClient:
+        class sample_mflix:
+            embedded_movies = collection
+
+    monkeypatch.setattr(vector_embeddings, "get_mongodb_client", lambda: FakeClient)
+    monkeypatch.setattr(vector_embeddings, "create_vector_search_index", lambda: True)
+
+    service = vector_embeddings.MovieEmbeddingService()
+    encoded = []
+    service.model.encode = lambda texts, **kw: encoded.extend(texts) or np.zeros((len(texts), 2))
+    return service, encoded
+
+
+def test_sync_only_reencodes_changed_movies(tmp_path, monkeypatch):
+    collection = FakeEmbeddedMovies()
+    service, encoded = make_sync_service(collection, monkeypatch)
+
+    def write(movies):
+        with open(tmp_path / "processed.jsonl", "w") as f:
+            for movie_id, text in movies:
+                f.write(json.dumps({"id": movie_id, "text_for_embedding": text}) + "\n")
+
+    write([("a", "one"), ("b", "two"), ("c", "three")])
+    first = service.sync_embeddings(str(tmp_path / "processed.jsonl"), batch_size=2)
+    assert first["inserted"] == 3 and first["skipped"] == 0
+
+    encoded.clear()
+    write([("a", "one"), ("b", "two, revised"), ("d", "four")])
+    second = service.sync_embeddings(str(tmp_path / "processed.jsonl"), batch_size=2)
+    assert encoded == ["two, revised", "four"]
+    assert (second["skipped"], second["updated"], second["inserted"], second["deleted"]) == (1, 1, 1, 1)
+    assert sorted(collection.docs) == ["a", "b", "d"]
+
+    # A partial input (e.g. --limit 100) never deletes the rest
+    write([("a", "one")])
+    third = service.sync_embeddings(str(tmp_path / "processed.jsonl"), batch_size=2, delete_missing=False)
+    assert (third["skipped"], third["deleted"]) == (1, 0)
+    assert sorted(collection.docs) == ["a", "b", "d"]
+
+
+def test_limited_incremental_ingestion_keeps_unseen_movies(tmp_path, monkeypatch):
+    from backend.src.data_processing import ingestion_pipeline
+
+    collection = FakeEmbeddedMovies()
+    service, _ = make_sync_service(collection, monkeypatch)
+    collection.docs = {movie_id: {"id": movie_id, "content_hash": "old"} for movie_id in ("0", "1", "7", "8")}
+
+    def load_sample_movies(limit, output_path, resume=False):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        write_raw_movies(output_path, limit)
+        return True
+
+    monkeypatch.setattr(ingestion_pipeline, "load_sample_movies", load_sample_movies)
+    monkeypatch.setattr(ingestion_pipeline, "MovieEmbeddingService", lambda model_name, **kwargs: service)
+
+    # The default --limit loads a sample: movies outside it stay stored
+    assert ingestion_pipeline.run_ingestion(str(tmp_path), limit=2, incremental=True)
+    assert sorted(collection.docs) == ["0", "1", "7", "8"]
+    assert collection.docs["0"]["content_hash"] != "old"
+
+
+def test_parallel_embedder_keeps_input_order():
+    from backend.src.embedding_service.parallel_embeddings import ParallelEmbedder
+    items = [f"movie {i}" for i in range(10)]
+    seen = []
+    with ParallelEmbedder(workers=2, shard_size=3) as embedder:
+        for shard, embeddings in embedder.encode_shards(items):
+            assert embeddings.shape == (len(shard), embedder.dimensions)
+            seen.extend(shard)
+    assert seen == items
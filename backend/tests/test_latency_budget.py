@@ -0,0 +1,45 @@
+import time
+import pytest
+from backend.src.utils.latency_budget import BudgetExceeded, Deadline, LatencyBudget
+
+
+def test_deadline_counts_down_and_raises_for_the_stage():
+    deadline = Deadline(0.01)
+    assert 0 < deadline.remaining() <= 0.01
+    deadline.check("embedding")
+    time.sleep(0.02)
+    assert deadline.remaining() == 0.0
+    assert deadline.remaining_ms() == 0
+    with pytest.raises(BudgetExceeded) as exc:
+        deadline.check("vector_search")
+    assert exc.value.stage == "vector_search"
+
+
+def test_disabled_budget_never_expires():
+    deadline = LatencyBudget(None).start()
+    assert deadline.remaining() is None
+    assert deadline.remaining_ms() is None
+    assert not deadline.expired()
+
+
+def test_exhaustion_is_counted_per_stage():
+    budget = LatencyBudget(1.0)
+    for _ in range(4):
+        budget.start()
+    budget.record("llm")
+    budget.record("llm")
+    budget.record("vector_search")
+    budget.record_llm_error()
+    stats = budget.stats()
+    assert stats["exhausted"] == {"embedding": 0, "vector_search": 1, "llm": 2}
+    assert stats["llm_errors"] == 1
+    assert stats["degraded_rate"] == 1.0
+
+
+def test_batches_count_one_request_per_search():
+    budget = LatencyBudget(1.0)
+    budget.start(4)
+    for _ in range(4):
+        budget.record("llm")
+    assert budget.stats()["requests"] == 4
+    assert budget.stats()["degraded_rate"] == 1.0
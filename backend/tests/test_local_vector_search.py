@@ -0,0 +1,125 @@
+import json
+import numpy as np
+from backend.src.vector_store.local_exact import ExactVectorSearch
+
+
+def make_catalogue(n=500, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    genres = ["Drama", "Comedy", "Film-Noir", "Sci-Fi"]
+    documents = [
+        {
+            "_id": str(i),
+            "title": f"Movie {i}",
+            "plot": "",
+            "year": 1930 + i % 80,
+            "genres": [genres[i % 4]],
+        }
+        for i in range(n)
+    ]
+    return vectors, documents, rng
+
+
+def test_matches_brute_force_across_chunks():
+    vectors, documents, rng = make_catalogue()
+    backend = ExactVectorSearch(vectors, documents, chunk_size=64)
+    query = rng.normal(size=16).astype(np.float32)
+
+    hits = backend.search(query, top_k=10)
+
+    expected = np.argsort(-(vectors @ (query / np.linalg.norm(query))))[:10]
+    assert [h["_id"] for h in hits] == [str(i) for i in expected]
+    assert all(0.0 <= h["score"] <= 1.0 for h in hits)
+    assert set(hits[0]) == {"_id", "title", "plot", "year", "genres", "score"}
+
+
+def test_filters_return_full_top_k():
+    vectors, documents, rng = make_catalogue()
+    backend = ExactVectorSearch(vectors, documents, chunk_size=100)
+    hits = backend.search(rng.normal(size=16), top_k=5, year_start=1940, year_end=1945, genres=["Film-Noir"])
+    assert len(hits) == 5
+    assert all(1940 <= h["year"] <= 1945 and h["genres"] == ["Film-Noir"] for h in hits)
+
+
+def test_load_memory_maps_exported_files(tmp_path):
+    vectors, documents, rng = make_catalogue(n=20)
+    np.save(tmp_path / "embeddings.npy", vectors)
+    with open(tmp_path / "metadata.jsonl", "w") as f:
+        for doc in documents:
+            f.write(json.dumps(doc) + "\n")
+
+    backend = ExactVectorSearch.load(str(tmp_path))
+    assert isinstance(backend.embeddings, np.memmap)
+    assert backend.search(vectors[3], top_k=1)[0]["_id"] == "3"
+
+
+def test_ivf_index_round_trips_and_matches_exact_when_probing_all_lists(tmp_path):
+    from backend.src.vector_store.ivf_index import IVFIndex, IVFVectorSearch, build_ivf_index
+
+    vectors, documents, rng = make_catalogue(n=400)
+    path = build_ivf_index(vectors, str(tmp_path / "ivf.index"), n_lists=8)
+    index = IVFIndex(path)
+    assert index.n_vectors == 400
+    assert sorted(index.ids.tolist()) == list(range(400))
+
+    exact = ExactVectorSearch(vectors, documents)
+    ivf = IVFVectorSearch(index, documents, nprobe=8)
+    query = rng.normal(size=16)
+    filters = {"year_start": 1950, "year_end": 1990, "genres": ["Drama"]}
+    ivf_hits = ivf.search(query, top_k=5, **filters)
+    exact_hits = exact.search(query, top_k=5, **filters)
+    assert [h["_id"] for h in ivf_hits] == [h["_id"] for h in exact_hits]
+    assert np.allclose([h["score"] for h in ivf_hits], [h["score"] for h in exact_hits], atol=1e-5)
+
+
+def test_quantized_search_rescores_to_exact_scores(tmp_path):
+    from backend.src.vector_store.quantization import QuantizedVectorSearch, quantize_directory
+
+    vectors, documents, rng = make_catalogue(n=300)
+    np.save(tmp_path / "embeddings.npy", vectors)
+    with open(tmp_path / "metadata.jsonl", "w") as f:
+        for doc in documents:
+            f.write(json.dumps(doc) + "\n")
+    quantize_directory(str(tmp_path))
+
+    exact = ExactVectorSearch(vectors, documents)
+    query = vectors[7] + 0.05 * rng.normal(size=16)
+    expected = exact.search(query, top_k=3)
+    for mode in ("int8", "binary"):
+        search = QuantizedVectorSearch.load(str(tmp_path), mode=mode, rescore_factor=100)
+        hits = search.search(query, top_k=3)
+        assert [h["_id"] for h in hits] == [h["_id"] for h in expected]
+        assert np.allclose([h["score"] for h in hits], [h["score"] for h in expected], atol=1e-5)
+    assert search.code_bytes == 300 * 2
+
+
+def test_ivf_narrow_filter_still_fills_top_k(tmp_path):
+    from backend.src.vector_store.ivf_index import IVFIndex, IVFVectorSearch, build_ivf_index
+
+    vectors, documents, rng = make_catalogue(n=400)
+    index = IVFIndex(build_ivf_index(vectors, str(tmp_path / "ivf.index"), n_lists=16))
+    ivf = IVFVectorSearch(index, documents, nprobe=1)
+    exact = ExactVectorSearch(vectors, documents)
+    query = rng.normal(size=16)
+    for filters in ({"year_start": 1940, "year_end": 1945, "genres": ["Film-Noir"]}, {"genres": ["Drama"]}):
+        hits = ivf.search(query, top_k=5, **filters)
+        assert len(hits) == len(exact.search(query, top_k=5, **filters))
+
+
+def test_search_many_batches_searches_with_equal_filters():
+    import asyncio
+    from backend.src.vector_store.base import search_many
+
+    embeddings, documents, _ = make_catalogue()
+    backend = ExactVectorSearch(embeddings, documents)
+    calls = []
+    search_batch = backend.search_batch
+    backend.search_batch = lambda vectors, *args, **kwargs: calls.append(len(vectors)) or search_batch(vectors, *args, **kwargs)
+
+    queries = embeddings[:3]
+    searches = [{"genres": ["Drama"]}, {"year_start": 2000}, {"genres": ["Drama"], "sort_by": "relevance"}]
+    results = asyncio.run(search_many(backend, queries, searches, top_k=4))
+    assert sorted(calls) == [1, 2]
+    for query, search, movies in zip(queries, searches, results):
+        assert [m["_id"] for m in movies] == [m["_id"] for m in search_batch([query], 4, **search)[0]]
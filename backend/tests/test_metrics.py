@@ -0,0 +1,36 @@
+from backend.src.utils.metrics import Histogram, RequestProfiler, render_metrics, server_timing
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "llm")
+    lines = histogram.render()
+    assert 'test_seconds_bucket{stage="llm",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="llm",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{stage="llm",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{stage="llm"} 4' in lines
+
+
+def test_stats_are_exported_as_gauges():
+    text = render_metrics({"result_cache": {"hit_rate": 0.5, "backend": "memory"}, "latency_budget": {"exhausted": {"llm": 2}}})
+    assert "movie_search_result_cache_hit_rate 0.5" in text
+    assert 'movie_search_latency_budget_exhausted{key="llm"} 2' in text
+    assert "movie_search_result_cache_backend" not in text
+
+
+def test_server_timing_lists_stages_in_milliseconds():
+    assert server_timing({"embed": 0.0021}, 0.01) == "embed;dur=2.1, total;dur=10.0"
+
+
+def test_profiler_dumps_only_slow_requests(tmp_path):
+    profiler = RequestProfiler(threshold_ms=50, directory=str(tmp_path))
+    profile = profiler.start()
+    assert profiler.start() is None
+    assert profiler.finish(profile, 0.01, "/search") is None
+    path = profiler.finish(profiler.start(), 0.2, "/search")
+    assert path is not None and path.endswith(".prof")
+    assert profiler.stats()["dumps"] == 1
+
+    profiler.disable()
+    assert profiler.start() is None
@@ -0,0 +1,54 @@
+import os
+import pytest
+from types import SimpleNamespace
+from backend.src.database import mongodb_client
+from backend.src.database.mongodb_client import (
+    ConnectionPoolStats,
+    close_mongodb_client,
+    get_mongodb_client,
+    time_limit,
+)
+
+
+def test_client_is_shared_until_closed():
+    client = get_mongodb_client()
+    assert get_mongodb_client() is client
+    assert client.options.pool_options.max_pool_size == mongodb_client.MONGO_MAX_POOL_SIZE
+    close_mongodb_client(client)
+    replacement = get_mongodb_client()
+    assert replacement is not client
+    close_mongodb_client(replacement)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_child_builds_its_own_client():
+    parent = get_mongodb_client()
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write_end, b"1" if get_mongodb_client() is not parent else b"0")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read_end, 1) == b"1"
+    close_mongodb_client(parent)
+
+
+def test_time_limit_defaults_to_the_configured_maximum():
+    assert time_limit(250) == {"maxTimeMS": 250}
+    assert time_limit(0) == {"maxTimeMS": 1}
+    default = time_limit()
+    assert default == ({"maxTimeMS": mongodb_client.MONGO_MAX_TIME_MS} if mongodb_client.MONGO_MAX_TIME_MS else {})
+
+
+def test_pool_stats_track_checkouts():
+    stats = ConnectionPoolStats()
+    stats.connection_created(None)
+    stats.connection_checked_out(SimpleNamespace(duration=0.004))
+    stats.connection_checked_out(SimpleNamespace(duration=0.002))
+    stats.connection_checked_in(None)
+    summary = stats.stats()
+    assert summary["open_connections"] == 1
+    assert summary["checked_out"] == 1
+    assert summary["checkouts"] == 2
+    assert summary["max_wait_ms"] == pytest.approx(4.0)
+    assert summary["mean_wait_ms"] == pytest.approx(3.0)
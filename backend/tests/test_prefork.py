@@ -0,0 +1,36 @@
+import os
+from backend.src.api import container as container_module
+from backend.src.api.container import ServiceContainer, preload_services
+from backend.src.utils.memory import parse_smaps_rollup, process_memory
+
+SMAPS_ROLLUP = """55d0c0000000-7ffd00000000 ---p 00000000 00:00 0                          [rollup]
+Rss:              204800 kB
+Pss:              112640 kB
+Shared_Clean:     153600 kB
+Shared_Dirty:       2048 kB
+Private_Clean:     10240 kB
+Private_Dirty:     38912 kB
+Swap:                  0 kB
+"""
+
+
+def test_smaps_rollup_splits_unique_and_shared_memory():
+    usage = parse_smaps_rollup(SMAPS_ROLLUP)
+    assert usage == {"rss_mb": 200.0, "pss_mb": 110.0, "shared_mb": 152.0, "unique_mb": 48.0, "swap_mb": 0.0}
+    if os.path.exists("/proc/self/smaps_rollup"):
+        assert process_memory()["rss_mb"] > 0
+
+
+def test_containers_start_from_preloaded_services(monkeypatch):
+    monkeypatch.setattr(container_module, "_preloaded", {})
+    preloaded = preload_services()
+    assert set(preloaded) == {"model"}  # the Mongo backend holds clients, so it is built per worker
+
+    container = ServiceContainer(include_rag=False, **container_module._preloaded)
+    container.build()
+    try:
+        assert container.ready
+        assert container.model is preloaded["model"]
+        assert "memory" in container.stats() or not os.path.exists("/proc/self/smaps_rollup")
+    finally:
+        container.close()
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from backend.benchmarks.fakes import FakeLLM, FakeMongo, make_movies
+from backend.src.api.container import ServiceContainer
+from backend.src.config.settings import EMBEDDING_DIMENSIONS
+from backend.src.rag_engine.result_cache import make_cache_key
+from backend.src.utils.latency_budget import LatencyBudget
+from backend.src.utils.json_codec import loads
+
+
+class FailingLLM(FakeLLM):
+    """FakeLLM that fails for prompts mentioning ``poison``"""
+
+    async def ainvoke(self, prompt):
+        if "poison" in prompt:
+            raise RuntimeError("LLM unavailable")
+        return await super().ainvoke(prompt)
+
+
+def make_pipeline(llm, budget_seconds=None):
+    mongo = FakeMongo(make_movies(50, EMBEDDING_DIMENSIONS))
+    container = ServiceContainer(include_rag=True, mongo_client=mongo.client, async_mongo_client=mongo.async_client, llm=llm)
+    container.build()
+    assert container.ready, container.startup_error
+    container.pipeline.budget = LatencyBudget(budget_seconds)
+    return container
+
+
+async def collect(events):
+    return [(event, data) async for event, data in events]
+
+
+def test_identical_searches_share_one_llm_call():
+    llm = FakeLLM(0.2)
+    container = make_pipeline(llm)
+    pipeline = container.pipeline
+
+    async def search():
+        return await asyncio.gather(*(pipeline.aget_movie_recommendations("space adventure") for _ in range(5)))
+
+    try:
+        results = asyncio.run(search())
+    finally:
+        container.close()
+    assert all(result == results[0] for result in results)
+    assert len(results[0]["movies"]) == 5
+    assert llm.calls == 1
+    stats = pipeline.single_flight.stats()
+    assert (stats["leaders"], stats["coalesced"]) == (1, 4)
+
+
+def test_running_out_of_budget_keeps_the_retrieved_movies():
+    container = make_pipeline(FakeLLM(0.5), budget_seconds=0.1)
+    pipeline = container.pipeline
+    try:
+        result = asyncio.run(pipeline.aget_movie_recommendations("space adventure"))
+        started = time.monotonic()
+        sync_result = pipeline.get_movie_recommendations("haunted house")
+        sync_seconds = time.monotonic() - started
+    finally:
+        container.close()
+
+    for degraded in (result, sync_result):
+        assert degraded["degraded"] and degraded["degraded_stage"] == "llm"
+        assert len(degraded["movies"]) == 5
+        assert degraded["movies"][0]["title"] in degraded["answer"]
+    # The sync path stops waiting for the LLM at the deadline too
+    assert sync_seconds < 0.4
+    assert pipeline.budget.stats()["exhausted"]["llm"] == 2
+    assert pipeline.result_cache.get(make_cache_key("space adventure")) is None
+
+
+def test_stream_is_cut_short_by_the_deadline():
+    container = make_pipeline(FakeLLM(1.0, answer="one two three four five six seven eight nine ten", chunks=10), budget_seconds=0.35)
+    pipeline = container.pipeline
+    try:
+        events = asyncio.run(collect(pipeline.astream_movie_recommendations("space adventure")))
+    finally:
+        container.close()
+
+    names = [event for event, _ in events]
+    assert names[0] == "movies" and names[-1] == "done"
+    assert 0 < names.count("token") < 10
+    done = events[-1][1]
+    assert done["degraded"] and done["degraded_stage"] == "llm"
+    assert done["answer"] == "".join(data["text"] for event, data in events if event == "token")
+    assert pipeline.result_cache.get(make_cache_key("space adventure")) is None
+
+
+def test_stream_replays_cached_answers_as_stored_bytes():
+    container = make_pipeline(FakeLLM(0.01))
+    pipeline = container.pipeline
+    try:
+        first = asyncio.run(collect(pipeline.astream_movie_recommendations("space adventure")))
+        second = asyncio.run(collect(pipeline.astream_movie_recommendations("Space  Adventure")))
+    finally:
+        container.close()
+
+    assert [event for event, _ in first][-1] == "done"
+    assert len(second) == 1 and second[0][0] == "result"
+    payload = second[0][1]
+    assert payload == pipeline.result_cache.get_encoded(make_cache_key("space adventure"), record=False)
+    assert loads(payload)["answer"] == first[-1][1]["answer"]
+
+
+def test_batch_answers_around_a_failing_search():
+    container = make_pipeline(FailingLLM(0.01))
+    pipeline = container.pipeline
+    searches = [{"query": "space adventure"}, {"query": "poison plot"}, {"query": ""}, {"query": "courtroom drama", "year_start": 1950, "year_end": 1970}]
+    try:
+        results = asyncio.run(pipeline.abatch_recommendations(searches))
+    finally:
+        container.close()
+
+    assert len(results) == 4
+    assert results[0]["answer"] == FailingLLM().answer and len(results[0]["movies"]) == 5
+    assert results[1]["degraded"] and results[1]["degraded_stage"] == "llm_error"
+    assert len(results[1]["movies"]) == 5
+    assert results[2]["movies"] == []
+    assert all(1950 <= movie["year"] <= 1970 for movie in results[3]["movies"])
+    assert pipeline.budget.stats()["requests"] == 4
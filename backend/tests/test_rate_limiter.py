@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.src.utils.rate_limiter import MemoryRateLimitBackend, MongoRateLimitBackend, RateLimitMiddleware
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    clock = FakeClock()
+    limiter = MemoryRateLimitBackend(rate_per_second=1.0, burst=3, clock=clock)
+    assert [limiter.take("a")[0] for _ in range(4)] == [True, True, True, False]
+    assert limiter.take("a") == (False, 1.0)
+    assert limiter.take("b")[0]
+
+    clock.now += 1.0
+    assert limiter.take("a")[0]
+    assert not limiter.take("a")[0]
+
+
+def test_idle_clients_are_evicted():
+    clock = FakeClock()
+    limiter = MemoryRateLimitBackend(rate_per_second=1.0, burst=2, sweep_interval=10.0, clock=clock)
+    for key in ("a", "b", "c"):
+        limiter.take(key)
+    clock.now += 11.0
+    limiter.take("d")
+    stats = limiter.stats()
+    assert stats["clients"] == 1
+    assert stats["evicted"] == 3
+
+
+def test_middleware_rejects_only_limited_paths():
+    app = FastAPI()
+    limiter = MemoryRateLimitBackend(rate_per_second=0.001, burst=1)
+    app.add_middleware(RateLimitMiddleware, backend=limiter, paths=("/search",))
+
+    @app.get("/search")
+    async def search():
+        return {"ok": True}
+
+    @app.get("/ready")
+    async def ready():
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        assert client.get("/search").status_code == 200
+        rejected = client.get("/search")
+        assert rejected.status_code == 429
+        assert int(rejected.headers["retry-after"]) >= 1
+        assert rejected.json()["detail"].startswith("Too many requests")
+        assert client.get("/ready").status_code == 200
+
+
+class FakeCounters:
+    def __init__(self):
+        self.docs = {}
+
+    async def create_index(self, *args, **kwargs):
+        pass
+
+    async def find_one_and_update(self, filter, update, upsert=False, return_document=None):
+        doc = self.docs.setdefault(filter["_id"], {"_id": filter["_id"], "count": 0})
+        doc["count"] += update["$inc"]["count"]
+        return dict(doc)
+
+    async def find_one(self, filter):
+        return self.docs.get(filter["_id"])
+
+
+def test_shared_window_weights_the_previous_window():
+    counters = FakeCounters()
+    clock = FakeClock(600.0)
+    workers = [MongoRateLimitBackend(4, 60.0, collection=counters, clock=clock) for _ in range(2)]
+
+    async def run():
+        # Two workers share one limit of 4 per minute
+        results = [(await workers[i % 2].hit("ip"))[0] for i in range(5)]
+        # Half a window later half of the previous window's 5 hits still count
+        clock.now += 90.0
+        results.append((await workers[0].hit("ip"))[0])
+        results.append((await workers[1].hit("ip"))[0])
+        return results
+
+    assert asyncio.run(run()) == [True, True, True, True, False, True, False]
@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from backend.src.rag_engine.result_cache import ResultCache, make_cache_key
+
+
+class FakeCacheCollection:
+    def __init__(self):
+        self.docs = {}
+        self.finds = 0
+
+    def find_one(self, filter):
+        self.finds += 1
+        doc = self.docs.get(filter["query"])
+        if doc and doc["timestamp"].replace(tzinfo=timezone.utc) > filter["timestamp"]["$gt"]:
+            return doc
+        return None
+
+    def update_one(self, filter, update, upsert=False):
+        doc = dict(update["$set"])
+        # Mongo hands datetimes back naive
+        doc["timestamp"] = doc["timestamp"].replace(tzinfo=None)
+        self.docs[filter["query"]] = doc
+
+
+class FakeAsyncCacheCollection(FakeCacheCollection):
+    async def find_one(self, filter):
+        return FakeCacheCollection.find_one(self, filter)
+
+    async def update_one(self, filter, update, upsert=False):
+        FakeCacheCollection.update_one(self, filter, update, upsert)
+
+
+def test_cache_key_ignores_genre_order_and_whitespace():
+    a = make_cache_key(" Space  movies", 1990, 2000, ["Sci-Fi", "Action"], "relevance")
+    b = make_cache_key("space movies", 1990, 2000, ["Action", " Sci-Fi", "Action"], "relevance")
+    assert a == b
+    assert a != make_cache_key("space movies", 1990, 2001, ["Action", "Sci-Fi"], "relevance")
+
+
+def test_l1_hit_skips_mongo_round_trip():
+    collection = FakeCacheCollection()
+    cache = ResultCache(collection)
+    cache.set("k", {"answer": "a", "movies": []})
+    assert cache.get("k") == {"answer": "a", "movies": []}
+    assert collection.finds == 0
+
+
+def test_l2_entry_is_promoted_with_remaining_ttl():
+    collection = FakeCacheCollection()
+    collection.docs["k"] = {
+        "result": {"answer": "a"},
+        "timestamp": (datetime.now(timezone.utc) - timedelta(hours=1)).replace(tzinfo=None),
+    }
+    cache = ResultCache(collection, ttl_seconds=2 * 60 * 60)
+    assert cache.get("k") == {"answer": "a"}
+    assert cache.get("k") == {"answer": "a"}
+    assert collection.finds == 1
+    assert cache.stats()["l2_hits"] == 1
+
+
+def test_stale_l2_entry_is_a_miss():
+    collection = FakeCacheCollection()
+    collection.docs["k"] = {
+        "result": {"answer": "a"},
+        "timestamp": (datetime.now(timezone.utc) - timedelta(hours=25)).replace(tzinfo=None),
+    }
+    assert ResultCache(collection).get("k") is None
+
+
+def test_l1_evicts_by_size():
+    cache = ResultCache(None, max_bytes=40)
+    cache.set("a", {"answer": "x" * 10})
+    cache.set("b", {"answer": "y" * 10})
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_async_tiers_use_the_async_collection():
+    async_collection = FakeAsyncCacheCollection()
+    writer = ResultCache(None, async_collection=async_collection)
+    reader = ResultCache(None, async_collection=async_collection)
+
+    async def run():
+        await writer.aset("k", {"answer": "a", "movies": []})
+        first = await reader.aget("k")
+        second = await reader.aget("k")
+        missing = await reader.aget("other")
+        return first, second, missing
+
+    first, second, missing = asyncio.run(run())
+    assert first == second == {"answer": "a", "movies": []}
+    assert missing is None
+    stats = reader.stats()
+    assert (stats["l2_hits"], stats["l1_hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_results_are_stored_and_served_encoded():
+    collection = FakeCacheCollection()
+    writer = ResultCache(collection)
+    payload = writer.set("k", {"answer": "a", "movies": [{"_id": "1", "score": 0.5}]})
+    assert collection.docs["k"]["payload"] == payload
+    assert writer.get_encoded("k") is payload
+
+    reader = ResultCache(collection)
+    assert reader.get_encoded("k") == payload
+    assert reader.get("k") == {"answer": "a", "movies": [{"_id": "1", "score": 0.5}]}
@@ -0,0 +1,39 @@
+import numpy as np
+from backend.src.rag_engine.semantic_cache import SemanticCache
+
+
+def test_near_duplicate_query_with_same_filters_hits():
+    cache = SemanticCache(3, threshold=0.9)
+    cache.add("space movies", [1.0, 0.0, 0.0], "f1", {"answer": "a", "movies": []})
+
+    hit = cache.lookup(np.array([0.99, 0.05, 0.0]), "f1")
+    assert hit["answer"] == "a"
+    assert hit["cache"]["type"] == "semantic"
+    assert hit["cache"]["similarity"] > 0.9
+    assert hit["cache"]["matched_query"] == "space movies"
+
+    assert cache.lookup(np.array([0.99, 0.05, 0.0]), "f2") is None
+    assert cache.lookup(np.array([0.0, 1.0, 0.0]), "f1") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["lookups"] == 3
+
+
+def test_least_recently_used_slot_is_reused():
+    cache = SemanticCache(2, threshold=0.99, max_entries=2)
+    cache.add("a", [1.0, 0.0], "f", {"answer": "a"})
+    cache.add("b", [0.0, 1.0], "f", {"answer": "b"})
+    cache.lookup([1.0, 0.0], "f")
+    cache.add("c", [1.0, 1.0], "f", {"answer": "c"})
+    assert cache.lookup([0.0, 1.0], "f") is None
+    assert cache.lookup([1.0, 0.0], "f")["answer"] == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_filter_ids_are_reused_once_their_entries_are_evicted():
+    cache = SemanticCache(2, threshold=0.99, max_entries=2)
+    for i in range(50):
+        cache.add(f"q{i}", [1.0, 0.0], f"filters-{i}", {"answer": str(i)})
+    assert len(cache._filter_key_ids) == 2
+    assert set(cache._filter_ids) == {0, 1}
+    assert cache.lookup([1.0, 0.0], "filters-49")["answer"] == "49"
+    assert cache.lookup([1.0, 0.0], "filters-0") is None
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from backend.src.utils.single_flight import SingleFlight
+
+
+def test_concurrent_duplicates_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return {"answer": "a"}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, "k", work) for _ in range(4)]
+        while flight.stats()["coalesced"] < 3:
+            pass
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    stats = flight.stats()
+    assert (stats["leaders"], stats["coalesced"], stats["in_flight"]) == (1, 3, 0)
+
+
+def test_leader_errors_reach_waiters():
+    flight = SingleFlight()
+
+    async def run():
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        leader = asyncio.ensure_future(flight.ado("k", work))
+        await started.wait()
+        waiter = asyncio.ensure_future(flight.ado("k", work))
+        return await asyncio.gather(leader, waiter, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats()["errors"] == 1
+    assert flight.stats()["coalesced"] == 1
+
+
+def test_waiters_time_out_without_cancelling_the_leader():
+    flight = SingleFlight(timeout=0.01)
+
+    async def run():
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.ado("k", work))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.ado("k", work)
+        return await leader
+
+    assert asyncio.run(run()) == "done"
+    assert flight.stats()["timeouts"] == 1
@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.src.api.sse import format_sse, sse_response
+
+
+def test_format_sse_encodes_one_event():
+    assert format_sse("token", {"text": "Hi"}) == b'event: token\ndata: {"text":"Hi"}\n\n'
+
+
+def test_format_sse_frames_encoded_payloads_as_is():
+    assert format_sse("result", b'{"answer":"a","movies":[]}') == b'event: result\ndata: {"answer":"a","movies":[]}\n\n'
+
+
+def test_events_are_streamed_in_order():
+    app = FastAPI()
+
+    async def events():
+        yield "movies", {"movies": [{"title": "Alien"}]}
+        yield "token", {"text": "Watch "}
+        yield "token", {"text": "Alien"}
+        yield "done", {"answer": "Watch Alien"}
+
+    @app.get("/stream")
+    async def stream():
+        return sse_response(events())
+
+    with TestClient(app) as client:
+        response = client.get("/stream")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    names = [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event:")]
+    assert names == ["movies", "token", "token", "done"]
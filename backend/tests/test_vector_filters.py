@@ -0,0 +1,55 @@
+import numpy as np
+from backend.src.vector_store.filters import FilterIndex
+from backend.src.vector_store.mongo_backend import MongoVectorSearch, build_vector_filter
+
+DOCUMENTS = [
+    {"year": 1941, "genres": ["Film-Noir", "Crime"]},
+    {"year": 1944, "genres": ["Drama"]},
+    {"year": 1950, "genres": ["Film-Noir"]},
+    {"year": "1943", "genres": []},
+    {"genres": ["Crime"]},
+]
+
+
+def test_filter_index_matches_year_range_and_any_genre():
+    index = FilterIndex(DOCUMENTS)
+    assert index.mask() is None
+    assert index.mask(1940, 1945).tolist() == [True, True, False, False, False]
+    assert index.mask(genres=["Crime", "Unknown"]).tolist() == [True, False, False, False, True]
+    assert np.flatnonzero(index.mask(1940, 1945, ["Film-Noir"])).tolist() == [0]
+
+
+class FakeMoviesCollection:
+    def __init__(self, total, matching):
+        self.total = total
+        self.matching = matching
+        self.counts = 0
+
+    def estimated_document_count(self):
+        return self.total
+
+    def count_documents(self, filter):
+        self.counts += 1
+        return self.matching
+
+
+def test_filters_are_pushed_into_the_vector_stage():
+    vector_filter = build_vector_filter(1940, 1945, ["Film-Noir"])
+    assert vector_filter == {"$and": [
+        {"year": {"$gte": 1940, "$lte": 1945}},
+        {"genres": {"$in": ["Film-Noir"]}},
+    ]}
+    backend = MongoVectorSearch(client=object(), exact_filter_threshold=100)
+
+    unfiltered = backend.vector_stage(FakeMoviesCollection(1000000, 0), [0.1], 5, {})["$vectorSearch"]
+    assert unfiltered["numCandidates"] == 100 and "filter" not in unfiltered
+
+    collection = FakeMoviesCollection(1000000, 20000)
+    selective = backend.vector_stage(collection, [0.1], 5, vector_filter)["$vectorSearch"]
+    assert selective["filter"] == vector_filter
+    assert selective["numCandidates"] == 5000
+    backend.vector_stage(collection, [0.1], 5, vector_filter)
+    assert collection.counts == 1
+
+    narrow = backend.vector_stage(FakeMoviesCollection(1000000, 50), [0.1], 5, {"year": 1})["$vectorSearch"]
+    assert narrow["exact"] is True and "numCandidates" not in narrow